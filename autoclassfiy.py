@@ -8,10 +8,14 @@ from pathlib import Path
 from re import search
 
 from config import ArtistAlias, IgnoredArtist, ManagedDir
+from keyword_matcher import KeywordMatcher
 from utils import Ask, ExitInSeconds, NewFileLogger
 
 ROOT_PATH = ManagedDir
 
+# IgnoredArtist 编译为多模式自动机（config.py 变更时进程重载，随之重建）
+_ignored_artist_matcher = KeywordMatcher(IgnoredArtist)
+
 
 cachedir = None
 # DEBUG_MODE = True
@@ -137,7 +141,7 @@ def FindArtistV2(who: Path) -> str:
     else:
         artist = content
 
-    if any(ignored in artist for ignored in IgnoredArtist):
+    if _ignored_artist_matcher.search(artist):
         return FindArtistV2(name[right + 1 :].strip())
 
     return artist.strip()
@@ -0,0 +1,74 @@
+"""Benchmark per-query candidate generation vs BatchCandidates (shared posting fetch).
+
+Usage:
+    python benchmark/bench_batch_candidates.py
+"""
+
+import random
+import sys
+import timeit
+
+sys.path.insert(0, ".")
+from pkg.cache import build_snapshot, cache_store
+from pkg.matching import BatchCandidates, exact_candidates, fuzzy_candidates
+
+# ---- 测试数据 ----
+
+# 小词表模拟真实标题中大量重复的热门词（热门 gram 的 posting list 很长）
+_WORDS = [
+    "".join(
+        random.Random(i).choices(
+            "abcdefghijklmnopqrstuvwxyz", k=random.Random(-i).randint(3, 8)
+        )
+    )
+    for i in range(400)
+]
+
+
+def _rand_title(rng: random.Random) -> str:
+    return f"[{rng.choice(_WORDS)}] " + " ".join(
+        rng.choice(_WORDS) for _ in range(rng.randint(3, 7))
+    )
+
+
+# ---- main ----
+
+
+def main() -> None:
+    rng = random.Random(0)
+    titles = sorted({_rand_title(rng) for _ in range(50000)}, reverse=True)
+    snapshot = build_snapshot(titles, generation=1)
+    cache_store.install_snapshot(snapshot)
+
+    print("=" * 60)
+    print(f"Candidate generation ({len(titles)} titles)")
+    print("=" * 60)
+    for n in (10, 100, 500):
+        # 一半查询来自库中标题的片段，一半为随机词组合
+        queries = [
+            " ".join(rng.choice(titles).split(" ")[1:4])
+            if i % 2
+            else " ".join(rng.sample(_WORDS, 3))
+            for i in range(n)
+        ]
+
+        def per_query(qs=queries):
+            for q in qs:
+                exact_candidates(q)
+                fuzzy_candidates(q)
+
+        def batched(qs=queries):
+            batch = BatchCandidates(snapshot, qs)
+            for q in qs:
+                batch.exact(q)
+                batch.fuzzy(q)
+
+        t1 = timeit.timeit(per_query, number=3) / 3
+        t2 = timeit.timeit(batched, number=3) / 3
+        print(
+            f"  n={n:4d}  per-query: {t1 * 1000:8.1f}ms  batch: {t2 * 1000:8.1f}ms  -> {t1 / t2:.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
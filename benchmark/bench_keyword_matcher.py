@@ -0,0 +1,66 @@
+"""Benchmark any(kw in text) vs KeywordMatcher (Aho-Corasick).
+
+Usage:
+    python benchmark/bench_keyword_matcher.py
+"""
+
+import random
+import string
+import sys
+import timeit
+
+sys.path.insert(0, ".")
+from keyword_matcher import KeywordMatcher
+
+# ---- 测试数据 ----
+
+
+def _rand_word(lo: int = 4, hi: int = 12) -> str:
+    return "".join(random.choices(string.ascii_lowercase, k=random.randint(lo, hi)))
+
+
+def _rand_title() -> str:
+    return f"[{_rand_word()} ({_rand_word()})] " + " ".join(
+        _rand_word() for _ in range(random.randint(3, 8))
+    )
+
+
+# ---- main ----
+
+
+def main() -> None:
+    random.seed(0)
+    titles = [_rand_title() for _ in range(2000)]
+
+    # 1. 正确性
+    print("=" * 60)
+    print("1. Correctness (2000 titles x 1000 keywords)")
+    print("=" * 60)
+    keywords = [_rand_word(5, 8) for _ in range(1000)]
+    matcher = KeywordMatcher(keywords)
+    mismatches = sum(
+        matcher.search(t) != any(kw in t for kw in keywords) for t in titles
+    )
+    print(f"  mismatches: {mismatches}")
+
+    # 2. 随关键词数量的扩展性（命中率低的场景，最坏情况）
+    print()
+    print("=" * 60)
+    print("2. Scaling with keyword count (2000 titles per round)")
+    print("=" * 60)
+    for k in (10, 100, 1000, 5000):
+        keywords = [_rand_word(6, 10) for _ in range(k)]
+        matcher = KeywordMatcher(keywords)
+        build = timeit.timeit(lambda kws=keywords: KeywordMatcher(kws), number=1)
+        t1 = timeit.timeit(
+            lambda kws=keywords: [any(kw in t for kw in kws) for t in titles], number=1
+        )
+        t2 = timeit.timeit(lambda m=matcher: [m.search(t) for t in titles], number=1)
+        print(
+            f"  k={k:5d}  any(): {t1 * 1000:8.1f}ms  matcher: {t2 * 1000:6.1f}ms"
+            f"  (build {build * 1000:.1f}ms)  -> {t1 / t2:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,14 @@ DEBUG = False
 ENABLE_DCACHE = True  # HTTP 响应缓存（Debug/录慢请求时自动关闭）
 ENABLE_RECORD_BATCH_REQUEST = True  # 记录 >150ms 的批处理请求到 tmp/
 ENABLE_TRIGRAM_INDEX = True  # trigram 倒排索引加速匹配
+ENABLE_FUZZY_AUTHOR = False  # 作者查询在精确/子串都未命中时再做模糊匹配（MATCH_FUZZY）
+ENABLE_PACKED_INDEX = False  # n-gram 索引使用 CSR 紧凑布局（整数 gram 编码，内存更小）
+ENABLE_SUFFIX_ARRAY = False  # 后缀数组精确匹配引擎（替代 trigram 交集 + 逐一校验）
+ENABLE_PROCESS_POOL = False  # /query/batch 大批量分发到多进程（快照经共享内存发布）
+ENABLE_SCAN_MANIFEST = True  # 按目录 mtime 增量重扫文件系统（清单持久化到 cache/）
+ENABLE_DELTA_INDEX = False  # 增量更新只写小的 delta 索引层（墓碑 + 追加），后台合并；关闭时每次变更全量重建
+ENABLE_WATCHER = False  # 监听目录变化实时增量更新标题（Linux inotify，不可用时轮询），替代定时全量刷新
+FUZZY_SCORER = "difflib"  # 模糊打分器: "difflib" / "bitparallel" / "compare"（两者都跑，记录差异，结果沿用 difflib）
 
 if DEBUG or ENABLE_RECORD_BATCH_REQUEST:
     ENABLE_DCACHE = False
@@ -14,6 +14,6 @@ _ = app
 
 if __name__ == "__main__":
     server.run()
-else:
-    if os.environ.get("TRAY_ICON", "false") == "true":
-        server.start_tray()
+# 进程池 worker（spawn）以 __mp_main__ 重新导入本模块时不启动托盘
+elif __name__ != "__mp_main__" and os.environ.get("TRAY_ICON", "false") == "true":
+    server.start_tray()
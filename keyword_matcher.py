@@ -0,0 +1,85 @@
+"""多关键词匹配 — Aho-Corasick 自动机，一次扫描判断文本是否包含任一关键词
+
+替代 any(kw in text for kw in keywords)：构建 O(Σ|kw|)，查询 O(|text|)，与关键词数量无关。
+"""
+
+from collections import deque
+from collections.abc import Iterable
+
+# 关键词少于该数量时逐个 `in` 更快（C 层子串查找），不构建自动机
+_SCAN_THRESHOLD = 64
+
+
+class KeywordMatcher:
+    """由关键词列表编译的 Aho-Corasick 自动机（构建后只读，可跨线程共享）。"""
+
+    __slots__ = ("_fail", "_goto", "_keywords", "_match_all", "_out", "keyword_count")
+
+    def __init__(self, keywords: Iterable[str]):
+        keywords = list(keywords)
+        self.keyword_count = len(keywords)
+        self._keywords: list[str] | None = None
+        if len(keywords) < _SCAN_THRESHOLD:
+            self._keywords = keywords
+            return
+
+        goto: list[dict[str, int]] = [{}]
+        out: list[bool] = [False]
+        match_all = False
+
+        # 1. 关键词 trie
+        for kw in keywords:
+            if not kw:
+                match_all = True  # 空串是任何文本的子串
+                continue
+            state = 0
+            for ch in kw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append(False)
+                state = nxt
+            out[state] = True
+
+        # 2. BFS 计算失配指针，并沿失配链传播输出标记
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0)
+                out[nxt] = out[nxt] or out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+        self._match_all = match_all
+
+    def search(self, text: str) -> bool:
+        """text 是否包含任一关键词，命中即返回"""
+        if self._keywords is not None:
+            return any(kw in text for kw in self._keywords)
+        if self._match_all:
+            return True
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        state = 0
+        for ch in text:
+            trans = goto[state]
+            while state and ch not in trans:
+                state = fail[state]
+                trans = goto[state]
+            state = trans.get(ch, 0)
+            if out[state]:
+                return True
+        return False
+
+    def __bool__(self) -> bool:
+        return self.keyword_count > 0
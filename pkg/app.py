@@ -15,11 +15,15 @@ from pkg.cache import cache_store
 from pkg.constants import (
     CACHE_MIN_REFRESH_INTERVAL_HOURS,
     ENABLE_DCACHE,
+    ENABLE_DELTA_INDEX,
+    ENABLE_PROCESS_POOL,
     ENABLE_RECORD_BATCH_REQUEST,
+    ENABLE_WATCHER,
     logger,
     now_cst,
 )
 from pkg.manager import request_stats, server
+from pkg.pool import matching_pool
 from pkg.routes import admin_router, api_router, query_router, root_router
 
 # -- 生命周期 ----------------------------------------------------------
@@ -29,14 +33,30 @@ from pkg.routes import admin_router, api_router, query_router, root_router
 async def lifespan(app: FastAPI):
     logger.debug(f"Managed by uvicorn: {os.environ.get('TRAY_ICON', '0') == '1'}")
     await cache_store.load_or_create()
-    refresh_task = asyncio.create_task(cache_store.refresh_loop())
+    if ENABLE_WATCHER:
+        from pkg.watcher import title_watcher
+
+        # 目录变更实时增量应用，不再需要定时全量刷新
+        on_update = memory_backend.close if memory_backend is not None else None
+        refresh_task = asyncio.create_task(title_watcher.run(on_update))
+    else:
+        refresh_task = asyncio.create_task(cache_store.refresh_loop())
+    tasks = [refresh_task]
+    if ENABLE_DELTA_INDEX:
+        tasks.append(asyncio.create_task(cache_store.compaction_loop()))
+    if ENABLE_PROCESS_POOL:
+        matching_pool.start()
     yield
     logger.info("Shutting down background tasks...")
-    refresh_task.cancel()
-    try:
-        await refresh_task
-    except asyncio.CancelledError:
-        logger.info("Background refresh task cancelled")
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+    logger.info("Background tasks cancelled")
+    await asyncio.to_thread(matching_pool.shutdown)
     logger.info("Shutdown complete")
 
 
@@ -72,7 +92,7 @@ async def updateCacheMiddleware(req: Request, call_next):
     current_time = now_cst()
     elapsed_time = current_time - cache_store.last_update_time
     refresh_interval = datetime.timedelta(hours=CACHE_MIN_REFRESH_INTERVAL_HOURS)
-    if elapsed_time > refresh_interval:
+    if elapsed_time > refresh_interval and not ENABLE_WATCHER:
         async with _refresh_lock:
             if (now_cst() - cache_store.last_update_time) > refresh_interval:
                 cache_store.last_update_time = now_cst()
@@ -98,7 +118,7 @@ async def timeCostMiddleware(req: Request, call_next):
 
     if (
         ENABLE_RECORD_BATCH_REQUEST
-        and req.url.path.startswith("/query/batch")
+        and req.url.path == "/query/batch"  # 流式端点的请求体已被消费
         and elapsed_ms >= 150
     ):
         try:
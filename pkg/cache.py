@@ -1,23 +1,45 @@
-"""缓存管理 — CacheStore、文件系统收集、trigram 索引构建"""
+"""缓存管理 — CacheStore、文件系统收集、trigram 索引 / 后缀数组构建"""
 
 import asyncio
 import json
-import os
 import threading
+import time
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from dataclasses import replace
 from pathlib import Path
 
 from autoclassfiy import FindArtistV2
 from config import ManagedDir
+from pkg.changelog import TitleChangeLog
 from pkg.constants import (
     CACHE_PATH,
     CACHE_REFRESH_INTERVAL_SECONDS,
+    DELTA_INDEX_CHECK_INTERVAL_SECONDS,
+    DELTA_INDEX_COMPACT_DELAY_SECONDS,
+    DELTA_INDEX_MAX_SIZE,
+    ENABLE_DELTA_INDEX,
+    ENABLE_PACKED_INDEX,
+    ENABLE_SCAN_MANIFEST,
+    ENABLE_SUFFIX_ARRAY,
     ENABLE_TRIGRAM_INDEX,
     JUST_LOAD,
+    SCAN_MANIFEST_PATH,
+    TITLE_CHANGELOG_GENERATIONS,
+    TITLE_CHANGELOG_MAX_TITLES,
     extra_search_dirs,
     logger,
     now_cst,
 )
+from pkg.delta_index import LayeredIndex, LayeredIntervals
 from pkg.models import CacheSnapshot, TitlesCache
+from pkg.packed_index import NgramIndex, PackedNgramIndex
+from pkg.prefix_index import PrefixIndex
+from pkg.range_index import IntervalIndex, RangeIndex, _strip_digits
+from pkg.scan_manifest import ScanDelta, ScanManifest
+from pkg.suffix_array import SuffixArray, build_suffix_array
+from pkg.text import _normalize_range_separators, extract_number_range_from_string
 
 # ============================================================
 # n-gram 工具函数
@@ -36,56 +58,254 @@ def _extract_ngrams(s: str, n: int = 3) -> set[str]:
 # ============================================================
 
 
-def _build_ngram_index(titles: list[str], n: int = 3) -> dict[str, frozenset[int]]:
-    """构建 n-gram → frozenset[标题索引] 的倒排索引"""
-    gram_to_indices: dict[str, set[int]] = {}
+def _build_ngram_index(
+    titles: list[str], n: int = 3, packed: bool = False
+) -> NgramIndex:
+    """构建 n-gram → 升序 array('I')[标题索引] 的倒排索引，packed=True 时输出 CSR 紧凑布局"""
+    gram_to_indices: dict[str, array] = {}
 
+    # 按标题索引递增追加，posting list 天然有序；每个标题的 gram 已去重
     for idx, title in enumerate(titles):
-        title_grams = _extract_ngrams(title, n=n)
-        for gram in title_grams:
-            if gram not in gram_to_indices:
-                gram_to_indices[gram] = set()
-            gram_to_indices[gram].add(idx)
+        for gram in _extract_ngrams(title, n=n):
+            postings = gram_to_indices.get(gram)
+            if postings is None:
+                postings = gram_to_indices[gram] = array("I")
+            postings.append(idx)
+
+    # 构建完成后只读，允许无锁安全读取
+    if packed:
+        return PackedNgramIndex.from_dict(gram_to_indices)
+    return gram_to_indices
+
+
+def _build_range_index(
+    normalized_titles: list[str], title_ranges: list[tuple[int, int] | None]
+) -> RangeIndex:
+    """为带数字范围的标题构建 去数字 trigram 倒排 + 区间树"""
+    gram_to_indices: dict[str, array] = {}
+    intervals: list[tuple[int, int, int]] = []
+
+    for idx, title_range in enumerate(title_ranges):
+        if title_range is None:
+            continue
+        intervals.append((title_range[0], title_range[1], idx))
+        for gram in _extract_ngrams(_strip_digits(normalized_titles[idx]), n=3):
+            postings = gram_to_indices.get(gram)
+            if postings is None:
+                postings = gram_to_indices[gram] = array("I")
+            postings.append(idx)
 
-    # 冻结为不可变结构，允许无锁安全读取
-    return {g: frozenset(indices) for g, indices in gram_to_indices.items()}
+    return RangeIndex(gram_index=gram_to_indices, intervals=IntervalIndex(intervals))
 
 
 # ============================================================
-# 文件系统收集
+# 快照构建
 # ============================================================
 
 
-def _collect_cleaned_titles_from_filesystem() -> list[str]:
-    """从文件系统收集所有清理后的标题"""
-    names_set = set()
-    root_path = ManagedDir
+def _build_author_indexes(authors: list[str]) -> tuple[NgramIndex, NgramIndex]:
+    """作者 n-gram 索引：query_author 子串 / 模糊查询的候选来源"""
+    if not ENABLE_TRIGRAM_INDEX:
+        return {}, {}
+    return (
+        _build_ngram_index(authors, n=3, packed=ENABLE_PACKED_INDEX),
+        _build_ngram_index(authors, n=2, packed=ENABLE_PACKED_INDEX),
+    )
+
+
+def build_snapshot(
+    titles: list[str],
+    generation: int = 0,
+    trigram_index: NgramIndex | None = None,
+    bigram_index: NgramIndex | None = None,
+) -> CacheSnapshot:
+    """由已去重排序的标题构建全部派生结构。
+
+    传入的 n-gram 索引（如进程池 worker 挂载的共享内存 CSR）直接复用，不再重建。
+    """
+    if trigram_index is None or bigram_index is None:
+        if ENABLE_TRIGRAM_INDEX:
+            trigram_index = _build_ngram_index(titles, n=3, packed=ENABLE_PACKED_INDEX)
+            bigram_index = _build_ngram_index(titles, n=2, packed=ENABLE_PACKED_INDEX)
+        else:
+            trigram_index = {}
+            bigram_index = {}
+
+    # 影子语料：归一化标题与数字范围只在此算一次，查询侧只归一化输入
+    normalized = [_normalize_range_separators(t) for t in titles]
+    ranges = [extract_number_range_from_string(t) for t in normalized]
+
+    # 后缀数组建在归一化标题上，与 exactly_match 的子串分支语义一致
+    suffix_array = build_suffix_array(normalized) if ENABLE_SUFFIX_ARRAY else None
+
+    # 启用索引时 EXACT 阶段不再全量扫描，数字范围分支改由范围索引提供候选
+    if ENABLE_TRIGRAM_INDEX or ENABLE_SUFFIX_ARRAY:
+        range_index = _build_range_index(normalized, ranges)
+    else:
+        range_index = None
+
+    # 作者 → 作品数；Counter 保留首次出现顺序，键即作者列表
+    author_counts = Counter(_title_authors(titles))
+    authors = list(author_counts)
+
+    author_trigram_index, author_bigram_index = _build_author_indexes(authors)
+
+    return CacheSnapshot(
+        titles=titles,
+        trigram_index=trigram_index,
+        bigram_index=bigram_index,
+        authors=authors,
+        author_set=set(authors),
+        author_counts=author_counts,
+        author_trigram_index=author_trigram_index,
+        author_bigram_index=author_bigram_index,
+        title_prefix_index=PrefixIndex(titles),
+        author_prefix_index=PrefixIndex(authors),
+        suffix_array=suffix_array,
+        normalized_titles=normalized,
+        title_ranges=ranges,
+        range_index=range_index,
+        generation=generation,
+    )
+
+
+def _slot_grams(
+    titles: list[str], slots: Iterable[int], n: int
+) -> list[tuple[str, int]]:
+    return [(gram, idx) for idx in slots for gram in _extract_ngrams(titles[idx], n=n)]
+
+
+def _title_authors(titles: Iterable[str]) -> Iterator[str]:
+    """各标题的作者（小写），跳过无作者的标题"""
+    for title in titles:
+        author = FindArtistV2(title).strip().lower()
+        if author:
+            yield author
+
+
+def apply_delta(
+    snapshot: CacheSnapshot, added: list[str], removed: Iterable[int], generation: int
+) -> CacheSnapshot:
+    """在 snapshot 的 delta 层追加标题 added、删除索引 removed，返回新快照。
+
+    新标题的索引从 len(snapshot.titles) 起依次分配；被删除的标题保留原位置并记为墓碑。
+    base 层（含后缀数组、前缀索引）不变，开销与变更标题的总长度成正比；
+    各列表的浅拷贝为指针复制。新作者追加到作者列表；有作者失去全部作品时重建作者侧结构。
+    """
+    removed = sorted(removed)
+    start = len(snapshot.titles)
+    new_slots = range(start, start + len(added))
+    titles = snapshot.titles + added
+    normalized_added = [_normalize_range_separators(t) for t in added]
+    normalized = snapshot.normalized_titles + normalized_added
+    ranges = snapshot.title_ranges + [
+        extract_number_range_from_string(t) for t in normalized_added
+    ]
+    tombstones = snapshot.tombstones.union(removed)
+
+    trigram_index, bigram_index = snapshot.trigram_index, snapshot.bigram_index
+    if ENABLE_TRIGRAM_INDEX:
+        trigram_index = LayeredIndex.wrap(trigram_index).with_changes(
+            _slot_grams(titles, new_slots, 3), _slot_grams(titles, removed, 3)
+        )
+        bigram_index = LayeredIndex.wrap(bigram_index).with_changes(
+            _slot_grams(titles, new_slots, 2), _slot_grams(titles, removed, 2)
+        )
 
-    if os.path.exists(root_path):
-        try:
-            for _, dirs, files in os.walk(root_path):
-                names_set.update(dirs)
+    range_index = snapshot.range_index
+    if range_index is not None:
+
+        def range_grams(slots: Iterable[int]) -> list[tuple[str, int]]:
+            return [
+                (gram, idx)
+                for idx in slots
+                if ranges[idx] is not None
+                for gram in _extract_ngrams(_strip_digits(normalized[idx]), n=3)
+            ]
+
+        intervals = LayeredIntervals.wrap(range_index.intervals)
+        extra = intervals.extra + tuple(
+            (ranges[idx][0], ranges[idx][1], idx)
+            for idx in new_slots
+            if ranges[idx] is not None
+        )
+        range_index = RangeIndex(
+            gram_index=LayeredIndex.wrap(range_index.gram_index).with_changes(
+                range_grams(new_slots), range_grams(removed)
+            ),
+            intervals=LayeredIntervals(intervals.base, extra, tombstones),
+        )
 
-                for filename in files:
-                    if filename.endswith((".zip", ".rar")):
-                        names_set.add(os.path.splitext(filename)[0])
-        except OSError as e:
-            logger.warning(f"Error walking ManagedDir '{root_path}': {e}")
+    authors, author_set = snapshot.authors, snapshot.author_set
+    author_counts = snapshot.author_counts
+    author_trigram_index = snapshot.author_trigram_index
+    author_bigram_index = snapshot.author_bigram_index
+    author_prefix_index = snapshot.author_prefix_index
+    added_authors = list(_title_authors(added))
+    removed_authors = list(_title_authors(titles[idx] for idx in removed))
+    if added_authors or removed_authors:
+        author_counts = author_counts.copy()
+        for author in added_authors:
+            author_counts[author] = author_counts.get(author, 0) + 1
+        for author in removed_authors:
+            author_counts[author] -= 1
+            if not author_counts[author]:
+                del author_counts[author]
+    new_authors = list(dict.fromkeys(a for a in added_authors if a not in author_set))
+    orphaned = {a for a in removed_authors if a not in author_counts}
+    if orphaned:
+        # 作者列表较小：有作者失去全部作品时整体重建作者侧结构，列表与索引下标保持一致
+        authors = [a for a in authors if a not in orphaned] + new_authors
+        author_set = set(authors)
+        author_trigram_index, author_bigram_index = _build_author_indexes(authors)
+        author_prefix_index = PrefixIndex(authors)
+    elif new_authors:
+        author_slots = range(len(authors), len(authors) + len(new_authors))
+        authors = authors + new_authors
+        author_set = author_set | set(new_authors)
+        if ENABLE_TRIGRAM_INDEX:
+            author_trigram_index = LayeredIndex.wrap(author_trigram_index).with_changes(
+                _slot_grams(authors, author_slots, 3), ()
+            )
+            author_bigram_index = LayeredIndex.wrap(author_bigram_index).with_changes(
+                _slot_grams(authors, author_slots, 2), ()
+            )
 
-    # 从搜索路径收集
-    for search_dir in extra_search_dirs:
-        if not os.path.isdir(search_dir):
-            logger.warning(f"Extra search dir not found, skipping: {search_dir}")
-            continue
-        try:
-            for entry in os.scandir(search_dir):
-                if entry.is_file() and entry.name.endswith(".zip"):
-                    names_set.add(os.path.splitext(entry.name)[0])
-        except OSError as e:
-            logger.warning(f"Error scanning search dir '{search_dir}': {e}")
+    return replace(
+        snapshot,
+        titles=titles,
+        trigram_index=trigram_index,
+        bigram_index=bigram_index,
+        authors=authors,
+        author_set=author_set,
+        author_counts=author_counts,
+        author_trigram_index=author_trigram_index,
+        author_bigram_index=author_bigram_index,
+        author_prefix_index=author_prefix_index,
+        normalized_titles=normalized,
+        title_ranges=ranges,
+        range_index=range_index,
+        generation=generation,
+        base_size=start if snapshot.base_size is None else snapshot.base_size,
+        tombstones=tombstones,
+    )
 
+
+# ============================================================
+# 文件系统收集
+# ============================================================
+
+
+def _collect_cleaned_titles_from_filesystem() -> list[str]:
+    """从文件系统收集所有清理后的标题（全量扫描）"""
+    names = ScanManifest(ManagedDir, extra_search_dirs).rescan().added
     # 排序并返回列表（逆序）
-    return sorted(names_set, reverse=True)
+    return sorted(names, reverse=True)
+
+
+def _clean_titles(names) -> set[str]:
+    """去掉 "_" 开头的条目并去除首尾空白"""
+    return {x.strip() for x in names if not x.startswith("_")}
 
 
 # ============================================================
@@ -98,24 +318,55 @@ class CacheStore:
 
     def __init__(self):
         self.lock = threading.Lock()
-        self.titles: list[str] = []
         self.authors: list[str] = []
         self.author_set: set[str] = set()
-        self.trigram_index: dict[str, frozenset[int]] = {}
-        self.bigram_index: dict[str, frozenset[int]] = {}
+        self.author_trigram_index: NgramIndex = {}
+        self.author_bigram_index: NgramIndex = {}
+        self.trigram_index: NgramIndex = {}
+        self.bigram_index: NgramIndex = {}
+        self.suffix_array: SuffixArray | None = None
+        self.normalized_titles: list[str] = []
+        self.title_ranges: list[tuple[int, int] | None] = []
+        self.range_index: RangeIndex | None = None
+        self.title_prefix_index = PrefixIndex([])
+        self.author_prefix_index = PrefixIndex([])
+        self.generation = 0
+        self.changelog = TitleChangeLog(
+            TITLE_CHANGELOG_GENERATIONS, TITLE_CHANGELOG_MAX_TITLES
+        )
+        self.scan_manifest: ScanManifest | None = None  # 首次扫描时从文件加载
+        self._scan_lock = threading.Lock()  # 串行化清单扫描（刷新与文件监听）
+        # 现存标题 → 在当前快照中的索引（写入侧状态，持 lock 访问）
+        self._slots: dict[str, int] = {}
+        self._delta_since: float | None = None  # 首个未合并增量的时刻（monotonic）
+        self.compactions = 0
         self.last_update_time = now_cst()
         self._snapshot = CacheSnapshot(
-            titles=self.titles,
+            titles=[],
             trigram_index=self.trigram_index,
             bigram_index=self.bigram_index,
             authors=self.authors,
             author_set=self.author_set,
+            author_trigram_index=self.author_trigram_index,
+            author_bigram_index=self.author_bigram_index,
+            suffix_array=self.suffix_array,
+            normalized_titles=self.normalized_titles,
+            title_ranges=self.title_ranges,
+            range_index=self.range_index,
+            title_prefix_index=self.title_prefix_index,
+            author_prefix_index=self.author_prefix_index,
+            generation=self.generation,
         )
 
     def get_snapshot(self) -> CacheSnapshot:
         """获取缓存一致性快照，无需加锁。"""
         return self._snapshot
 
+    @property
+    def titles(self) -> list[str]:
+        """当前快照的现存标题"""
+        return self._snapshot.live_titles
+
     # ================================================================
     # 内部更新
     # ================================================================
@@ -129,36 +380,164 @@ class CacheStore:
             else:
                 merged = cleaned_titles
 
-            new_titles = [x.strip() for x in merged if not x.startswith("_")]
-            # 去重 + 逆序排列（长的在前）
-            new_titles = sorted(set(new_titles), reverse=True)
+            self._install_titles(_clean_titles(merged))
 
-            if ENABLE_TRIGRAM_INDEX:
-                new_trigram_index = _build_ngram_index(new_titles, n=3)
-                new_bigram_index = _build_ngram_index(new_titles, n=2)
+    def _update_delta(
+        self, delta: ScanDelta, names: set[str], reconcile: bool = True
+    ) -> bool:
+        """按扫描增量更新（names 为扫描得到的全部标题）；标题不变时不生成新快照，返回是否更新。
+
+        reconcile=True 时以 names 为准求差（当前缓存可能并非由该清单产生，如 TitlesCache.json
+        与清单不同步）；否则只看 delta 中的标题（文件监听的局部重扫）。
+        """
+        with self.lock:
+            current = self._slots.keys()
+            if reconcile:
+                expected = _clean_titles(names)
+                added = expected - current
+                removed = current - expected
             else:
-                new_trigram_index = {}
-                new_bigram_index = {}
-
-            new_authors: list[str] = []
-            for title in new_titles:
-                author = FindArtistV2(title).strip().lower()
-                if author and author not in new_authors:
-                    new_authors.append(author)
-
-            self.titles = new_titles
-            self.trigram_index = new_trigram_index
-            self.bigram_index = new_bigram_index
-            self.authors = new_authors
-            self.author_set = set(new_authors)
-            # 原子替换快照，保证读取侧无需锁即可获取一致性视图
-            self._snapshot = CacheSnapshot(
-                titles=self.titles,
-                trigram_index=self.trigram_index,
-                bigram_index=self.bigram_index,
-                authors=self.authors,
-                author_set=self.author_set,
-            )
+                added = _clean_titles(delta.added) - current
+                # 清理后重名（仅首尾空白不同）的条目仍在时不删除
+                removed = {
+                    t
+                    for t in _clean_titles(delta.removed)
+                    if t in current and t not in names
+                }
+            if JUST_LOAD:
+                removed = set()
+            if not added and not removed:
+                return False
+            self._apply_titles(added, removed)
+            return True
+
+    def _apply_titles(self, added: set[str], removed: set[str]) -> None:
+        """应用清理后标题的增删（调用方持锁）：变更较小时只写 delta 层，否则全量重建"""
+        snapshot = self._snapshot
+        if (
+            not ENABLE_DELTA_INDEX
+            or self.generation == 0
+            or snapshot.delta_size + len(added) + len(removed) > DELTA_INDEX_MAX_SIZE
+        ):
+            self._install_titles((self._slots.keys() - removed) | added)
+            return
+
+        new_titles = sorted(added, reverse=True)
+        start = len(snapshot.titles)
+        removed_slots = [self._slots.pop(title) for title in removed]
+        for offset, title in enumerate(new_titles):
+            self._slots[title] = start + offset
+
+        generation = self.generation + 1
+        new_snapshot = apply_delta(snapshot, new_titles, removed_slots, generation)
+        self.changelog.record_change(
+            generation, new_titles, sorted(removed, reverse=True)
+        )
+        if self._delta_since is None:
+            self._delta_since = time.monotonic()
+        self.install_snapshot(new_snapshot)
+
+    def _install_titles(self, titles: set[str]) -> None:
+        """由清理后的标题集合构建并安装新快照（调用方持锁）"""
+        # 去重 + 逆序排列（长的在前）
+        new_titles = sorted(titles, reverse=True)
+
+        generation = self.generation + 1
+        snapshot = build_snapshot(new_titles, generation)
+        # 首次加载无需记录：since=0 的客户端本就走全量
+        # 先记日志再替换快照：读取侧按快照代数截取，不会看到缺失的区间
+        if self.generation > 0:
+            self.changelog.record(generation, self.titles, new_titles)
+        self._slots = {title: idx for idx, title in enumerate(new_titles)}
+        self._delta_since = None
+        self.install_snapshot(snapshot)
+
+    # ================================================================
+    # compaction
+    # ================================================================
+
+    def compact(self) -> bool:
+        """把 delta 层并入新的 base，返回是否执行。
+
+        全量构建在锁外进行；期间到达的增量随后按集合差重放到新 base 的 delta 层。
+        """
+        snapshot = self._snapshot
+        if not snapshot.has_delta:
+            return False
+        base_titles = sorted(snapshot.live_titles, reverse=True)
+        base = build_snapshot(base_titles)
+
+        with self.lock:
+            generation = self.generation + 1
+            compacted = replace(base, generation=generation)
+            slots = {title: idx for idx, title in enumerate(base_titles)}
+            added = self._slots.keys() - slots.keys()
+            removed = slots.keys() - self._slots.keys()
+            if added or removed:
+                new_titles = sorted(added, reverse=True)
+                removed_slots = [slots.pop(title) for title in removed]
+                for offset, title in enumerate(new_titles, start=len(base_titles)):
+                    slots[title] = offset
+                compacted = apply_delta(
+                    compacted, new_titles, removed_slots, generation
+                )
+            else:
+                self._delta_since = None
+            # 标题不变，仅记录空变更以保持变更日志的代数连续
+            self.changelog.record_change(generation, [], [])
+            self._slots = slots
+            self.compactions += 1
+            self.install_snapshot(compacted)
+        logger.debug(f"Delta index compacted: {len(base_titles)} titles in base")
+        return True
+
+    async def compaction_loop(self) -> None:
+        """后台循环：delta 层超过 DELTA_INDEX_MAX_SIZE 或存在超过 DELTA_INDEX_COMPACT_DELAY_SECONDS 时合并"""
+        while True:
+            await asyncio.sleep(DELTA_INDEX_CHECK_INTERVAL_SECONDS)
+            since = self._delta_since
+            if since is None:
+                continue
+            if (
+                self._snapshot.delta_size < DELTA_INDEX_MAX_SIZE
+                and time.monotonic() - since < DELTA_INDEX_COMPACT_DELAY_SECONDS
+            ):
+                continue
+            try:
+                if await asyncio.to_thread(self.compact):
+                    await asyncio.to_thread(self.save)
+            except Exception as e:  # noqa: BLE001 — 必须捕获所有异常防止循环退出
+                logger.error(f"Delta index compaction failed, will retry: {e}")
+
+    def get_delta_stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "enabled": ENABLE_DELTA_INDEX,
+            "base_size": len(snapshot.titles)
+            if snapshot.base_size is None
+            else snapshot.base_size,
+            "delta_titles": len(snapshot.delta_slots),
+            "tombstones": len(snapshot.tombstones),
+            "compactions": self.compactions,
+        }
+
+    def install_snapshot(self, snapshot: CacheSnapshot) -> None:
+        """以 snapshot 替换当前状态（_update 持锁调用；进程池 worker 直接调用）"""
+        self.trigram_index = snapshot.trigram_index
+        self.bigram_index = snapshot.bigram_index
+        self.suffix_array = snapshot.suffix_array
+        self.normalized_titles = snapshot.normalized_titles
+        self.title_ranges = snapshot.title_ranges
+        self.range_index = snapshot.range_index
+        self.authors = snapshot.authors
+        self.author_set = snapshot.author_set
+        self.author_trigram_index = snapshot.author_trigram_index
+        self.author_bigram_index = snapshot.author_bigram_index
+        self.title_prefix_index = snapshot.title_prefix_index
+        self.author_prefix_index = snapshot.author_prefix_index
+        self.generation = snapshot.generation
+        # 原子替换快照，保证读取侧无需锁即可获取一致性视图
+        self._snapshot = snapshot
 
     # ================================================================
     # 加载 / 刷新
@@ -210,6 +589,53 @@ class CacheStore:
             logger.warning(f"Failed to load cache: {e}")
             return False
 
+    def _rescan_filesystem(self) -> bool:
+        """按目录 mtime 增量重扫：只重新列出变化的目录，以标题增量更新缓存；返回是否更新"""
+        with self._scan_lock:
+            if self.scan_manifest is None:
+                self.scan_manifest = ScanManifest.load(
+                    SCAN_MANIFEST_PATH, ManagedDir, extra_search_dirs
+                )
+            return self._apply_scan(self.scan_manifest.rescan(), reconcile=True)
+
+    def apply_dir_changes(self, paths: set[str]) -> bool:
+        """重新列出文件监听报告变化的目录并应用标题增量；返回是否更新"""
+        with self._scan_lock:
+            if self.scan_manifest is None:
+                self.scan_manifest = ScanManifest.load(
+                    SCAN_MANIFEST_PATH, ManagedDir, extra_search_dirs
+                )
+                return self._apply_scan(self.scan_manifest.rescan(), reconcile=True)
+            return self._apply_scan(self.scan_manifest.refresh(paths), reconcile=False)
+
+    def _apply_scan(self, delta: ScanDelta, reconcile: bool) -> bool:
+        """应用一次扫描的结果（调用方持 _scan_lock）"""
+        manifest = self.scan_manifest
+        logger.debug(
+            f"Filesystem scan: {manifest.relisted} dirs relisted, {manifest.reused} reused, "
+            f"+{len(delta.added)} / -{len(delta.removed)} titles"
+        )
+        if self.generation == 0:
+            # 尚未加载任何标题：增量无从应用，直接以全部标题构建
+            self._update(list(manifest.names))
+            return True
+        return self._update_delta(delta, manifest.names, reconcile)
+
+    def save(self, cache_file_path: Path | None = None) -> TitlesCache:
+        """持久化标题缓存（及扫描清单）"""
+        snapshot = self._snapshot
+        titles = snapshot.live_titles
+        if snapshot.has_delta:
+            titles = sorted(titles, reverse=True)  # 与全量构建的顺序一致
+        cache = TitlesCache(createTime=now_cst(), titles=titles)
+        cache.save(cache_file_path or Path(CACHE_PATH))
+        if self.scan_manifest is not None:
+            try:
+                self.scan_manifest.save(SCAN_MANIFEST_PATH)
+            except OSError as e:
+                logger.warning(f"Failed to save scan manifest: {e}")
+        return cache
+
     async def load_or_create(self, create_cache: bool = False) -> TitlesCache | None:
         """加载或重新创建标题缓存"""
         cache_file_path = Path(CACHE_PATH)
@@ -220,14 +646,13 @@ class CacheStore:
 
         # 从文件系统收集
         logger.debug("Collecting cleaned titles from filesystem...")
-        cleaned_titles = _collect_cleaned_titles_from_filesystem()
-
-        # 更新内部状态
-        self._update(cleaned_titles)
+        if ENABLE_SCAN_MANIFEST:
+            self._rescan_filesystem()
+        else:
+            self._update(_collect_cleaned_titles_from_filesystem())
 
         # 持久化到 JSON
-        cache = TitlesCache(createTime=now_cst(), titles=self.titles)
-        cache.save(cache_file_path)
+        cache = self.save(cache_file_path)
 
         logger.debug(
             f"Cache created/refreshed with {len(self.titles)} cleaned titles, "
@@ -0,0 +1,108 @@
+"""标题变更日志 — 按快照代数记录新增 / 删除的标题，供客户端增量同步
+
+每条记录对应一次 generation - 1 → generation 的变更；日志按代数条数与标题总数双重限长，
+请求的起点早于日志覆盖范围时由调用方回退为全量。
+代数在每次进程启动时从头计数：epoch 标识本次启动，客户端持有的 epoch 不一致时同样回退全量。
+"""
+
+import threading
+import uuid
+from collections import deque
+from collections.abc import Iterable
+from typing import NamedTuple
+
+
+class TitleChange(NamedTuple):
+    generation: int
+    added: tuple[str, ...]
+    removed: tuple[str, ...]
+
+
+class TitleChangeLog:
+    """线程安全的有界变更日志（记录由 CacheStore._update 持锁写入）。"""
+
+    def __init__(self, max_generations: int, max_titles: int):
+        self.max_generations = max_generations
+        self.max_titles = max_titles
+        self._lock = threading.Lock()
+        self._entries: deque[TitleChange] = deque()
+        self._size = 0  # 日志中标题总数
+        self.epoch = uuid.uuid4().hex  # 本进程的代数序列标识
+
+    def record(
+        self, generation: int, old_titles: list[str], new_titles: list[str]
+    ) -> None:
+        """记录 old_titles → new_titles 的差集；超出限长时丢弃最旧的记录"""
+        old, new = set(old_titles), set(new_titles)
+        self.record_change(generation, new - old, old - new)
+
+    def record_change(
+        self, generation: int, added: Iterable[str], removed: Iterable[str]
+    ) -> None:
+        """直接记录一次已知的增删（增量更新无需再对全量标题求差）"""
+        change = TitleChange(generation, tuple(added), tuple(removed))
+        size = len(change.added) + len(change.removed)
+        with self._lock:
+            if self._entries and self._entries[-1].generation != generation - 1:
+                self._clear()  # 代数不连续，旧记录无法与新记录衔接
+            if size > self.max_titles:
+                self._clear()  # 单次变更过大：日志无法覆盖，客户端回退全量
+                return
+            self._entries.append(change)
+            self._size += size
+            while (
+                len(self._entries) > self.max_generations
+                or self._size > self.max_titles
+            ):
+                old_change = self._entries.popleft()
+                self._size -= len(old_change.added) + len(old_change.removed)
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def changes_since(
+        self, since: int, generation: int, epoch: str | None = None
+    ) -> tuple[list[str], list[str]] | None:
+        """合并 since → generation 之间的净变更，返回 (added, removed)。
+
+        日志不覆盖该区间（since 过旧或大于 generation）、或 epoch 给定且不是本次启动的
+        epoch（since 属于另一段代数序列）时返回 None。
+        """
+        if epoch is not None and epoch != self.epoch:
+            return None
+        if since == generation:
+            return [], []
+        if since > generation:
+            return None
+        with self._lock:
+            entries = [e for e in self._entries if since < e.generation <= generation]
+        if len(entries) != generation - since:
+            return None
+
+        added: dict[str, None] = {}
+        removed: dict[str, None] = {}
+        for change in entries:
+            # 先增后删 / 先删后增的标题相互抵消
+            for title in change.removed:
+                if title in added:
+                    del added[title]
+                else:
+                    removed[title] = None
+            for title in change.added:
+                if title in removed:
+                    del removed[title]
+                else:
+                    added[title] = None
+        return list(added), list(removed)
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "epoch": self.epoch,
+                "generations": len(self._entries),
+                "oldest": self._entries[0].generation - 1 if self._entries else None,
+                "titles": self._size,
+                "max_generations": self.max_generations,
+                "max_titles": self.max_titles,
+            }
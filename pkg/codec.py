@@ -0,0 +1,94 @@
+"""响应 / 请求编码协商 — JSON（默认）与 MessagePack（可选依赖 msgpack）
+
+客户端以 Accept: application/msgpack 请求二进制响应，
+以 Content-Type: application/msgpack 发送请求体；未安装 msgpack 时一律走 JSON。
+"""
+
+import json
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+
+from pkg.models import BatchRequestItem
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+
+class MsgPackResponse(Response):
+    media_type = MSGPACK_MEDIA_TYPES[0]
+
+    def render(self, content) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+def _has_media_type(header: str, media_types: tuple[str, ...]) -> bool:
+    """header 中是否列出 media_types 之一（忽略参数与 q 值）"""
+    return any(
+        part.split(";", 1)[0].strip().lower() in media_types
+        for part in header.split(",")
+    )
+
+
+def wants_msgpack(request: Request) -> bool:
+    return msgpack is not None and _has_media_type(
+        request.headers.get("accept", ""), MSGPACK_MEDIA_TYPES
+    )
+
+
+def sends_msgpack(request: Request) -> bool:
+    return msgpack is not None and _has_media_type(
+        request.headers.get("content-type", ""), MSGPACK_MEDIA_TYPES
+    )
+
+
+def encode_response(
+    request: Request, content: dict, status_code: int = 200
+) -> Response:
+    """按 Accept 选择 MessagePack 或 JSON 响应"""
+    if wants_msgpack(request):
+        return MsgPackResponse(content=content, status_code=status_code)
+    return JSONResponse(content=content, status_code=status_code)
+
+
+def render_body(request: Request, content: dict) -> tuple[bytes, str]:
+    """按 Accept 序列化为 (响应体, media_type)，供预编码缓存使用"""
+    if wants_msgpack(request):
+        return msgpack.packb(content, use_bin_type=True), MsgPackResponse.media_type
+    # 与 JSONResponse.render 相同的紧凑格式
+    body = json.dumps(content, ensure_ascii=False, separators=(",", ":"))
+    return body.encode("utf-8"), JSONResponse.media_type
+
+
+def decode_batch_items(body: bytes) -> list[BatchRequestItem]:
+    """解码 MessagePack 的 BatchRequest 请求体。
+
+    只做字段类型检查后 model_construct，跳过 Pydantic 完整校验。
+    无法解码抛 ValueError，结构 / 字段类型不符抛 TypeError。
+    """
+    try:
+        data = msgpack.unpackb(body, raw=False)
+    except (msgpack.UnpackException, ValueError) as e:
+        raise ValueError(f"Invalid msgpack body: {e or type(e).__name__}") from None
+    requests = data.get("requests") if isinstance(data, dict) else None
+    if not isinstance(requests, list):
+        raise TypeError("'requests' must be a list")
+
+    items = []
+    for i, raw in enumerate(requests):
+        if not isinstance(raw, dict):
+            raise TypeError(f"requests[{i}] must be a map")
+        fields = {
+            "type": raw.get("type"),
+            "title": raw.get("title", ""),
+            "author": raw.get("author", ""),
+        }
+        for name, value in fields.items():
+            if not isinstance(value, str):
+                raise TypeError(f"requests[{i}].{name} must be a string")
+        items.append(BatchRequestItem.model_construct(**fields))
+    return items
@@ -1,6 +1,7 @@
 """配置与常量 — 阈值、路径、match_status 枚举"""
 
 import datetime
+import os
 from pathlib import Path
 
 from cache_middleware.logger_config import logger as cm_logger
@@ -37,20 +38,66 @@ PART_MATCH_THRESHOLD_DEFAULT = 0.65  # 公共子串长度 / 输入长度
 PART_MATCH_THRESHOLD_SHORT = 0.85
 
 FUZZY_MATCH_LENGTH_THRESHOLD = 15
-FUZZY_MATCH_THRESHOLD_DEFAULT = 0.6  # difflib cutoff
+FUZZY_MATCH_THRESHOLD_DEFAULT = 0.6  # 打分器 cutoff（difflib ratio / Indel ratio）
 FUZZY_MATCH_THRESHOLD_SHORT = 0.8
 
+FUZZY_AUTHOR_THRESHOLD = 0.8  # 作者模糊匹配 cutoff（ENABLE_FUZZY_AUTHOR）
+
 # --- 缓存设置 ---
 CACHE_MIN_REFRESH_INTERVAL_HOURS = 1  # 被动刷新：距上次查询超过 N 小时则触发
 CACHE_PATH = str(_PROJECT_ROOT / "cache/TitlesCache.json")
+# 目录 mtime 清单（ENABLE_SCAN_MANIFEST）
+SCAN_MANIFEST_PATH = str(_PROJECT_ROOT / "cache/ScanManifest.json")
 CACHE_REFRESH_INTERVAL_SECONDS = 3600 * 12  # 后台主动刷新周期
+RESULT_CACHE_SIZE = 4096  # 单条查询结果 LRU 容量（标题 / 作者各一份），0 为关闭
+TITLE_CHANGELOG_GENERATIONS = 64  # /api/titles/changes 可回溯的最多代数
+TITLE_CHANGELOG_MAX_TITLES = 200_000  # 变更日志中标题总数上限（超出丢弃最旧记录）
+SUGGEST_DEFAULT_K = 10  # /api/suggest 默认返回条数
+SUGGEST_MAX_K = 50
+SUGGEST_MAX_SCAN = 1024  # 前缀区间最多参与排序的条目数
+SUGGEST_FUZZY_MAX_GRAMS = 6  # 模糊补全只取查询中 posting list 最短的若干 gram
+SUGGEST_FUZZY_MAX_POSTINGS = 5000  # posting list 超过该长度的 gram 不参与模糊计数
+TOPK_FUZZY_MAX_CANDIDATES = 256  # top-k 的 FUZZY 阶段最多对共有 gram 最多的这些候选打分
+PAYLOAD_CACHE_SIZE = 16  # 预编码响应体缓存条目数（端点 × 表示），快照代数前进即清空
+PAYLOAD_MIN_COMPRESS_BYTES = 1024  # 小于此大小的响应体不压缩
+PAYLOAD_GZIP_LEVEL = 6
+PAYLOAD_BROTLI_QUALITY = 6  # 需安装 brotli；11 压缩率最高但大列表需数秒
+NEGATIVE_FILTER_CAPACITY = 100_000  # 标题未命中 Bloom filter 容量（满则重置），0 为关闭
+NEGATIVE_FILTER_FP_RATE = 1e-4  # 设计误判率：可匹配标题被误判为 MATCH_NO 的概率
+
+# --- 进程池（ENABLE_PROCESS_POOL）---
+PROCESS_POOL_WORKERS = os.cpu_count() or 1
+POOL_MIN_BATCH_SIZE = 32  # 少于此数的 batch 留在进程内执行
+POOL_MIN_CHUNK_SIZE = 16  # 单个 worker 任务的最少请求数
+
+# --- 流式 batch（/query/batch/stream）---
+STREAM_CHUNK_SIZE = 8  # 攒够该数量的新请求再提交；流水线空闲时立即提交
+STREAM_MAX_INFLIGHT = 4  # 同时执行中的块数上限，超出时先产出已完成的结果
+
+# --- 两层索引（ENABLE_DELTA_INDEX）---
+# delta 层（追加 + 墓碑）上限：单次变更超过时直接全量重建，累计超过时立即合并
+DELTA_INDEX_MAX_SIZE = 1024
+DELTA_INDEX_COMPACT_DELAY_SECONDS = 300  # delta 层存在超过该时长后由后台合并进 base
+DELTA_INDEX_CHECK_INTERVAL_SECONDS = 5
+
+# --- 文件监听（ENABLE_WATCHER）---
+WATCHER_DEBOUNCE_SECONDS = 2.0  # 首个事件后等待该时长，合并窗口内的全部变更一次应用
+WATCHER_POLL_INTERVAL_SECONDS = 60  # inotify 不可用时按目录 mtime 轮询的周期
 
 # --- 功能开关（从 config.py 导入，在此重新导出供其他模块使用）---
 from config import (  # noqa: F401
     DEBUG,
     ENABLE_DCACHE,
+    ENABLE_DELTA_INDEX,
+    ENABLE_FUZZY_AUTHOR,
+    ENABLE_PACKED_INDEX,
+    ENABLE_PROCESS_POOL,
     ENABLE_RECORD_BATCH_REQUEST,
+    ENABLE_SCAN_MANIFEST,
+    ENABLE_SUFFIX_ARRAY,
     ENABLE_TRIGRAM_INDEX,
+    ENABLE_WATCHER,
+    FUZZY_SCORER,
     JUST_LOAD,
 )
 
@@ -0,0 +1,129 @@
+"""两层（base + delta）索引 — 增量更新只写小的 delta 层，后台合并（compaction）重建 base
+
+base 为全量构建的不可变索引；delta 层按键记录新增的标题索引与被删除（墓碑）的标题索引：
+    get(key) = (base[key] ∪ added[key]) − removed[key]
+新增标题的索引位于 base 之后（追加），合并结果仍升序；删除只影响该标题自身的键，
+其余键的查询直接返回 base 的 posting list，无额外开销。
+每次更新复制 delta 层的字典（规模受 compaction 阈值约束），快照间互不影响，读取侧无需加锁。
+"""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterable
+
+from pkg.packed_index import PackedNgramIndex
+
+
+def _without(postings, removed: array) -> array:
+    """升序 postings 去掉 removed（升序）中的元素"""
+    out = array("I")
+    start = 0
+    for idx in removed:
+        pos = bisect_left(postings, idx, start)
+        out.extend(postings[start:pos])
+        start = pos + 1 if pos < len(postings) and postings[pos] == idx else pos
+    out.extend(postings[start:])
+    return out
+
+
+class LayeredIndex:
+    """键 → 升序 posting list 的两层索引，接口与 NgramIndex 的 get / in 一致。
+
+    用于标题 n-gram 索引、作者 → 标题索引、范围索引的去数字 trigram 倒排。
+    """
+
+    __slots__ = ("added", "base", "removed")
+
+    def __init__(self, base, added: dict | None = None, removed: dict | None = None):
+        self.base = base
+        self.added: dict[str, array] = added or {}
+        self.removed: dict[str, array] = removed or {}
+
+    def get(self, key: str, default=None):
+        postings = self.base.get(key)
+        extra = self.added.get(key)
+        if extra is not None:
+            if postings is None:
+                postings = extra
+            else:
+                merged = array("I")
+                merged.extend(postings)
+                merged.extend(extra)  # 新增索引均大于 base 中的索引，拼接后仍升序
+                postings = merged
+        removed = self.removed.get(key)
+        if removed is not None and postings is not None:
+            postings = _without(postings, removed)
+        return default if postings is None else postings
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def with_changes(
+        self, added: Iterable[tuple[str, int]], removed: Iterable[tuple[str, int]]
+    ) -> "LayeredIndex":
+        """返回应用了 (键, 标题索引) 新增 / 删除后的新索引（写时复制，自身不变）"""
+        new_added = dict(self.added)
+        new_removed = dict(self.removed)
+        for key, idx in added:
+            postings = new_added.get(key)
+            new_added[key] = (
+                array("I", [idx]) if postings is None else postings + array("I", [idx])
+            )
+        for key, idx in removed:
+            postings = new_removed.get(key)
+            if postings is None:
+                new_removed[key] = array("I", [idx])
+            else:
+                pos = bisect_left(postings, idx)
+                new_removed[key] = postings[:pos] + array("I", [idx]) + postings[pos:]
+        return LayeredIndex(self.base, new_added, new_removed)
+
+    def materialize(self):
+        """合并为单层索引（dict 或 CSR，与 base 布局相同），供共享内存发布"""
+        overrides = {
+            key: self.get(key) for key in self.added.keys() | self.removed.keys()
+        }
+        if isinstance(self.base, PackedNgramIndex):
+            return self.base.with_overrides(overrides)
+        merged = dict(self.base)
+        for key, postings in overrides.items():
+            if postings:
+                merged[key] = postings
+            else:
+                merged.pop(key, None)
+        return merged
+
+    @classmethod
+    def wrap(cls, index) -> "LayeredIndex":
+        return index if isinstance(index, LayeredIndex) else cls(index)
+
+
+class LayeredIntervals:
+    """区间树 + 追加的区间列表，stab 结果排除墓碑（接口同 IntervalIndex.stab）"""
+
+    __slots__ = ("base", "extra", "tombstones")
+
+    def __init__(
+        self, base, extra: tuple = (), tombstones: frozenset[int] = frozenset()
+    ):
+        self.base = base
+        self.extra: tuple[tuple[int, int, int], ...] = extra
+        self.tombstones = tombstones
+
+    @property
+    def size(self) -> int:
+        return self.base.size + len(self.extra)
+
+    def stab(self, x: int) -> list[int]:
+        tombstones = self.tombstones
+        result = [idx for idx in self.base.stab(x) if idx not in tombstones]
+        result.extend(
+            idx
+            for start, end, idx in self.extra
+            if start <= x <= end and idx not in tombstones
+        )
+        return result
+
+    @classmethod
+    def wrap(cls, intervals) -> "LayeredIntervals":
+        return intervals if isinstance(intervals, LayeredIntervals) else cls(intervals)
@@ -0,0 +1,85 @@
+"""列表分页检索 — /api/titles、/api/authors 的 offset / limit / prefix / contains
+
+prefix：快照上的 PrefixIndex bisect 出连续区间，O(log n + page)；
+contains：不区分大小写（按 str.lower 比较，与 admin 页面的高亮一致）。n-gram 索引建在原文上，
+每个 gram 的大小写变体取并集、gram 之间求交得到候选再逐个校验；总数需要校验全部候选，
+耗时 O(候选数)，但只保留本页条目，其余命中仅计数。无法用索引时回退线性扫描。
+未传入索引（快照带 delta 层时索引与列表下标不对应）同样回退线性扫描。
+"""
+
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+from pkg.matching import _folded_candidates
+from pkg.packed_index import NgramIndex
+from pkg.prefix_index import PrefixIndex
+
+
+def _contains_candidates(
+    values: list[str],
+    needle: str,
+    trigram_index: NgramIndex | None,
+    bigram_index: NgramIndex | None,
+) -> Iterator[int]:
+    """小写后包含 needle（已小写）的下标（升序）"""
+    candidates = None
+    if trigram_index is not None:
+        candidates = _folded_candidates(needle, trigram_index, bigram_index)
+    if candidates is None:
+        candidates = range(len(values))
+    return (idx for idx in candidates if needle in values[idx].lower())
+
+
+def _page_and_count(
+    hits: Iterable[str], offset: int, stop: int | None
+) -> tuple[list[str], int]:
+    """取 hits[offset:stop]，其余命中只计数不保留"""
+    it = iter(hits)
+    skipped = sum(1 for _ in islice(it, offset))
+    page = list(islice(it, None if stop is None else stop - offset))
+    return page, skipped + len(page) + sum(1 for _ in it)
+
+
+def list_page(
+    values: list[str],
+    offset: int = 0,
+    limit: int | None = None,
+    prefix: str = "",
+    contains: str = "",
+    prefix_index: PrefixIndex | None = None,
+    trigram_index: NgramIndex | None = None,
+    bigram_index: NgramIndex | None = None,
+) -> tuple[list[str], int]:
+    """返回 (本页条目, 满足条件的总数)。
+
+    无条件时按原列表顺序；带 prefix 时按 casefold 字典序；
+    仅带 contains 时按原列表顺序，候选取自 n-gram 索引（contains 不区分大小写）。
+    """
+    stop = None if limit is None else offset + limit
+    contains = contains.lower()
+    if prefix and prefix_index is None:
+        folded = prefix.casefold()
+        # 与 PrefixIndex 的顺序一致：casefold 键升序，相同键保持原顺序
+        hits = sorted(
+            (v for v in values if v.casefold().startswith(folded)), key=str.casefold
+        )
+        if contains:
+            hits = [v for v in hits if contains in v.lower()]
+        return hits[offset:stop], len(hits)
+    if prefix:
+        lo, hi = prefix_index.range(prefix)
+        order = prefix_index.order
+        if not contains:
+            end = hi if stop is None else min(lo + stop, hi)
+            return [values[idx] for idx in order[min(lo + offset, hi) : end]], hi - lo
+        hits = (values[idx] for idx in order[lo:hi] if contains in values[idx].lower())
+        return _page_and_count(hits, offset, stop)
+    if contains:
+        hits = (
+            values[idx]
+            for idx in _contains_candidates(
+                values, contains, trigram_index, bigram_index
+            )
+        )
+        return _page_and_count(hits, offset, stop)
+    return values[offset:stop], len(values)
@@ -93,7 +93,7 @@ class ServerManager:
                 ),
                 pystray.MenuItem(
                     lambda text: (
-                        f"立即刷新缓存 ({len(cache_store.get_snapshot().titles)})"
+                        f"立即刷新缓存 ({len(cache_store.get_snapshot().live_titles)})"
                     ),
                     self._on_refresh_cache,
                 ),
@@ -1,43 +1,56 @@
 """匹配引擎 — 精确匹配、部分匹配、模糊匹配，以及 trigram 候选过滤"""
 
 import difflib
+import heapq
 import math
-import re
+import string
+import sys
+from bisect import bisect_left
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from itertools import product
+from typing import NamedTuple
 
 from config import IgnoredNames
+
+from keyword_matcher import KeywordMatcher
 from pkg.cache import _extract_ngrams, cache_store
 from pkg.constants import (
     ENABLE_TRIGRAM_INDEX,
+    FUZZY_AUTHOR_THRESHOLD,
     FUZZY_MATCH_LENGTH_THRESHOLD,
     FUZZY_MATCH_THRESHOLD_DEFAULT,
     FUZZY_MATCH_THRESHOLD_SHORT,
+    FUZZY_SCORER,
     PART_MATCH_LENGTH_THRESHOLD,
     PART_MATCH_THRESHOLD_DEFAULT,
     PART_MATCH_THRESHOLD_SHORT,
+    logger,
+)
+from pkg.models import CacheSnapshot
+from pkg.packed_index import NgramIndex
+from pkg.range_index import _strip_digits
+from pkg.scorer import SCORED_SCORERS, SCORERS
+from pkg.suffix_automaton import SuffixAutomaton
+from pkg.text import (
+    _normalize_range_separators,
+    extract_number_from_string,
+    extract_number_range_from_string,
 )
 
+try:
+    import numpy as np
+except ImportError:  # 可选依赖：未安装时 BatchCandidates 退回纯 Python 求交 / 并
+    np = None
+
 # ============================================================
 # 辅助函数
 # ============================================================
 
-# 数字范围分隔符归一化表：将所有变体统一映射到 '-'
-_RANGE_SEP_TRANS = str.maketrans(
-    {
-        "～": "-",
-        "〜": "-",
-        "－": "-",
-        "~": "-",
-    }
-)
-
-
-def _normalize_range_separators(s: str) -> str:
-    """将各种数字范围分隔符统一转换为 '-'，确保缓存和输入一致匹配。"""
-    return s.translate(_RANGE_SEP_TRANS)
-
 
 def check_author_in_title(title: str, author: str) -> bool:
-    return author == "" or author in title
+    """标题是否提及作者（不区分大小写）"""
+    return author == "" or author.lower() in title.lower()
 
 
 def _sanitize_title(title: str) -> str:
@@ -45,55 +58,57 @@ def _sanitize_title(title: str) -> str:
     return title.replace("?", "_")
 
 
+# IgnoredNames 编译为多模式自动机（config.py 变更时进程重载，随之重建）
+_ignored_names_matcher = KeywordMatcher(IgnoredNames)
+
+
 def is_title_ignored(title: str) -> bool:
     """检查标题是否包含需忽略的关键词"""
-    return any(kw in title for kw in IgnoredNames)
+    return _ignored_names_matcher.search(title)
 
 
-def extract_number_from_string(s: str) -> int | None:
-    """从字符串中提取数字，优先 #数字 格式，其次末位含数字 token"""
-    m = re.search(r"#(\d+)", s)
-    if m:
-        return int(m.group(1))
+# ============================================================
+# 匹配函数
+# ============================================================
 
-    parts = s.split(" ")
-    for p in reversed(parts):
-        m = re.search(r"\d+", p)
-        if m:
-            return int(m.group())
 
-    # 兜底：字符串中任意数字
-    m = re.search(r"\d+", s)
-    return int(m.group()) if m else None
+class ExactQuery(NamedTuple):
+    """精确匹配的输入侧预处理结果，每次查询只计算一次"""
 
+    text: str  # 归一化后的输入
+    number: int | None  # 输入中的数字（数字范围匹配用）
+    residue: str  # 去掉该数字后的剩余部分
 
-def extract_number_range_from_string(s: str) -> tuple[int, int] | None:
-    """提取数字范围（如 1-3, 01~05），过滤日期和序数词"""
-    s = _normalize_range_separators(s)
 
-    for m in re.finditer(r"(\d+)\s*-\s*(\d+)", s):
-        start = int(m.group(1))
-        end = int(m.group(2))
-        if start > end:
-            continue
+def prepare_exact_query(input_title: str) -> ExactQuery:
+    """归一化输入并提取数字，供 exactly_match_prepared 逐候选复用"""
+    ni = _normalize_range_separators(input_title)
+    number = extract_number_from_string(ni)
+    residue = ni.replace(str(number), "") if number is not None else ""
+    return ExactQuery(ni, number, residue)
 
-        # 过滤：日期格式（年份 1900-2100）
-        if 1900 <= start <= 2100:
-            continue
 
-        # 过滤：序数词（1st, 2nd, 21th 等）
-        after = s[m.end() : m.end() + 3].lower()
-        if re.match(r"(st|nd|rd|th)", after):
-            continue
+def exactly_match_prepared(
+    nc: str, cached_range: tuple[int, int] | None, query: ExactQuery
+) -> bool:
+    """精确匹配（预处理版）：nc / cached_range 取自快照的归一化标题与数字范围"""
+    if not nc or not query.text:
+        return False
 
-        return start, end
+    # 直接子串匹配
+    if query.text in nc:
+        return True
 
-    return None
+    # 数字范围匹配：输入"3" 命中了缓存中的 "1-3" → 检查数字是否在范围内
+    if not cached_range:
+        return False
 
+    range_start, range_end = cached_range
+    if query.number is None or not range_start <= query.number <= range_end:
+        return False
 
-# ============================================================
-# 匹配函数
-# ============================================================
+    # 确认去掉数字后的剩余部分仍是子串（避免"vol.3" 去数字后 "vol." 不匹配）
+    return bool(query.residue and query.residue in nc)
 
 
 def exactly_match(cached_title: str, input_title: str) -> bool:
@@ -103,55 +118,78 @@ def exactly_match(cached_title: str, input_title: str) -> bool:
 
     # 归一化分隔符，统一 1-3 / 1~3 / 1～3
     nc = _normalize_range_separators(cached_title)
-    ni = _normalize_range_separators(input_title)
-
-    # 直接子串匹配
-    if ni in nc:
-        return True
+    return exactly_match_prepared(
+        nc, extract_number_range_from_string(nc), prepare_exact_query(input_title)
+    )
 
-    # 数字范围匹配：输入"3" 命中了缓存中的 "1-3" → 提取范围并检查数字是否在范围内
-    range_match = extract_number_range_from_string(nc)
-    if not range_match:
-        return False
 
-    range_start, range_end = range_match
-    query_number = extract_number_from_string(ni)
-    if query_number is None or query_number < range_start or query_number > range_end:
-        return False
+def part_min_length(input_title: str) -> int:
+    """PART 判定所需的最短公共子串长度"""
+    threshold = PART_MATCH_THRESHOLD_DEFAULT
+    if len(input_title) < PART_MATCH_LENGTH_THRESHOLD:
+        threshold = PART_MATCH_THRESHOLD_SHORT
+    return math.ceil(len(input_title) * threshold)
 
-    # 确认去掉数字后的剩余部分仍是子串（避免"vol.3" 去数字后 "vol." 不匹配）
-    query_without_number = ni.replace(str(query_number), "")
-    return bool(query_without_number and query_without_number in nc)
 
+def part_match(
+    cached_title: str,
+    input_title: str,
+    automaton: SuffixAutomaton | None = None,
+) -> tuple[bool, str]:
+    """部分匹配：最长公共子串长度 ≥ 阈值。
 
-def part_match(cached_title: str, input_title: str) -> tuple[bool, str]:
+    automaton 为 input_title 的后缀自动机；批量比对同一输入时由调用方建一次复用。
+    """
     if not input_title or not cached_title:
         return False, ""
 
-    threshold = PART_MATCH_THRESHOLD_DEFAULT
-    if len(input_title) < PART_MATCH_LENGTH_THRESHOLD:
-        threshold = PART_MATCH_THRESHOLD_SHORT
-
-    min_len = math.ceil(len(input_title) * threshold)
+    min_len = part_min_length(input_title)
 
-    match = difflib.SequenceMatcher(
-        None, input_title, cached_title
-    ).find_longest_match()
-    if match.size >= min_len:
-        return True, input_title[match.a : match.a + match.size]
+    if automaton is None:
+        automaton = SuffixAutomaton(input_title)
+    start, size = automaton.longest_common_substring(cached_title)
+    if size >= min_len:
+        return True, input_title[start : start + size]
 
     return False, ""
 
 
+if FUZZY_SCORER != "compare" and FUZZY_SCORER not in SCORERS:
+    logger.warning(f"Unknown FUZZY_SCORER '{FUZZY_SCORER}', falling back to difflib")
+
+
+def _close_matches(
+    input_title: str, cached_titles: list[str], threshold: float, n: int = 3
+) -> list[str]:
+    """按 FUZZY_SCORER 选择打分器取前 n 个候选；compare 模式两者都跑并记录差异"""
+    if FUZZY_SCORER == "compare":
+        matches = difflib.get_close_matches(
+            input_title, cached_titles, n=n, cutoff=threshold
+        )
+        other = SCORERS["bitparallel"](
+            input_title, cached_titles, n=n, cutoff=threshold
+        )
+        if other != matches:
+            logger.debug(
+                f"FUZZY SCORER DIFF '{input_title}': difflib={matches} bitparallel={other}"
+            )
+        return matches
+
+    get_close_matches = SCORERS.get(FUZZY_SCORER, difflib.get_close_matches)
+    return get_close_matches(input_title, cached_titles, n=n, cutoff=threshold)
+
+
+def _fuzzy_threshold(input_title: str) -> float:
+    if len(input_title) < FUZZY_MATCH_LENGTH_THRESHOLD:
+        return FUZZY_MATCH_THRESHOLD_SHORT
+    return FUZZY_MATCH_THRESHOLD_DEFAULT
+
+
 def fuzz_match(
     cached_titles: list[str], input_title: str, input_author: str
 ) -> tuple[bool, str]:
-    threshold = FUZZY_MATCH_THRESHOLD_DEFAULT
-    if len(input_title) < FUZZY_MATCH_LENGTH_THRESHOLD:
-        threshold = FUZZY_MATCH_THRESHOLD_SHORT
-    matches = difflib.get_close_matches(
-        input_title, cached_titles, n=3, cutoff=threshold
-    )
+    threshold = _fuzzy_threshold(input_title)
+    matches = _close_matches(input_title, cached_titles, threshold)
     for fuzzy_match in matches:
         if not check_author_in_title(fuzzy_match, input_author):
             continue
@@ -159,6 +197,14 @@ def fuzz_match(
     return False, ""
 
 
+def fuzz_match_scored(
+    cached_titles: list[str], input_title: str, n: int
+) -> list[tuple[float, str]]:
+    """模糊匹配前 n 名 (score, title)，打分器同 FUZZY_SCORER（compare 模式按 difflib）"""
+    scored = SCORED_SCORERS.get(FUZZY_SCORER, SCORED_SCORERS["difflib"])
+    return scored(input_title, cached_titles, n=n, cutoff=_fuzzy_threshold(input_title))
+
+
 # ============================================================
 # n-gram 索引辅助
 # ============================================================
@@ -171,59 +217,148 @@ def fuzz_match(
 
 def _resolve_grams(
     input_title: str,
-) -> tuple[list[str], dict[str, frozenset[int]]] | None:
+) -> tuple[list[str], NgramIndex] | None:
     """计算标题 n-gram 并返回 (排序后的 gram 列表, 对应索引)。
 
     无法使用索引时返回 None（ENABLE_TRIGRAM_INDEX=False 或标题太短）。
     """
+    snapshot = cache_store.get_snapshot()
+    return _pick_grams(input_title, snapshot.trigram_index, snapshot.bigram_index)
+
+
+def _pick_grams(
+    text: str, trigram_index: NgramIndex, bigram_index: NgramIndex
+) -> tuple[list[str], NgramIndex] | None:
+    """按长度选 trigram / bigram 索引，返回 (排序后的 gram 列表, 对应索引)"""
     if not ENABLE_TRIGRAM_INDEX:
         return None
-    title_len = len(input_title)
-    if title_len >= 3:
-        n, index = 3, cache_store.get_snapshot().trigram_index
-    elif title_len == 2:
-        n, index = 2, cache_store.get_snapshot().bigram_index
+    text_len = len(text)
+    if text_len >= 3:
+        n, index = 3, trigram_index
+    elif text_len == 2:
+        n, index = 2, bigram_index
     else:
         return None
-    grams = _extract_ngrams(input_title, n=n)
+    grams = _extract_ngrams(text, n=n)
     if not grams:
         return None
-    sorted_grams = sorted(grams, key=lambda g: len(index.get(g, frozenset())))
-    return sorted_grams, index
-
-
-def _intersect_index(
-    index: dict[str, frozenset[int]], grams: list[str]
-) -> frozenset[int]:
-    """对全部 gram 的索引集合取交集，任一 gram 缺失则返回空。grams 已按 posting list 大小升序排列"""
+    return _sort_grams(index, grams), index
+
+
+def _sort_grams(index: NgramIndex, grams: set[str]) -> list[str]:
+    """按 posting list 大小升序排列 grams（缺失的 gram 长度为 0，排最前可立即短路）"""
+    return sorted(grams, key=lambda g: len(index.get(g, ())))
+
+
+# posting list 长度比超过该值时用 galloping 查找，否则整体哈希求交
+_GALLOP_RATIO = 32
+
+
+def _intersect_sorted(small: Sequence[int], large: Sequence[int]) -> list[int]:
+    """两个升序 posting list 求交，结果升序"""
+    if len(small) * _GALLOP_RATIO < len(large):
+        # galloping：对 small 的每个元素在 large 中指数步进后二分，O(m log(n/m))
+        out: list[int] = []
+        lo = 0
+        n = len(large)
+        for x in small:
+            bound = 1
+            while lo + bound < n and large[lo + bound] < x:
+                bound *= 2
+            lo = bisect_left(large, x, lo, min(lo + bound + 1, n))
+            if lo == n:
+                break
+            if large[lo] == x:
+                out.append(x)
+                lo += 1
+        return out
+    # 规模相近时 C 层哈希求交更快，交集不大于 small，排序开销可忽略
+    return sorted(set(small).intersection(large))
+
+
+def _intersect_index(index: NgramIndex, grams: list[str]) -> Sequence[int]:
+    """对全部 gram 的 posting list 取交集（升序），任一 gram 缺失则返回空。grams 已按 posting list 大小升序排列"""
     if not grams:
-        return frozenset()
+        return []
     it = iter(grams)
     result = index.get(next(it))
     if result is None:
-        return frozenset()
+        return []
     for gram in it:
-        s = index.get(gram)
-        if s is None:
-            return frozenset()
-        result = result & s
+        postings = index.get(gram)
+        if postings is None:
+            return []
+        result = _intersect_sorted(result, postings)
         if not result:
-            return frozenset()
+            return []
     return result
 
 
 def _union_index(
-    index: dict[str, frozenset[int]], grams: list[str], max_size: int
-) -> frozenset[int]:
-    """对全部 gram 的索引集合取并集，超 max_size 返回已收集的部分结果。grams 已按 posting list 大小升序排列"""
+    index: NgramIndex, grams: list[str], max_size: int
+) -> list[int] | None:
+    """对全部 gram 的 posting list 取并集（升序），超 max_size 返回 None。grams 已按 posting list 大小升序排列
+
+    k 路归并在 CPython 中逐元素比较较慢，这里以 C 层 set.update 合并后一次排序输出。
+    """
     candidates: set[int] = set()
     for gram in grams:
-        s = index.get(gram)
-        if s:
-            candidates.update(s)
+        postings = index.get(gram)
+        if postings:
+            if len(postings) > max_size:
+                return None
+            candidates.update(postings)
             if len(candidates) > max_size:
                 return None
-    return frozenset(candidates) if candidates else frozenset()
+    return sorted(candidates)
+
+
+# 小写后等于（或以之开头）该字符的原文字符：ASCII 字母的大小写，
+# 以及 KELVIN SIGN（小写为 k）、İ（小写为 i + U+0307）
+_LOWER_VARIANTS = {c: c + c.upper() for c in string.ascii_lowercase}
+_LOWER_VARIANTS["k"] += "\u212a"
+_LOWER_VARIANTS["i"] += "\u0130"
+
+
+def _char_variants(c: str) -> str | None:
+    """原文中小写后得到 c 的全部字符；无法穷举（非 ASCII 的有大小写字符）时返回 None"""
+    if c in _LOWER_VARIANTS:
+        return _LOWER_VARIANTS[c]
+    # 无大小写的字符（CJK、数字、标点）只能原样出现；U+0307 可由 İ 小写产生
+    if c.lower() == c.upper() and c != "\u0307":
+        return c
+    return None
+
+
+def _folded_candidates(
+    needle: str, trigram_index: NgramIndex, bigram_index: NgramIndex
+) -> list[int] | None:
+    """小写 needle 的候选下标（升序）：各 gram 的大小写变体 posting list 取并集后求交。
+
+    含无法穷举变体字符的 gram 跳过（只会放宽候选）；没有可用 gram 时返回 None。
+    """
+    if not ENABLE_TRIGRAM_INDEX or len(needle) < 2:
+        return None
+    n, index = (3, trigram_index) if len(needle) >= 3 else (2, bigram_index)
+    postings = []
+    for gram in _extract_ngrams(needle, n):
+        variants = [_char_variants(c) for c in gram]
+        if None in variants:
+            continue
+        keys = ["".join(chars) for chars in product(*variants)]
+        hits = _union_index(index, keys, sys.maxsize)
+        if not hits:
+            return []
+        postings.append(hits)
+    if not postings:
+        return None
+    postings.sort(key=len)
+    result = postings[0]
+    for hits in postings[1:]:
+        result = _intersect_sorted(result, hits)
+        if not result:
+            break
+    return result
 
 
 # ============================================================
@@ -231,23 +366,299 @@ def _union_index(
 # ============================================================
 
 
-def exact_candidates(input_title: str) -> list[int]:
-    """精确候选：包含全部 n-gram 的标题索引，回退全量扫描"""
+def exact_candidates(input_title: str) -> Sequence[int]:
+    """精确候选：包含全部 n-gram 的标题索引（升序），回退全量扫描"""
     snapshot = cache_store.get_snapshot()
     prepared = _resolve_grams(input_title)
     if prepared is None:
         return snapshot.all_indices
     grams, index = prepared
-    return sorted(_intersect_index(index, grams))
+    return _intersect_index(index, grams)
+
+
+def exact_hits(normalized_title: str) -> list[int] | None:
+    """后缀数组精确命中：包含归一化输入的标题索引（升序，已确认子串关系）。
+
+    未构建后缀数组时返回 None，由调用方回退 exact_candidates + exactly_match_prepared。
+    后缀数组只覆盖 base：排除墓碑，delta 层追加的标题逐个校验。
+    """
+    snapshot = cache_store.get_snapshot()
+    suffix_array = snapshot.suffix_array
+    if suffix_array is None:
+        return None
+    hits = suffix_array.find(normalized_title)
+    if not snapshot.has_delta:
+        return hits
+    tombstones = snapshot.tombstones
+    normalized = snapshot.normalized_titles
+    hits = [idx for idx in hits if idx not in tombstones]
+    hits.extend(
+        idx
+        for idx in snapshot.delta_slots
+        if idx not in tombstones and normalized_title in normalized[idx]
+    )
+    return hits
+
+
+def range_candidates(query: ExactQuery) -> list[int]:
+    """数字范围候选：范围包含输入数字、且去数字 trigram 全部命中的标题索引（升序）。
+
+    仅在索引模式下生效（全量扫描模式本就覆盖范围分支），结果仍需 exactly_match_prepared 校验。
+    """
+    snapshot = cache_store.get_snapshot()
+    range_index = snapshot.range_index
+    if range_index is None or query.number is None or not query.residue:
+        return []
+
+    grams = _extract_ngrams(_strip_digits(query.residue), n=3)
+    if not grams:
+        # 剩余部分太短无法过滤，仅按区间树定位
+        return sorted(range_index.intervals.stab(query.number))
+
+    index = range_index.gram_index
+    number = query.number
+    title_ranges = snapshot.title_ranges
+    return [
+        idx
+        for idx in _intersect_index(index, _sort_grams(index, grams))
+        if title_ranges[idx][0] <= number <= title_ranges[idx][1]
+    ]
+
+
+def author_title_indices(input_author: str) -> Sequence[int] | None:
+    """可能通过 check_author_in_title 的标题索引（升序），用于在匹配前剪枝候选。
+
+    取作者字符串各 n-gram 大小写变体的交集：小写后包含该子串的标题（多作者、社团名、
+    标题中提及等）必在其中。作者为空或无法使用索引（太短 / 未启用）时返回 None，表示不剪枝。
+    """
+    if not input_author:
+        return None
+    snapshot = cache_store.get_snapshot()
+    return _folded_candidates(
+        input_author.lower(), snapshot.trigram_index, snapshot.bigram_index
+    )
+
+
+def restrict_candidates(
+    candidates: Sequence[int], allowed: Sequence[int] | None
+) -> Sequence[int]:
+    """候选与允许集合（均升序）求交；allowed 为 None 时原样返回"""
+    if allowed is None:
+        return candidates
+    if len(candidates) < len(allowed):
+        return _intersect_sorted(candidates, allowed)
+    return _intersect_sorted(allowed, candidates)
+
+
+def in_title_order(snapshot: CacheSnapshot, candidates: Sequence[int]) -> Iterable[int]:
+    """按全量重建时的标题顺序（逆序）遍历升序候选，首个命中与 compaction 前后一致。
+
+    base 标题本身按逆序排列，其索引升序即标题顺序；delta 层追加的标题排序后归并进来。
+    """
+    base_size = snapshot.base_size
+    if base_size is None:
+        return candidates
+    split = bisect_left(candidates, base_size)
+    if split == len(candidates):
+        return candidates
+    key = snapshot.titles.__getitem__
+    delta = sorted(candidates[split:], key=key, reverse=True)
+    return heapq.merge(candidates[:split], delta, key=key, reverse=True)
+
+
+def common_substring_bounds(input_title: str) -> tuple[Counter[int], int] | None:
+    """各标题与输入最长公共子串长度的上界，返回 (标题索引 → 共有 gram 计数, n)。
+
+    长度 L ≥ n 的公共子串含 L-n+1 个 n-gram，均同时出现在两侧，
+    故 L ≤ n-1 + Σ(共有 gram 在输入中的出现次数)；不在计数中的标题上界为 n-1。
+    无法使用索引时返回 None。
+    """
+    prepared = _resolve_grams(input_title)
+    if prepared is None:
+        return None
+    grams, index = prepared
+    n = len(grams[0])
+    occurrences = Counter(
+        input_title[i : i + n] for i in range(len(input_title) - n + 1)
+    )
+    shared: Counter[int] = Counter()
+    for gram in grams:
+        postings = index.get(gram)
+        if postings:
+            for _ in range(occurrences[gram]):
+                shared.update(postings)  # C 层计数
+    return shared, n
 
 
 def fuzzy_candidates(input_title: str) -> list[int]:
-    """模糊候选：包含任一 n-gram 的标题索引"""
+    """模糊候选：包含任一 n-gram 的标题索引（升序）"""
     snapshot = cache_store.get_snapshot()
     prepared = _resolve_grams(input_title)
     if prepared is None:
         return snapshot.all_indices
     grams, index = prepared
-    half = len(snapshot.titles) // 2
+    half = snapshot.live_count // 2
     result = _union_index(index, grams, half)
-    return snapshot.all_indices if result is None else sorted(result)
+    return snapshot.all_indices if result is None else result
+
+
+# 无 NumPy 时 batch 级候选与逐条计算开销相同，run_batch_items 据此跳过
+BATCH_VECTORIZED = np is not None
+
+
+class BatchCandidates:
+    """batch 级候选生成：一个 batch 内全部标题查询共享 posting list 的读取。
+
+    构建时汇总所有查询的 gram，每个 gram 的 posting list 只从索引取一次；
+    安装了 NumPy 时，交集 / 并集在 posting list 的零拷贝 ndarray 视图上整体计算。
+    exact / fuzzy 的结果与 exact_candidates / fuzzy_candidates 完全一致。
+    """
+
+    def __init__(self, snapshot: CacheSnapshot, titles: Iterable[str]):
+        self.generation = snapshot.generation
+        self._all_indices = snapshot.all_indices
+        self._title_count = len(snapshot.titles)
+        self._max_union = snapshot.live_count // 2  # 与 fuzzy_candidates 的并集上限一致
+        # 查询 → 按 posting list 大小升序的 grams；None 表示无法使用索引
+        self._grams: dict[str, list[str] | None] = {}
+        # gram → posting list（trigram / bigram 长度不同，共用一个字典不会冲突）
+        self._postings: dict[str, Sequence[int] | None] = {}
+        self._arrays: dict = {}  # gram → ndarray 视图（NumPy 路径，按需创建）
+        self._mask = None  # 并集用的布尔位图，整批复用
+        self._exact: dict[str, Sequence[int]] = {}
+        self._fuzzy: dict[str, list[int]] = {}
+
+        postings = self._postings
+        for title in titles:
+            if title in self._grams:
+                continue
+            grams = self._extract(title)
+            if grams is None:
+                self._grams[title] = None
+                continue
+            n = len(next(iter(grams)))
+            index = snapshot.trigram_index if n == 3 else snapshot.bigram_index
+            for gram in grams:
+                if gram not in postings:
+                    postings[gram] = index.get(gram)
+            self._grams[title] = sorted(grams, key=lambda g: len(postings[g] or ()))
+
+    @staticmethod
+    def _extract(text: str) -> set[str] | None:
+        """与 _pick_grams 相同的 gram 选择规则"""
+        if not ENABLE_TRIGRAM_INDEX or len(text) < 2:
+            return None
+        return _extract_ngrams(text, n=3 if len(text) >= 3 else 2) or None
+
+    def _array(self, gram: str):
+        arr = self._arrays.get(gram)
+        if arr is None:
+            arr = self._arrays[gram] = np.frombuffer(
+                self._postings[gram], dtype=np.uintc
+            )
+        return arr
+
+    def _lookup(self, title: str) -> list[str] | None:
+        if title not in self._grams:
+            raise KeyError(title)
+        return self._grams[title]
+
+    def exact(self, title: str) -> Sequence[int]:
+        """等价于 exact_candidates(title)"""
+        result = self._exact.get(title)
+        if result is None:
+            grams = self._lookup(title)
+            if grams is None:
+                result = self._all_indices
+            elif np is None:
+                result = _intersect_index(self._postings, grams)
+            else:
+                result = self._intersect_np(grams)
+            self._exact[title] = result
+        return result
+
+    def _intersect_np(self, grams: list[str]) -> list[int]:
+        if any(not self._postings[g] for g in grams):
+            return []
+        result = self._array(grams[0])
+        for gram in grams[1:]:
+            # grams 按长度升序，result 不长于 large：逐元素二分定位，O(m log n)
+            large = self._array(gram)
+            pos = np.minimum(np.searchsorted(large, result), len(large) - 1)
+            result = result[large[pos] == result]
+            if not result.size:
+                return []
+        return result.tolist()
+
+    def fuzzy(self, title: str) -> list[int]:
+        """等价于 fuzzy_candidates(title)"""
+        result = self._fuzzy.get(title)
+        if result is None:
+            grams = self._lookup(title)
+            if grams is not None:
+                max_size = self._max_union
+                if np is None:
+                    result = _union_index(self._postings, grams, max_size)
+                else:
+                    result = self._union_np(grams, max_size)
+            if result is None:
+                result = self._all_indices
+            self._fuzzy[title] = result
+        return result
+
+    def _union_np(self, grams: list[str], max_size: int) -> list[int] | None:
+        present = [g for g in grams if self._postings[g]]
+        if any(len(self._postings[g]) > max_size for g in present):
+            return None
+        if self._mask is None:
+            self._mask = np.zeros(self._title_count, dtype=bool)
+        mask = self._mask
+        for gram in present:
+            mask[self._array(gram)] = True
+        result = np.flatnonzero(mask)
+        mask[result] = False  # 只清已置位的位置，位图留给下一个查询
+        # 并集单调增长：最终规模超限 ⇔ 逐个合并过程中超限
+        if len(result) > max_size:
+            return None
+        return result.tolist()
+
+    def __contains__(self, title: str) -> bool:
+        return title in self._grams
+
+
+# ============================================================
+# 作者候选
+# ============================================================
+
+
+def author_part_match(lower_author: str) -> bool:
+    """作者子串匹配：是否存在包含 lower_author 的已知作者。
+
+    索引模式下只校验 n-gram 交集内的候选；1 字作者或索引关闭时回退线性扫描。
+    """
+    snapshot = cache_store.get_snapshot()
+    authors = snapshot.authors
+    prepared = _pick_grams(
+        lower_author, snapshot.author_trigram_index, snapshot.author_bigram_index
+    )
+    if prepared is None:
+        return any(lower_author in cached_author for cached_author in authors)
+    grams, index = prepared
+    return any(lower_author in authors[idx] for idx in _intersect_index(index, grams))
+
+
+def author_fuzzy_match(lower_author: str) -> str:
+    """作者模糊匹配：返回相似度 ≥ FUZZY_AUTHOR_THRESHOLD 的最佳作者，无则返回空串"""
+    snapshot = cache_store.get_snapshot()
+    authors = snapshot.authors
+    prepared = _pick_grams(
+        lower_author, snapshot.author_trigram_index, snapshot.author_bigram_index
+    )
+    if prepared is None:
+        candidates = authors
+    else:
+        grams, index = prepared
+        union = _union_index(index, grams, len(authors) // 2)
+        candidates = authors if union is None else [authors[i] for i in union]
+    matches = _close_matches(lower_author, candidates, FUZZY_AUTHOR_THRESHOLD, n=1)
+    return matches[0] if matches else ""
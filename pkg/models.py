@@ -1,13 +1,20 @@
 """数据模型 — TitlesCache, CacheSnapshot, BatchRequest"""
 
 import datetime
+import heapq
 import json
-from dataclasses import dataclass
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from functools import cached_property
 from pathlib import Path
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from pkg.constants import JUST_LOAD, now_cst
+from pkg.packed_index import NgramIndex
+from pkg.prefix_index import PrefixIndex
+from pkg.range_index import RangeIndex
+from pkg.suffix_array import SuffixArray
 
 
 @dataclass(frozen=True)
@@ -15,16 +22,94 @@ class CacheSnapshot:
     """缓存一致性快照，无需加锁安全读取。"""
 
     titles: list[str]
-    trigram_index: dict[str, frozenset[int]]
-    bigram_index: dict[str, frozenset[int]]
+    trigram_index: NgramIndex  # gram → 升序 posting list（dict 或 CSR 紧凑布局）
+    bigram_index: NgramIndex
     authors: list[str]
     author_set: set[str]
+    suffix_array: SuffixArray | None = None
+    # 与 titles 一一对应的预计算结果：归一化标题、数字范围（无范围为 None）
+    normalized_titles: list[str] = field(default_factory=list)
+    title_ranges: list[tuple[int, int] | None] = field(default_factory=list)
+    range_index: RangeIndex | None = None
+    # 小写作者 → 现存作品数：delta 层据此移除失去全部作品的作者
+    author_counts: dict[str, int] = field(default_factory=dict)
+    # 作者列表上的 n-gram 索引（query_author 子串 / 模糊查询）
+    author_trigram_index: NgramIndex = field(default_factory=dict)
+    author_bigram_index: NgramIndex = field(default_factory=dict)
+    # 标题 / 作者的 casefold 前缀索引（列表 prefix 筛选、/api/suggest 补全）
+    title_prefix_index: PrefixIndex = field(default_factory=lambda: PrefixIndex([]))
+    author_prefix_index: PrefixIndex = field(default_factory=lambda: PrefixIndex([]))
+    # 快照代数：每次 CacheStore._update 递增，结果缓存以此判断失效
+    generation: int = 0
+    # 两层索引（ENABLE_DELTA_INDEX）：titles[:base_size] 为 base，其后为增量追加的标题；
+    # 被删除的标题保留原位置，记入 tombstones，候选生成时排除。None 表示没有 delta 层
+    base_size: int | None = None
+    tombstones: frozenset[int] = frozenset()
+
+    @property
+    def has_delta(self) -> bool:
+        return self.base_size is not None
+
+    @property
+    def delta_slots(self) -> range:
+        """delta 层追加的标题索引（含已删除的）"""
+        if self.base_size is None:
+            return range(0)
+        return range(self.base_size, len(self.titles))
+
+    @property
+    def delta_size(self) -> int:
+        """delta 层规模：追加数 + 墓碑数（compaction 的触发依据）"""
+        return len(self.delta_slots) + len(self.tombstones)
 
     @property
     def all_indices(self) -> list[int]:
         """所有标题索引列表（全量扫描用）"""
+        if self.tombstones:
+            return [
+                idx for idx in range(len(self.titles)) if idx not in self.tombstones
+            ]
         return list(range(len(self.titles)))
 
+    @property
+    def live_count(self) -> int:
+        """现存标题数（不含墓碑）"""
+        return len(self.titles) - len(self.tombstones)
+
+    @cached_property
+    def title_rank(self) -> Sequence[int]:
+        """标题索引 → 在全量重建顺序中的位置（同分时的先后）；无 delta 层时即索引本身"""
+        if self.base_size is None:
+            return range(len(self.titles))
+        titles, tombstones = self.titles, self.tombstones
+        base = (idx for idx in range(self.base_size) if idx not in tombstones)
+        delta = sorted(
+            (idx for idx in self.delta_slots if idx not in tombstones),
+            key=titles.__getitem__,
+            reverse=True,
+        )
+        rank = [len(titles)] * len(titles)  # 墓碑排在最后（不会出现在候选中）
+        merged = heapq.merge(base, delta, key=titles.__getitem__, reverse=True)
+        for pos, idx in enumerate(merged):
+            rank[idx] = pos
+        return rank
+
+    @cached_property
+    def live_titles(self) -> list[str]:
+        """现存标题（列表类端点 / 持久化用），与全量重建的顺序（逆序）一致：
+        base 本身有序，delta 层追加的标题排序后归并进来"""
+        if self.base_size is None:
+            return self.titles
+        titles, tombstones = self.titles, self.tombstones
+        base = [
+            t for idx, t in enumerate(titles[: self.base_size]) if idx not in tombstones
+        ]
+        delta = sorted(
+            (titles[idx] for idx in self.delta_slots if idx not in tombstones),
+            reverse=True,
+        )
+        return list(heapq.merge(base, delta, reverse=True))
+
 
 @dataclass
 class TitlesCache:
@@ -73,11 +158,35 @@ class BatchRequest(BaseModel):
     requests: list[BatchRequestItem]
 
 
+class ListQuery(BaseModel):
+    """/api/titles、/api/authors 的分页与筛选参数（query string）"""
+
+    offset: int = Field(0, ge=0)
+    limit: int | None = Field(None, ge=1)
+    prefix: str = ""
+    contains: str = ""
+
+    def is_full(self) -> bool:
+        """无任何参数：返回全量列表"""
+        return (
+            self.offset == 0
+            and self.limit is None
+            and not self.prefix
+            and not self.contains
+        )
+
+
 class MatchTitleRequest(BaseModel):
     title: str
     author: str = ""
 
 
+class MatchTitleTopKRequest(BaseModel):
+    title: str
+    author: str = ""
+    k: int = Field(5, ge=1, le=50)
+
+
 class MatchAuthorRequest(BaseModel):
     author: str
 
@@ -98,6 +207,16 @@ class QueryResponse(BaseModel):
     author: str = ""
 
 
+class ScoredMatch(BaseModel):
+    title: str
+    match: int  # MATCH_EXACTLY / MATCH_PART / MATCH_FUZZY
+    score: float  # 阶段内分数，[0, 1]
+
+
+class TopKResponse(BaseModel):
+    matches: list[ScoredMatch]
+
+
 class RefreshCacheResponse(BaseModel):
     success: bool
     message: str
@@ -105,12 +224,33 @@ class RefreshCacheResponse(BaseModel):
 
 class TitlesResponse(BaseModel):
     titles: list[str]
-    count: int
+    count: int  # 本页条数
+    total: int  # 满足筛选条件的总数
+
+
+class TitleChangesResponse(BaseModel):
+    """since → generation 的净变更；full 为 True 时 added 为全量标题，客户端应整体替换。
+
+    epoch 标识服务端本次启动的代数序列，客户端下次请求时随 since 一并回传。
+    """
+
+    epoch: str
+    generation: int
+    since: int
+    full: bool
+    added: list[str]
+    removed: list[str]
+
+
+class SuggestResponse(BaseModel):
+    query: str
+    suggestions: list[str]
 
 
 class AuthorsResponse(BaseModel):
     authors: list[str]
-    count: int
+    count: int  # 本页条数
+    total: int  # 满足筛选条件的总数
 
 
 class StatsResponse(BaseModel):
@@ -118,6 +258,12 @@ class StatsResponse(BaseModel):
     author_count: int
     current_time: str
     request_stats: dict
+    result_cache: dict = {}
+    process_pool: dict = {}
+    batch_plan: dict = {}
+    title_changelog: dict = {}
+    watcher: dict = {}
+    delta_index: dict = {}
 
 
 class RootResponse(BaseModel):
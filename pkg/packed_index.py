@@ -0,0 +1,116 @@
+"""紧凑 n-gram 索引 — 整数 gram 编码 + CSR 布局（keys / offsets / postings 三个平坦数组）
+
+布局：
+    keys[i]                         第 i 个 gram 的整数编码（升序）
+    postings[offsets[i]:offsets[i+1]] 该 gram 的升序标题索引
+
+三个数组均为定长数值缓冲区，可直接写入共享内存 / mmap 后零拷贝重建。
+"""
+
+from array import array
+from bisect import bisect_left
+from collections.abc import Sequence
+
+# Unicode 码点上限 0x10FFFF < 2^21，trigram 编码占 63 位，可放进 uint64
+_CODE_BITS = 21
+
+
+def encode_gram(gram: str) -> int:
+    """将 gram 按码点拼接为整数（同一索引内 gram 等长，编码唯一且保序）"""
+    code = 0
+    for ch in gram:
+        code = (code << _CODE_BITS) | ord(ch)
+    return code
+
+
+class PackedNgramIndex:
+    """只读 CSR 倒排索引，接口与 dict[str, array] 的 get / in / len 一致。
+
+    keys / offsets / postings 可以是 array，也可以是共享内存上 cast 出的 memoryview。
+    """
+
+    __slots__ = ("_postings_view", "keys", "offsets", "postings")
+
+    def __init__(
+        self, keys: Sequence[int], offsets: Sequence[int], postings: Sequence[int]
+    ):
+        self.keys = keys
+        self.offsets = offsets
+        self.postings = postings
+        self._postings_view = memoryview(postings)
+
+    @classmethod
+    def from_dict(cls, index: dict[str, array]) -> "PackedNgramIndex":
+        """由 gram → 升序 posting list 的字典打包"""
+        keys = array("Q")
+        offsets = array("Q", [0])
+        postings = array("I")
+        for code, gram in sorted((encode_gram(g), g) for g in index):
+            keys.append(code)
+            postings.extend(index[gram])
+            offsets.append(len(postings))
+        return cls(keys, offsets, postings)
+
+    def with_overrides(
+        self, overrides: dict[str, Sequence[int] | None]
+    ) -> "PackedNgramIndex":
+        """返回替换了部分 gram 的 posting list 的新索引（None / 空表示删除该 gram）。
+
+        未变化的 gram 按区间整段拷贝，不逐个解码。
+        """
+        base_keys, base_offsets, view = self.keys, self.offsets, self._postings_view
+        keys = array("Q")
+        offsets = array("Q", [0])
+        postings = array("I")
+
+        def copy_range(lo: int, hi: int) -> None:
+            if lo >= hi:
+                return
+            keys.extend(base_keys[lo:hi])
+            shift = len(postings) - base_offsets[lo]
+            postings.extend(view[base_offsets[lo] : base_offsets[hi]])
+            offsets.extend(off + shift for off in base_offsets[lo + 1 : hi + 1])
+
+        i = 0
+        for code, gram in sorted((encode_gram(g), g) for g in overrides):
+            j = bisect_left(base_keys, code, i)
+            copy_range(i, j)
+            i = j + 1 if j < len(base_keys) and base_keys[j] == code else j
+            replacement = overrides[gram]
+            if replacement:
+                keys.append(code)
+                postings.extend(replacement)
+                offsets.append(len(postings))
+        copy_range(i, len(base_keys))
+        return PackedNgramIndex(keys, offsets, postings)
+
+    def _find(self, gram: str) -> int:
+        code = encode_gram(gram)
+        i = bisect_left(self.keys, code)
+        if i < len(self.keys) and self.keys[i] == code:
+            return i
+        return -1
+
+    def get(self, gram: str, default=None):
+        """返回 gram 的 posting list（零拷贝 memoryview 切片），不存在返回 default"""
+        i = self._find(gram)
+        if i < 0:
+            return default
+        return self._postings_view[self.offsets[i] : self.offsets[i + 1]]
+
+    def __contains__(self, gram: str) -> bool:
+        return self._find(gram) >= 0
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        """三个平坦数组占用的字节数"""
+        return sum(
+            memoryview(buf).nbytes for buf in (self.keys, self.offsets, self.postings)
+        )
+
+
+# 快照中 n-gram 索引的两种布局
+NgramIndex = dict[str, array] | PackedNgramIndex
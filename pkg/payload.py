@@ -0,0 +1,134 @@
+"""预编码响应体 — 每代快照序列化一次，按需保留 gzip / brotli 压缩结果，强 ETag + 304
+
+列表类端点（/api/titles、/api/authors、/admin）的响应只随快照变化：
+首次请求时序列化并缓存，之后按 Accept-Encoding 直接返回字节；
+If-None-Match 命中时不读取响应体，直接 304。
+"""
+
+import asyncio
+import gzip
+import hashlib
+import threading
+from collections.abc import Callable, Hashable
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from pkg.constants import (
+    PAYLOAD_BROTLI_QUALITY,
+    PAYLOAD_CACHE_SIZE,
+    PAYLOAD_GZIP_LEVEL,
+    PAYLOAD_MIN_COMPRESS_BYTES,
+)
+from pkg.result_cache import GenerationLRU
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=PAYLOAD_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=PAYLOAD_GZIP_LEVEL, mtime=0)
+
+
+class EncodedPayload:
+    """一份已序列化的响应体及其压缩版本（压缩在首次被请求时进行）。
+
+    强 ETag 由原始字节的哈希生成；不同 Content-Encoding 的表示附加后缀，互不相同。
+    """
+
+    def __init__(self, body: bytes, media_type: str):
+        self.body = body
+        self.media_type = media_type
+        self._digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        self._encoded: dict[str, bytes] = {"identity": body}
+        self._lock = threading.Lock()
+
+    def etag(self, encoding: str = "identity") -> str:
+        if encoding == "identity":
+            return f'"{self._digest}"'
+        return f'"{self._digest}-{encoding}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """If-None-Match 是否包含本响应任一表示的 ETag（GET 按弱比较）"""
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags:
+            return True
+        return any(self.etag(enc) in tags for enc in ("identity", "gzip", "br"))
+
+    def is_encoded(self, encoding: str) -> bool:
+        return encoding in self._encoded
+
+    def encode(self, encoding: str) -> bytes:
+        """返回 encoding 对应的字节，首次调用时压缩并缓存"""
+        with self._lock:
+            data = self._encoded.get(encoding)
+            if data is None:
+                data = self._encoded[encoding] = _compress(self.body, encoding)
+            return data
+
+
+def choose_encoding(accept_encoding: str, size: int) -> str:
+    """按 Accept-Encoding 选择 br > gzip > identity（q=0 视为不接受）"""
+    if size < PAYLOAD_MIN_COMPRESS_BYTES:
+        return "identity"
+    accepted = set()
+    for part in accept_encoding.split(","):
+        name, *params = part.split(";")
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(name.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if accepted & {"gzip", "*"}:
+        return "gzip"
+    return "identity"
+
+
+# --- 模块级单例：键为 (端点, 表示)，快照代数前进时整体作废 ---
+payload_cache = GenerationLRU(PAYLOAD_CACHE_SIZE)
+
+
+async def cached_response(
+    request: Request,
+    key: Hashable,
+    generation: int,
+    render: Callable[[], tuple[bytes, str]],
+) -> Response:
+    """以预编码缓存响应 GET 请求。
+
+    render() 返回 (响应体, media_type)，仅在该代快照首次请求时于线程中调用。
+    """
+    payload = payload_cache.get(key, generation)
+    if payload is None:
+        body, media_type = await asyncio.to_thread(render)
+        payload = EncodedPayload(body, media_type)
+        payload_cache.put(key, generation, payload)
+
+    # 客户端（或代理）按 Accept / Accept-Encoding 区分缓存；no-cache 使其每次带 ETag 重新验证
+    headers = {"Vary": "Accept, Accept-Encoding", "Cache-Control": "no-cache"}
+    encoding = choose_encoding(
+        request.headers.get("accept-encoding", ""), len(payload.body)
+    )
+    headers["ETag"] = payload.etag(encoding)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and payload.matches(if_none_match):
+        return Response(status_code=304, headers=headers)
+
+    if payload.is_encoded(encoding):
+        data = payload.encode(encoding)
+    else:
+        data = await asyncio.to_thread(payload.encode, encoding)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=data, media_type=payload.media_type, headers=headers)
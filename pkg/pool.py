@@ -0,0 +1,414 @@
+"""进程池匹配后端 — 快照发布到共享内存，/query/batch 按块分发到多进程执行
+
+父进程：每代快照把 标题文本 + 派生结构（CSR n-gram 索引、后缀数组等）写入一段 SharedMemory，
+        任务携带 SharedSnapshotHandle（段名 + 字段布局）。
+worker：代数变化时挂载新段，索引零拷贝引用、字符串解码一次，不重跑 build_snapshot。
+"""
+
+import asyncio
+import atexit
+import math
+import sys
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple
+
+from pkg.cache import build_snapshot, cache_store
+from pkg.constants import (
+    ENABLE_TRIGRAM_INDEX,
+    POOL_MIN_BATCH_SIZE,
+    POOL_MIN_CHUNK_SIZE,
+    PROCESS_POOL_WORKERS,
+    logger,
+)
+from pkg.delta_index import LayeredIndex
+from pkg.models import BatchRequestItem, CacheSnapshot
+from pkg.packed_index import PackedNgramIndex
+from pkg.range_index import IntervalIndex, RangeIndex
+from pkg.suffix_array import SuffixArray
+
+_ALIGN = 8  # 各字段按 8 字节对齐，cast 为 'Q' 视图时无跨界读取
+
+
+class _Field(NamedTuple):
+    name: str
+    offset: int
+    typecode: str
+    length: int  # 元素个数
+
+
+class SharedSnapshotHandle(NamedTuple):
+    """worker 挂载共享快照所需的全部信息（可 pickle，随每个任务发送）"""
+
+    shm_name: str
+    generation: int
+    fields: tuple[_Field, ...]
+    base_size: int | None = None  # 快照带 delta 层时 base 的标题数
+
+
+# ============================================================
+# 父进程：发布
+# ============================================================
+
+
+def _pack_titles(titles: list[str]) -> tuple[bytes, array]:
+    """标题拼接为一段 UTF-8 文本 + 字符偏移（titles[i] = text[off[i]:off[i+1]]）"""
+    offsets = array("Q", [0])
+    pos = 0
+    for title in titles:
+        pos += len(title)
+        offsets.append(pos)
+    return "".join(titles).encode("utf-8"), offsets
+
+
+def _as_packed(index) -> PackedNgramIndex:
+    if isinstance(index, LayeredIndex):
+        index = index.materialize()  # 父进程合并一次，worker 直接挂载
+    if isinstance(index, PackedNgramIndex):
+        return index
+    return PackedNgramIndex.from_dict(index)
+
+
+def _pack_ranges(ranges: list[tuple[int, int] | None]) -> tuple[array, list[str]]:
+    """带数字范围的标题索引 + "start-end" 文本（范围数字可能超出 int64）"""
+    slots = array("I")
+    texts = []
+    for idx, title_range in enumerate(ranges):
+        if title_range is not None:
+            slots.append(idx)
+            texts.append(f"{title_range[0]}-{title_range[1]}")
+    return slots, texts
+
+
+class SharedSnapshot:
+    """一代快照在共享内存中的发布（父进程持有，负责 unlink）
+
+    除标题与 n-gram 索引外，batch 匹配用到的派生结构（归一化标题、数字范围、作者及其
+    n-gram 索引、范围 gram 索引、后缀数组）也一并发布，worker 无需对全量标题重跑
+    FindArtistV2 / 归一化。带 delta 层的快照按槽位发布，两层索引在此合并为单层。
+    """
+
+    def __init__(self, snapshot: CacheSnapshot):
+        buffers: list[tuple[str, str, memoryview]] = []
+
+        def add_strings(prefix: str, values: list[str]) -> None:
+            blob, offsets = _pack_titles(values)
+            buffers.append((f"{prefix}_blob", "B", memoryview(blob)))
+            buffers.append((f"{prefix}_offsets", "Q", memoryview(offsets)))
+
+        def add_index(prefix: str, index) -> None:
+            packed = _as_packed(index)
+            buffers.append((f"{prefix}_keys", "Q", memoryview(packed.keys)))
+            buffers.append((f"{prefix}_offsets", "Q", memoryview(packed.offsets)))
+            buffers.append((f"{prefix}_postings", "I", memoryview(packed.postings)))
+
+        add_strings("title", snapshot.titles)
+        add_strings("normalized", snapshot.normalized_titles)
+        add_strings("author", snapshot.authors)
+        range_slots, range_texts = _pack_ranges(snapshot.title_ranges)
+        buffers.append(("range_slots", "I", memoryview(range_slots)))
+        add_strings("range", range_texts)
+        tombstones = array("I", sorted(snapshot.tombstones))
+        buffers.append(("tombstones", "I", memoryview(tombstones)))
+        # 未启用 trigram 索引时 worker 侧同样不建索引，无需发布
+        if ENABLE_TRIGRAM_INDEX:
+            add_index("tri", snapshot.trigram_index)
+            add_index("bi", snapshot.bigram_index)
+            add_index("author_tri", snapshot.author_trigram_index)
+            add_index("author_bi", snapshot.author_bigram_index)
+        if snapshot.range_index is not None:
+            add_index("range_gram", snapshot.range_index.gram_index)
+        suffix_array = snapshot.suffix_array
+        if suffix_array is not None:
+            buffers.append(
+                ("sa_text", "B", memoryview(suffix_array.text.encode("utf-8")))
+            )
+            buffers.append(("sa_sa", "I", memoryview(suffix_array.sa)))
+            buffers.append(("sa_starts", "I", memoryview(suffix_array.starts)))
+
+        fields: list[_Field] = []
+        size = 0
+        for name, typecode, view in buffers:
+            fields.append(_Field(name, size, typecode, len(view)))
+            size += -(-view.nbytes // _ALIGN) * _ALIGN
+
+        self.shm = SharedMemory(create=True, size=max(size, 1))
+        for field, (_, _, view) in zip(fields, buffers, strict=True):
+            raw = view.cast("B")
+            self.shm.buf[field.offset : field.offset + len(raw)] = raw
+        self.nbytes = size
+        self.handle = SharedSnapshotHandle(
+            self.shm.name, snapshot.generation, tuple(fields), snapshot.base_size
+        )
+
+    def release(self) -> None:
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# ============================================================
+# worker：挂载
+# ============================================================
+
+_worker_shm: SharedMemory | None = None
+
+
+def _attach(name: str) -> SharedMemory:
+    """挂载父进程创建的段。
+
+    spawn 出的 worker 与父进程共用同一个 resource_tracker（按段名去重），
+    挂载时的重复登记无副作用，段的 unlink 只由父进程负责。
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    return SharedMemory(name=name)
+
+
+def load_shared_snapshot(
+    shm: SharedMemory, handle: SharedSnapshotHandle
+) -> CacheSnapshot:
+    """由共享内存段重建快照：字符串解码一次，索引与后缀数组直接引用共享缓冲区。
+
+    worker 只处理 batch 请求：前缀索引、作者 → 标题索引不发布也不重建。
+    """
+    views = {}
+    for field in handle.fields:
+        nbytes = field.length * array(field.typecode).itemsize
+        views[field.name] = shm.buf[field.offset : field.offset + nbytes].cast(
+            field.typecode
+        )
+
+    def strings(prefix: str) -> list[str]:
+        text = bytes(views[f"{prefix}_blob"]).decode("utf-8")
+        offsets = views[f"{prefix}_offsets"]
+        return [text[offsets[i] : offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+    def index(prefix: str) -> PackedNgramIndex | dict:
+        if f"{prefix}_keys" not in views:
+            return {}
+        return PackedNgramIndex(
+            views[f"{prefix}_keys"],
+            views[f"{prefix}_offsets"],
+            views[f"{prefix}_postings"],
+        )
+
+    titles = strings("title")
+    tombstones = frozenset(views["tombstones"])
+    ranges: list[tuple[int, int] | None] = [None] * len(titles)
+    for idx, text in zip(views["range_slots"], strings("range"), strict=True):
+        start, end = text.split("-")
+        ranges[idx] = (int(start), int(end))
+
+    range_index = None
+    if "range_gram_keys" in views:
+        intervals = [
+            (title_range[0], title_range[1], idx)
+            for idx, title_range in enumerate(ranges)
+            if title_range is not None and idx not in tombstones
+        ]
+        range_index = RangeIndex(
+            gram_index=index("range_gram"), intervals=IntervalIndex(intervals)
+        )
+
+    suffix_array = None
+    if "sa_text" in views:
+        suffix_array = SuffixArray(
+            text=bytes(views["sa_text"]).decode("utf-8"),
+            sa=views["sa_sa"],
+            starts=views["sa_starts"],
+        )
+
+    authors = strings("author")
+    return CacheSnapshot(
+        titles=titles,
+        trigram_index=index("tri"),
+        bigram_index=index("bi"),
+        authors=authors,
+        author_set=set(authors),
+        author_trigram_index=index("author_tri"),
+        author_bigram_index=index("author_bi"),
+        suffix_array=suffix_array,
+        normalized_titles=strings("normalized"),
+        title_ranges=ranges,
+        range_index=range_index,
+        generation=handle.generation,
+        base_size=handle.base_size,
+        tombstones=tombstones,
+    )
+
+
+def _close_quietly(shm: SharedMemory) -> None:
+    try:
+        shm.close()
+    except BufferError:
+        pass  # 旧快照的视图仍被引用，随 GC 释放
+
+
+def _detach() -> None:
+    """worker 退出前先丢弃引用共享缓冲区的快照，再关闭段（否则 __del__ 报 BufferError）"""
+    global _worker_shm
+    if _worker_shm is None:
+        return
+    cache_store.install_snapshot(build_snapshot([], cache_store.generation))
+    _close_quietly(_worker_shm)
+    _worker_shm = None
+
+
+def _ensure_snapshot(handle: SharedSnapshotHandle) -> None:
+    """worker 内快照与 handle 代数不一致时重新挂载"""
+    global _worker_shm
+    if _worker_shm is not None and cache_store.generation == handle.generation:
+        return
+    shm = _attach(handle.shm_name)
+    cache_store.install_snapshot(load_shared_snapshot(shm, handle))
+    old, _worker_shm = _worker_shm, shm
+    if old is None:
+        atexit.register(_detach)
+    else:
+        _close_quietly(old)
+
+
+def _run_chunk(
+    handle: SharedSnapshotHandle, items: list[BatchRequestItem]
+) -> list[dict]:
+    """worker 任务：处理一块 batch 请求，单项异常转为 error 结果"""
+    from pkg.query import run_batch_items  # pkg.query 导入本模块，延迟导入避免循环
+
+    _ensure_snapshot(handle)
+    return run_batch_items(items)
+
+
+# ============================================================
+# MatchingPool
+# ============================================================
+
+
+class MatchingPool:
+    """ProcessPoolExecutor + 共享内存快照；未启动时 enabled_for 恒为 False。"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.restarts = 0  # worker 异常退出后重建 executor 的次数
+        # 保留上一代：切换瞬间仍在执行的块可能挂载着它
+        self._published: list[SharedSnapshot] = []
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # 统一用 spawn：父进程已有事件循环 / 托盘线程，fork 不安全
+        return ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=get_context("spawn")
+        )
+
+    def start(self) -> None:
+        self._executor = self._new_executor()
+        logger.info(f"Matching process pool started with {self.workers} workers")
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """worker 异常退出（崩溃 / OOM）后 executor 永久不可用：换新的并重新发布当前快照"""
+        with self._lock:
+            if self._executor is not broken:  # 已被其他调用重建，或池已关闭
+                return
+            self._executor = self._new_executor()
+            self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        logger.error(f"Matching process pool broken, restarted (#{self.restarts})")
+        self.publish(cache_store.get_snapshot())
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            for published in self._published:
+                published.release()
+            self._published.clear()
+
+    def enabled_for(self, batch_size: int) -> bool:
+        """小批量留在进程内：跨进程序列化开销大于并行收益"""
+        return self._executor is not None and batch_size >= POOL_MIN_BATCH_SIZE
+
+    def publish(self, snapshot: CacheSnapshot) -> SharedSnapshotHandle:
+        """确保 snapshot 这一代已发布到共享内存，返回其 handle"""
+        with self._lock:
+            if (
+                self._published
+                and self._published[-1].handle.generation == snapshot.generation
+            ):
+                return self._published[-1].handle
+            published = SharedSnapshot(snapshot)
+            self._published.append(published)
+            while len(self._published) > 2:
+                self._published.pop(0).release()
+            logger.debug(
+                f"Published snapshot generation {snapshot.generation} "
+                f"to shared memory ({published.nbytes} bytes)"
+            )
+            return published.handle
+
+    @property
+    def running(self) -> bool:
+        return self._executor is not None
+
+    async def publish_current(self) -> SharedSnapshotHandle:
+        """发布当前快照（拷贝到共享内存在线程中进行，不阻塞事件循环）"""
+        return await asyncio.to_thread(self.publish, cache_store.get_snapshot())
+
+    def submit(
+        self, handle: SharedSnapshotHandle, items: list[BatchRequestItem]
+    ) -> asyncio.Future:
+        """提交一块请求到 worker，返回可 await 的结果列表"""
+        executor = self._executor
+        if executor is None:
+            raise RuntimeError("Matching pool is not started")
+        loop = asyncio.get_running_loop()
+        try:
+            future = loop.run_in_executor(executor, _run_chunk, handle, items)
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+
+        def on_done(f: asyncio.Future) -> None:
+            if not f.cancelled() and isinstance(f.exception(), BrokenProcessPool):
+                self._restart(executor)
+
+        future.add_done_callback(on_done)
+        return future
+
+    async def run_batch(self, items: list[BatchRequestItem]) -> list[dict]:
+        """按块分发到 worker，结果保持请求顺序"""
+        handle = await self.publish_current()
+        # 每个 worker 约两块，兼顾负载均衡与单块调度开销
+        chunk_size = max(
+            POOL_MIN_CHUNK_SIZE, math.ceil(len(items) / (self.workers * 2))
+        )
+        futures = [
+            self.submit(handle, items[i : i + chunk_size])
+            for i in range(0, len(items), chunk_size)
+        ]
+        results: list[dict] = []
+        for chunk in await asyncio.gather(*futures):
+            results.extend(chunk)
+        return results
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            latest = self._published[-1] if self._published else None
+            return {
+                "running": self._executor is not None,
+                "workers": self.workers,
+                "restarts": self.restarts,
+                "generation": latest.handle.generation if latest else None,
+                "shared_bytes": sum(p.nbytes for p in self._published),
+            }
+
+
+# --- 模块级单例（由 app lifespan 按 ENABLE_PROCESS_POOL 启停）---
+matching_pool = MatchingPool(PROCESS_POOL_WORKERS)
@@ -0,0 +1,31 @@
+"""前缀索引 — casefold 键排序数组 + 原列表下标，前缀查询为一次 bisect 区间
+
+相当于压缩前缀树按字典序展开：同一前缀的全部键在数组中连续，
+区间 [lo, hi) 即前缀树上该节点的子树。
+"""
+
+from array import array
+from bisect import bisect_left
+
+# 大于任何实际字符：prefix + _MAX_CHAR 是所有以 prefix 开头的键的上界
+_MAX_CHAR = "\U0010ffff"
+
+
+class PrefixIndex:
+    """按 casefold 键升序排列的下标数组（构建后只读，可跨线程共享）。"""
+
+    __slots__ = ("keys", "order")
+
+    def __init__(self, values: list[str]):
+        pairs = sorted((value.casefold(), idx) for idx, value in enumerate(values))
+        self.keys = [key for key, _ in pairs]
+        self.order = array("I", [idx for _, idx in pairs])
+
+    def range(self, prefix: str) -> tuple[int, int]:
+        """以 prefix 开头（忽略大小写）的键在 keys 中的区间 [lo, hi)"""
+        folded = prefix.casefold()
+        lo = bisect_left(self.keys, folded)
+        return lo, bisect_left(self.keys, folded + _MAX_CHAR, lo)
+
+    def __len__(self) -> int:
+        return len(self.keys)
@@ -1,27 +1,73 @@
-"""查询服务 — query_match_title, query_author, _process_batch_request"""
+"""查询服务 — query_match_title, query_author, batch 执行计划（去重 / 分组 / 回填）"""
 
 import asyncio
+import heapq
+import time
+import traceback
+from collections.abc import AsyncIterable, AsyncIterator, Sequence
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 
 from autoclassfiy import FindArtistV2
 from pkg.cache import cache_store
 from pkg.constants import (
+    ENABLE_FUZZY_AUTHOR,
     MATCH_EXACTLY,
     MATCH_FUZZY,
     MATCH_NO,
     MATCH_PART,
+    NEGATIVE_FILTER_CAPACITY,
+    NEGATIVE_FILTER_FP_RATE,
+    RESULT_CACHE_SIZE,
+    STREAM_CHUNK_SIZE,
+    STREAM_MAX_INFLIGHT,
+    TOPK_FUZZY_MAX_CANDIDATES,
     logger,
 )
 from pkg.matching import (
+    BATCH_VECTORIZED,
+    BatchCandidates,
     _sanitize_title,
+    author_fuzzy_match,
+    author_part_match,
+    author_title_indices,
     check_author_in_title,
+    common_substring_bounds,
     exact_candidates,
-    exactly_match,
+    exact_hits,
+    exactly_match_prepared,
     fuzz_match,
+    fuzz_match_scored,
     fuzzy_candidates,
+    in_title_order,
     is_title_ignored,
     part_match,
+    part_min_length,
+    prepare_exact_query,
+    range_candidates,
+    restrict_candidates,
 )
-from pkg.models import BatchRequestItem
+from pkg.models import BatchRequestItem, CacheSnapshot
+from pkg.pool import matching_pool
+from pkg.result_cache import GenerationLRU, NegativeFilter
+from pkg.stats import BatchPlanStats
+from pkg.suffix_automaton import SuffixAutomaton
+
+# 单条查询结果缓存：键含快照代数，CacheStore 替换快照后自动失效
+title_result_cache = GenerationLRU(RESULT_CACHE_SIZE)
+author_result_cache = GenerationLRU(RESULT_CACHE_SIZE)
+# 已确认 MATCH_NO 的 (标题, 作者)：大部分标签页标题不在库中，重复查询直接返回
+title_negative_filter = NegativeFilter(
+    NEGATIVE_FILTER_CAPACITY, NEGATIVE_FILTER_FP_RATE
+)
+batch_plan_stats = BatchPlanStats()
+
+
+def extract_artist_sync(title: str) -> str:
+    """提取标题中的作者名"""
+    if not isinstance(title, str):
+        return ""
+    return FindArtistV2(title)
 
 
 async def extract_artist(title: str) -> str:
@@ -34,32 +80,113 @@ async def extract_artist(title: str) -> str:
 async def query_match_title(
     input_title: str, input_author: str = ""
 ) -> tuple[int, str]:
-    """三级匹配流水线：Exact → Part → Fuzzy，逐级回退"""
+    """单条查询走进程内快速路径，见 query_match_title_sync"""
+    return query_match_title_sync(input_title, input_author)
+
+
+def normalize_title_query(input_title: str, input_author: str) -> tuple[str, str]:
+    """标题查询的归一化输入：去除首尾空白，作者转小写（作者校验不区分大小写）"""
+    return input_title.strip(), input_author.strip().lower()
+
+
+def query_match_title_sync(
+    input_title: str,
+    input_author: str = "",
+    candidates: BatchCandidates | None = None,
+) -> tuple[int, str]:
+    """三级匹配流水线：Exact → Part → Fuzzy，逐级回退
+
+    input_author 非空时，EXACT / PART 候选限定为包含作者子串（不区分大小写）的标题。
+    candidates 为 batch 级预取的候选（与当前快照同代时使用）。
+    输入先归一化（见 normalize_title_query），匹配与缓存键均使用归一化后的值：
+    命中结果按 (标题, 作者, 快照代数) 进 LRU，MATCH_NO 记入未命中 Bloom filter。
+    """
+    input_title, input_author = normalize_title_query(input_title, input_author)
     # 1 字标题无匹配意义
     if len(input_title) < 2:
         return MATCH_NO, ""
 
-    cached_titles = cache_store.get_snapshot().titles
+    snapshot = cache_store.get_snapshot()
+    generation = snapshot.generation
+    negative_key = f"{input_title}\0{input_author}"
+    if (negative_key, generation) in title_negative_filter:
+        return MATCH_NO, "<empty>"
+
+    key = (input_title, input_author)
+    result = title_result_cache.get(key, generation)
+    if result is None:
+        if candidates is not None and (
+            candidates.generation != generation or input_title not in candidates
+        ):
+            candidates = None
+        result = _match_title(snapshot, input_title, input_author, candidates)
+        if result[0] == MATCH_NO:
+            title_negative_filter.add(negative_key, generation)
+        else:
+            title_result_cache.put(key, generation, result)
+    return result
+
+
+def _match_title(
+    snapshot: CacheSnapshot,
+    input_title: str,
+    input_author: str,
+    batch: BatchCandidates | None = None,
+) -> tuple[int, str]:
+    """query_match_title 的未缓存实现"""
+    cached_titles = snapshot.titles
     match_status = MATCH_NO
     matched_title = "<empty>"
     title_len = len(input_title)
     fuzz = None  # PART 阶段有条件赋值, FUZZY 阶段复用（避免 UnboundLocalError）
+    # 指定作者：EXACT / PART 候选先与包含作者子串的标题求交（首个命中不变）
+    author_titles = author_title_indices(input_author)
 
-    # EXACT — 输入标题是缓存标题的子串
-    for idx in exact_candidates(input_title):
-        cached_title = cached_titles[idx]
-        ok = exactly_match(cached_title, input_title)
-        if ok and check_author_in_title(cached_title, input_author):
-            match_status = MATCH_EXACTLY
-            matched_title = cached_title
-            break
+    # EXACT — 输入标题是缓存标题的子串（缓存侧归一化结果取自快照）
+    exact_query = prepare_exact_query(input_title)
+    hits = exact_hits(exact_query.text)
+    extra = range_candidates(exact_query)  # 数字范围分支（输入 "3" 命中 "1-3"）
+    if hits is not None and not extra:
+        # 后缀数组命中即子串关系，只需校验作者
+        for idx in in_title_order(snapshot, restrict_candidates(hits, author_titles)):
+            cached_title = cached_titles[idx]
+            if check_author_in_title(cached_title, input_author):
+                match_status = MATCH_EXACTLY
+                matched_title = cached_title
+                break
+    else:
+        if hits is not None:
+            candidates = hits
+        elif batch is not None:
+            candidates = batch.exact(input_title)
+        else:
+            candidates = exact_candidates(input_title)
+        if extra:
+            candidates = sorted(set(candidates).union(extra))
+        candidates = restrict_candidates(candidates, author_titles)
+        normalized_titles = snapshot.normalized_titles
+        title_ranges = snapshot.title_ranges
+        for idx in in_title_order(snapshot, candidates):
+            cached_title = cached_titles[idx]
+            ok = exactly_match_prepared(
+                normalized_titles[idx], title_ranges[idx], exact_query
+            )
+            if ok and check_author_in_title(cached_title, input_author):
+                match_status = MATCH_EXACTLY
+                matched_title = cached_title
+                break
 
     # PART — 公共子串 ≥ 阈值（2字标题跳过，等价于 exact）
     if not match_status and title_len != 2:
-        fuzz = fuzzy_candidates(input_title)
-        for idx in fuzz:
+        fuzz = (
+            batch.fuzzy(input_title)
+            if batch is not None
+            else fuzzy_candidates(input_title)
+        )
+        automaton = SuffixAutomaton(input_title)  # 每次查询建一次，候选流式通过
+        for idx in in_title_order(snapshot, restrict_candidates(fuzz, author_titles)):
             cached_title = cached_titles[idx]
-            ok, matched = part_match(cached_title, input_title)
+            ok, matched = part_match(cached_title, input_title, automaton)
             if ok and check_author_in_title(cached_title, input_author):
                 match_status = MATCH_PART
                 matched_title = cached_title
@@ -68,7 +195,8 @@ async def query_match_title(
 
     # FUZZY — difflib 模糊匹配（<=2字标题跳过）
     if not match_status and title_len > 2:
-        # fuzz 可能已从 PART 阶段的 fuzzy_candidates 获取，复用避免重复计算
+        # fuzz 可能已从 PART 阶段的 fuzzy_candidates 获取，复用避免重复计算。
+        # 不按作者剪枝：fuzz_match 先取全体候选的前几名再校验作者
         if fuzz is None:
             fuzz = fuzzy_candidates(input_title)
         candidate_titles = [cached_titles[i] for i in fuzz]
@@ -80,34 +208,226 @@ async def query_match_title(
     return match_status, matched_title
 
 
+# ============================================================
+# top-k：各阶段有界堆 + 分数上界剪枝
+# ============================================================
+
+
+class _TopK:
+    """大小为 k 的最小堆，元素 (score, -rank, idx)：同分时全量重建顺序中靠前的标题优先
+    （与首个命中一致；rank 见 CacheSnapshot.title_rank）"""
+
+    def __init__(self, k: int, rank: Sequence[int]):
+        self.k = k
+        self.rank = rank
+        self.heap: list[tuple[float, int, int]] = []
+
+    def floor(self) -> tuple[float, int, int] | None:
+        """堆满时的门槛：上界不超过它的候选无需计算"""
+        return self.heap[0] if len(self.heap) == self.k else None
+
+    def beats_floor(self, bound: float, idx: int) -> bool:
+        floor = self.floor()
+        return floor is None or (bound, -self.rank[idx]) > floor[:2]
+
+    def push(self, score: float, idx: int) -> None:
+        entry = (score, -self.rank[idx], idx)
+        if len(self.heap) < self.k:
+            heapq.heappush(self.heap, entry)
+        elif entry > self.heap[0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def ranked(self) -> list[tuple[float, int]]:
+        """按分数降序返回 (score, idx)"""
+        return [(score, idx) for score, _, idx in sorted(self.heap, reverse=True)]
+
+
+def query_match_title_topk_sync(
+    input_title: str, input_author: str = "", k: int = 5
+) -> list[dict]:
+    """与 query_match_title 相同的三级流水线，返回前 k 个候选及其阶段与分数。
+
+    排序先按阶段（EXACT > PART > FUZZY）再按阶段内分数：
+        EXACT  归一化输入长度 / 归一化标题长度（覆盖率）
+        PART   公共子串长度 / 输入长度
+        FUZZY  FUZZY_SCORER 的相似度
+    高阶段已凑满 k 个时低阶段不再执行；阶段内分数上界不超过堆顶的候选跳过校验 / 打分。
+    """
+    if len(input_title) < 2:
+        return []
+    snapshot = cache_store.get_snapshot()
+    titles = snapshot.titles
+    rank = snapshot.title_rank
+    results: list[dict] = []
+    seen: set[int] = set()
+
+    def collect(stage: int, top: _TopK) -> None:
+        for score, idx in top.ranked():
+            seen.add(idx)
+            results.append(
+                {"title": titles[idx], "match": stage, "score": round(score, 4)}
+            )
+
+    title_len = len(input_title)
+    author_titles = author_title_indices(input_author)
+
+    # EXACT
+    top = _TopK(k, rank)
+    exact_query = prepare_exact_query(input_title)
+    query_len = len(exact_query.text)
+    hits = exact_hits(exact_query.text)
+    extra = range_candidates(exact_query)
+    verified = hits is not None and not extra  # 后缀数组命中即子串关系
+    if hits is not None:
+        candidates = hits
+    else:
+        candidates = exact_candidates(input_title)
+    if extra:
+        candidates = sorted(set(candidates).union(extra))
+    normalized_titles = snapshot.normalized_titles
+    title_ranges = snapshot.title_ranges
+    for idx in restrict_candidates(candidates, author_titles):
+        normalized = normalized_titles[idx]
+        score = min(query_len / len(normalized), 1.0) if normalized else 0.0
+        if not top.beats_floor(score, idx):
+            continue
+        if not verified and not exactly_match_prepared(
+            normalized, title_ranges[idx], exact_query
+        ):
+            continue
+        if check_author_in_title(titles[idx], input_author):
+            top.push(score, idx)
+    collect(MATCH_EXACTLY, top)
+
+    # PART（2 字标题跳过，等价于 exact）
+    bounds = None
+    allowed = None if author_titles is None else set(author_titles)
+    if len(results) < k and title_len != 2:
+        top = _TopK(k - len(results), rank)
+        # 公共子串长度上界：不超过两者较短者，且受共有 gram 数限制
+        bounds = common_substring_bounds(input_title)
+        min_len = part_min_length(input_title)
+        if bounds is not None and min_len >= bounds[1]:
+            # 无共有 gram 的标题上界为 n-1 < min_len，只需看计数中的标题
+            shared, n = bounds
+            ranked = [
+                (-min(len(titles[idx]), title_len, n - 1 + count), rank[idx], idx)
+                for idx, count in shared.items()
+                if count > min_len - n
+                and idx not in seen
+                and (allowed is None or idx in allowed)
+            ]
+        else:
+            ranked = [
+                (-min(len(titles[idx]), title_len), rank[idx], idx)
+                for idx in restrict_candidates(
+                    fuzzy_candidates(input_title), author_titles
+                )
+                if idx not in seen
+            ]
+        ranked.sort()
+        automaton = SuffixAutomaton(input_title)
+        for neg_bound, _, idx in ranked:
+            # 按上界降序：上界不超过堆顶后，其余候选均不可能入选
+            if not top.beats_floor(-neg_bound / title_len, idx):
+                break
+            cached_title = titles[idx]
+            ok, matched = part_match(cached_title, input_title, automaton)
+            if ok and check_author_in_title(cached_title, input_author):
+                top.push(len(matched) / title_len, idx)
+        collect(MATCH_PART, top)
+
+    # FUZZY（<=2 字标题跳过）
+    if len(results) < k and title_len > 2:
+        if bounds is not None:
+            # 相似度不受 gram 数严格约束：只对共有 gram 最多的一批候选打分
+            shared = bounds[0]
+            fuzz = heapq.nsmallest(
+                TOPK_FUZZY_MAX_CANDIDATES,
+                (
+                    (-count, rank[idx], idx)
+                    for idx, count in shared.items()
+                    if idx not in seen and (allowed is None or idx in allowed)
+                ),
+            )
+            fuzz = [idx for _, _, idx in fuzz]
+        else:
+            fuzz = [
+                idx
+                for idx in restrict_candidates(
+                    fuzzy_candidates(input_title), author_titles
+                )
+                if idx not in seen
+            ]
+        candidate_titles = [
+            titles[idx]
+            for idx in fuzz
+            if check_author_in_title(titles[idx], input_author)
+        ]
+        for score, title in fuzz_match_scored(
+            candidate_titles, input_title, k - len(results)
+        ):
+            results.append(
+                {"title": title, "match": MATCH_FUZZY, "score": round(score, 4)}
+            )
+
+    return results
+
+
+async def query_match_title_topk(
+    input_title: str, input_author: str = "", k: int = 5
+) -> list[dict]:
+    """线程池执行 query_match_title_topk_sync（需扫描阶段内全部候选，不占用事件循环）"""
+    return await asyncio.to_thread(
+        query_match_title_topk_sync, input_title, input_author, k
+    )
+
+
 async def query_author(author: str) -> int:
-    """作者查询：先 O(1) 集合精确匹配，再 O(n) 子串回退"""
+    """单条查询走进程内快速路径，见 query_author_sync"""
+    return query_author_sync(author)
+
+
+def query_author_sync(author: str) -> int:
+    """作者查询：O(1) 集合精确匹配 → n-gram 索引子串匹配 → （可选）模糊匹配"""
     if not isinstance(author, str) or author == "":
         return MATCH_NO
     lower_author = author.lower()
     snap = cache_store.get_snapshot()
 
+    result = author_result_cache.get(lower_author, snap.generation)
+    if result is None:
+        result = _match_author(snap, lower_author)
+        author_result_cache.put(lower_author, snap.generation, result)
+    return result
+
+
+def _match_author(snap: CacheSnapshot, lower_author: str) -> int:
+    """query_author 的未缓存实现"""
     if lower_author in snap.author_set:  # O(1) 精确匹配
         return MATCH_EXACTLY
-    for cached_author in snap.authors:  # O(n) 子串匹配回退
-        if lower_author in cached_author:
-            return MATCH_PART
+    if author_part_match(lower_author):  # 索引交集 + 候选校验
+        return MATCH_PART
+    if ENABLE_FUZZY_AUTHOR and author_fuzzy_match(lower_author):
+        return MATCH_FUZZY
     return MATCH_NO
 
 
-async def process_batch_request(req: BatchRequestItem) -> dict:
-    """处理单个 batch 请求，按 type 字段分派到对应处理逻辑"""
+def process_batch_item(
+    req: BatchRequestItem, candidates: BatchCandidates | None = None
+) -> dict:
+    """处理单个 batch 请求，按 type 字段分派到对应处理逻辑（同步，可在进程池 worker 中执行）"""
     req_type = req.type
 
     if req_type == "extract-author":
         title = req.title
-        author = await extract_artist(title)
+        author = extract_artist_sync(title)
         match_status = MATCH_NO if author == "" else MATCH_EXACTLY
         return {"type": req_type, "author": author, "match": match_status}
 
     elif req_type == "match-author":
         author = req.author
-        match_status = await query_author(author)
+        match_status = query_author_sync(author)
         return {"type": req_type, "match": match_status}
 
     elif req_type == "match-title":
@@ -120,7 +440,9 @@ async def process_batch_request(req: BatchRequestItem) -> dict:
         if is_title_ignored(in_title):
             return {"type": req_type, "title": "", "match": MATCH_NO}
 
-        match_status, matched_title = await query_match_title(in_title, in_author)
+        match_status, matched_title = query_match_title_sync(
+            in_title, in_author, candidates
+        )
         return {
             "type": req_type,
             "title": matched_title if match_status else "",
@@ -134,9 +456,9 @@ async def process_batch_request(req: BatchRequestItem) -> dict:
         in_title = req.title.strip()
 
         # author 查询（允许空字符串，返回 MATCH_NO）
-        out_author = await extract_artist(in_title)
+        out_author = extract_artist_sync(in_title)
         out_author = out_author if out_author else in_author
-        author_match = await query_author(out_author) if in_author else MATCH_NO
+        author_match = query_author_sync(out_author) if in_author else MATCH_NO
 
         # title 查询（复用 match-title 的过滤逻辑）
         if not in_title:
@@ -146,7 +468,7 @@ async def process_batch_request(req: BatchRequestItem) -> dict:
             if is_title_ignored(in_title):
                 title_match = MATCH_NO
             else:
-                title_match, _ = await query_match_title(in_title, in_author)
+                title_match, _ = query_match_title_sync(in_title, in_author, candidates)
 
         return {
             "type": req_type,
@@ -157,3 +479,227 @@ async def process_batch_request(req: BatchRequestItem) -> dict:
 
     else:
         return {"type": req_type, "error": f"Unknown request type: {req_type}"}
+
+
+# ============================================================
+# batch 执行计划：按类型分组、按归一化键去重，执行后按原顺序回填
+# ============================================================
+
+
+def _batch_key(req: BatchRequestItem) -> tuple:
+    """结果只依赖于该键：键相同的请求共用一次执行结果"""
+    req_type = req.type
+    if req_type == "extract-author":
+        return req_type, req.title
+    if req_type == "match-author":
+        author = req.author
+        return req_type, author.lower() if isinstance(author, str) else author
+    if req_type == "match-title":
+        title = req.title.strip()
+        author = req.author.strip().lower()
+        return req_type, _sanitize_title(title) if title else "", author
+    if req_type == "extract-match-author-and-match-title":
+        return req_type, req.title.strip(), req.author.strip()
+    return (req_type,)
+
+
+@dataclass
+class BatchPlan:
+    """unique: 去重后待执行的请求（同类型相邻）；slots[i]: 第 i 个原请求对应的 unique 下标"""
+
+    unique: list[BatchRequestItem]
+    slots: list[int]
+
+    def fan_out(self, unique_results: list[dict]) -> list[dict]:
+        return [unique_results[slot] for slot in self.slots]
+
+
+def plan_batch(items: list[BatchRequestItem]) -> BatchPlan:
+    """按类型分组、去重（组内保持首次出现顺序）"""
+    groups: dict[str, dict[tuple, int]] = {}  # type → 归一化键 → 组内序号
+    grouped: dict[str, list[BatchRequestItem]] = {}
+    refs: list[tuple[str, int]] = []
+    for item in items:
+        keys = groups.setdefault(item.type, {})
+        key = _batch_key(item)
+        pos = keys.get(key)
+        if pos is None:
+            pos = keys[key] = len(keys)
+            grouped.setdefault(item.type, []).append(item)
+        refs.append((item.type, pos))
+
+    unique: list[BatchRequestItem] = []
+    base: dict[str, int] = {}
+    for req_type, group in grouped.items():
+        base[req_type] = len(unique)
+        unique.extend(group)
+    return BatchPlan(unique=unique, slots=[base[t] + pos for t, pos in refs])
+
+
+def _batch_title(req: BatchRequestItem) -> str | None:
+    """process_batch_item 实际送入 query_match_title 的标题（不做标题匹配的请求返回 None）"""
+    if req.type in ("match-title", "extract-match-author-and-match-title"):
+        title = req.title.strip()
+    else:
+        return None
+    return _sanitize_title(title) if title else None
+
+
+def run_batch_items(items: list[BatchRequestItem]) -> list[dict]:
+    """逐项执行，单项异常转为 error 结果（进程内与进程池 worker 共用）
+
+    多个标题查询时先做 batch 级候选生成（需要 NumPy），posting list 在整批内只读取一次。
+    """
+    candidates = None
+    if BATCH_VECTORIZED:
+        titles = [
+            t
+            for t in map(_batch_title, items)
+            if t is not None and len(t) >= 2 and not is_title_ignored(t)
+        ]
+        if len(titles) >= 2:
+            candidates = BatchCandidates(cache_store.get_snapshot(), titles)
+
+    results = []
+    for item in items:
+        try:
+            results.append(process_batch_item(item, candidates))
+        except Exception as e:  # noqa: BLE001 — 单项失败不影响整批
+            traceback.print_exception(e)
+            logger.error(f"Batch request error for '{item.type}': {e}")
+            results.append({"type": item.type, "error": str(e)})
+    return results
+
+
+async def process_batch(items: list[BatchRequestItem]) -> list[dict]:
+    """/query/batch 入口：计划 → 执行（大批量走进程池）→ 回填，并记录去重率与各阶段耗时"""
+    t0 = time.perf_counter()
+    plan = plan_batch(items)
+    t1 = time.perf_counter()
+
+    unique_results = None
+    if matching_pool.enabled_for(len(plan.unique)):
+        try:
+            unique_results = await matching_pool.run_batch(plan.unique)
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            logger.error(f"Process pool failed, falling back to thread: {e}")
+    if unique_results is None:
+        # 在线程中执行，不阻塞事件循环
+        unique_results = await asyncio.to_thread(run_batch_items, plan.unique)
+    t2 = time.perf_counter()
+
+    results = plan.fan_out(unique_results)
+    t3 = time.perf_counter()
+
+    plan_ms, execute_ms, fanout_ms = (
+        (t1 - t0) * 1000,
+        (t2 - t1) * 1000,
+        (t3 - t2) * 1000,
+    )
+    batch_plan_stats.record(
+        len(items), len(plan.unique), plan_ms, execute_ms, fanout_ms
+    )
+    logger.debug(
+        f"Batch plan: {len(items)} items -> {len(plan.unique)} unique, "
+        f"plan {plan_ms:.2f}ms, execute {execute_ms:.2f}ms, fan-out {fanout_ms:.2f}ms"
+    )
+    return results
+
+
+async def stream_batch(
+    items: AsyncIterable[BatchRequestItem | str],
+) -> AsyncIterator[tuple[int, dict]]:
+    """流式 batch：边读入请求边执行，按完成顺序产出 (请求序号, 结果)
+
+    items 中的字符串表示该位置的请求无法解析（内容为错误信息），直接产出 error 结果。
+    同键请求只执行一次（已完成的直接产出，执行中的等待同一结果）。
+    新请求攒成块后提交：启用进程池时交给 worker，否则在线程中执行，事件循环保持响应。
+    进程池提交或执行失败（worker 崩溃、池已关闭）的块改在线程中执行，流照常完成。
+    """
+    handle = await matching_pool.publish_current() if matching_pool.running else None
+    done_keys: dict[tuple, dict] = {}
+    waiting: dict[tuple, list[int]] = {}  # 执行中的键 → 等待其结果的请求序号
+    # 执行中的块 → (块内请求, 各请求的键, 是否在进程池中执行)
+    inflight: dict[
+        asyncio.Future, tuple[list[BatchRequestItem], list[tuple], bool]
+    ] = {}
+    buffer: list[BatchRequestItem] = []
+    buffer_keys: list[tuple] = []
+
+    def run_in_thread(chunk: list[BatchRequestItem], keys: list[tuple]) -> None:
+        future = asyncio.ensure_future(asyncio.to_thread(run_batch_items, chunk))
+        inflight[future] = (chunk, keys, False)
+
+    def submit() -> None:
+        chunk, keys = buffer[:], buffer_keys[:]
+        buffer.clear()
+        buffer_keys.clear()
+        if handle is not None:
+            try:
+                inflight[matching_pool.submit(handle, chunk)] = (chunk, keys, True)
+                return
+            except (BrokenProcessPool, OSError, RuntimeError) as e:
+                logger.error(f"Process pool failed, falling back to thread: {e}")
+        run_in_thread(chunk, keys)
+
+    def collect(future: asyncio.Future) -> list[tuple[int, dict]]:
+        """取出已完成块的结果；进程池失败的块改在线程中重跑，稍后再收集"""
+        chunk, keys, pooled = inflight.pop(future)
+        if pooled and future.cancelled():
+            logger.error("Process pool chunk cancelled, falling back to thread")
+            run_in_thread(chunk, keys)
+            return []
+        try:
+            results = future.result()
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            if not pooled:
+                raise
+            logger.error(f"Process pool failed, falling back to thread: {e}")
+            run_in_thread(chunk, keys)
+            return []
+        out = []
+        for key, result in zip(keys, results, strict=True):
+            done_keys[key] = result
+            out.extend((index, result) for index in waiting.pop(key))
+        return out
+
+    index = -1
+    async for item in items:
+        index += 1
+        if isinstance(item, str):
+            yield index, {"type": "", "error": item}
+            continue
+        key = _batch_key(item)
+        if key in done_keys:
+            yield index, done_keys[key]
+            continue
+        if key in waiting:
+            waiting[key].append(index)
+            continue
+        waiting[key] = [index]
+        buffer.append(item)
+        buffer_keys.append(key)
+        # 流水线空闲时立即提交，避免慢速上传的请求在缓冲区里干等
+        if len(buffer) >= STREAM_CHUNK_SIZE or not inflight:
+            submit()
+
+        # 先产出已完成的块；执行中的块过多时等待至少一块完成（背压）
+        while inflight:
+            finished = [f for f in inflight if f.done()]
+            if not finished and len(inflight) >= STREAM_MAX_INFLIGHT:
+                finished, _ = await asyncio.wait(
+                    inflight, return_when=asyncio.FIRST_COMPLETED
+                )
+            if not finished:
+                break
+            for future in finished:
+                for pair in collect(future):
+                    yield pair
+
+    if buffer:
+        submit()
+    while inflight:
+        finished, _ = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+        for future in finished:
+            for pair in collect(future):
+                yield pair
@@ -0,0 +1,89 @@
+"""数字范围索引 — 去数字 trigram 倒排 + 区间树，为 exactly_match 的范围分支生成候选"""
+
+import re
+from array import array
+from dataclasses import dataclass
+
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def _strip_digits(s: str) -> str:
+    """删除所有数字。若 a 是 b 的子串，则 strip(a) 也是 strip(b) 的子串"""
+    return _DIGITS_RE.sub("", s)
+
+
+class _IntervalNode:
+    __slots__ = ("by_end", "by_start", "center", "left", "right")
+
+    def __init__(self, center: int):
+        self.center = center
+        self.by_start: list[tuple[int, int]] = []  # (start, idx)，start 升序
+        self.by_end: list[tuple[int, int]] = []  # (end, idx)，end 降序
+        self.left: _IntervalNode | None = None
+        self.right: _IntervalNode | None = None
+
+
+class IntervalIndex:
+    """静态中心区间树：stab(x) 以 O(log n + k) 返回所有包含 x 的区间 id。"""
+
+    def __init__(self, intervals: list[tuple[int, int, int]]):
+        """intervals: (start, end, idx)，闭区间"""
+        self.size = len(intervals)
+        self._root = self._build(intervals)
+
+    @classmethod
+    def _build(cls, intervals: list[tuple[int, int, int]]) -> _IntervalNode | None:
+        if not intervals:
+            return None
+        endpoints = sorted(p for start, end, _ in intervals for p in (start, end))
+        node = _IntervalNode(endpoints[len(endpoints) // 2])
+        left: list[tuple[int, int, int]] = []
+        right: list[tuple[int, int, int]] = []
+        for item in intervals:
+            start, end, idx = item
+            if end < node.center:
+                left.append(item)
+            elif start > node.center:
+                right.append(item)
+            else:
+                node.by_start.append((start, idx))
+                node.by_end.append((end, idx))
+        node.by_start.sort()
+        node.by_end.sort(reverse=True)
+        node.left = cls._build(left)
+        node.right = cls._build(right)
+        return node
+
+    def stab(self, x: int) -> list[int]:
+        """所有满足 start ≤ x ≤ end 的区间 id（无序）"""
+        result: list[int] = []
+        node = self._root
+        while node is not None:
+            if x < node.center:
+                for start, idx in node.by_start:
+                    if start > x:
+                        break
+                    result.append(idx)
+                node = node.left
+            elif x > node.center:
+                for end, idx in node.by_end:
+                    if end < x:
+                        break
+                    result.append(idx)
+                node = node.right
+            else:
+                result.extend(idx for _, idx in node.by_start)
+                break
+        return result
+
+
+@dataclass(frozen=True)
+class RangeIndex:
+    """仅覆盖带数字范围的标题。
+
+    gram_index: 去数字后的归一化标题 trigram → 标题索引
+    intervals:  各标题数字范围构成的区间树
+    """
+
+    gram_index: dict[str, array]
+    intervals: IntervalIndex
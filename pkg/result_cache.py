@@ -0,0 +1,187 @@
+"""查询结果缓存 — 按快照代数失效的进程内有界 LRU + 未命中 Bloom filter
+
+与 cache_middleware 的 HTTP 响应缓存无关：按单条查询缓存，batch 内各项也能复用。
+"""
+
+import hashlib
+import math
+import threading
+from collections import OrderedDict
+from collections.abc import Hashable
+
+_MISSING = object()
+
+
+class GenerationLRU:
+    """线程安全的有界 LRU，条目绑定 CacheStore 快照代数。
+
+    读写时带上当前快照的 generation：代数前进即整体清空（旧快照的结果全部作废），
+    比当前代数旧的写入直接丢弃（查询期间快照已被替换）。
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._data: OrderedDict[Hashable, object] = OrderedDict()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _sync_generation(self, generation: int) -> bool:
+        """对齐代数（需持锁），generation 过旧返回 False"""
+        if generation == self._generation:
+            return True
+        if generation < self._generation:
+            return False
+        if self._data:
+            self._data.clear()
+            self.invalidations += 1
+        self._generation = generation
+        return True
+
+    def get(self, key: Hashable, generation: int, default=None):
+        """命中返回缓存值并移到队尾，否则返回 default"""
+        with self._lock:
+            if self._sync_generation(generation):
+                value = self._data.get(key, _MISSING)
+                if value is not _MISSING:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, generation: int, value) -> None:
+        """写入结果；超出容量时淘汰最久未使用的条目"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if not self._sync_generation(generation):
+                return
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_stats(self) -> dict:
+        """命中 / 未命中计数与当前容量，供 /api/stats 展示"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "generation": self._generation,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+class NegativeFilter:
+    """按快照代数失效的 Bloom filter，记录已确认 MATCH_NO 的查询。
+
+    位数组按 capacity / fp_rate 定长分配；插入数达到 capacity 时整体重置，
+    使实际误判率不超过设计值。误判（把可匹配的查询当作未命中）概率即 fp_rate。
+    """
+
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        # 最优参数：m = -n·ln(p) / ln2²，k = m/n · ln2
+        self.num_bits = max(
+            8, math.ceil(-capacity * math.log(fp_rate) / math.log(2) ** 2)
+        )
+        self.num_hashes = max(1, round(self.num_bits / max(capacity, 1) * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.count = 0
+        self.hits = 0
+        self.checks = 0
+        self.resets = 0
+
+    def _positions(self, key: str) -> list[int]:
+        """双重哈希：h1 + i·h2 生成 k 个位位置"""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def _reset(self) -> None:
+        self._bits = bytearray(len(self._bits))
+        self.count = 0
+
+    def _sync_generation(self, generation: int) -> bool:
+        """对齐代数（需持锁），generation 过旧返回 False"""
+        if generation == self._generation:
+            return True
+        if generation < self._generation:
+            return False
+        if self.count:
+            self._reset()
+            self.resets += 1
+        self._generation = generation
+        return True
+
+    def __contains__(self, item: tuple[str, int]) -> bool:
+        """(key, generation) in filter：key 在该代数下是否（可能）已记录为未命中"""
+        key, generation = item
+        positions = self._positions(key)
+        with self._lock:
+            self.checks += 1
+            if not self._sync_generation(generation) or not self.count:
+                return False
+            # 位数组在 _reset 时整体替换：须在锁内、对齐代数之后读取
+            bits = self._bits
+            for pos in positions:
+                if not bits[pos >> 3] & (1 << (pos & 7)):
+                    return False
+            self.hits += 1
+            return True
+
+    def add(self, key: str, generation: int) -> None:
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            if not self._sync_generation(generation):
+                return
+            if self.count >= self.capacity:
+                self._reset()
+                self.resets += 1
+            bits = self._bits
+            for pos in self._positions(key):
+                bits[pos >> 3] |= 1 << (pos & 7)
+            self.count += 1
+
+    def estimated_fp_rate(self) -> float:
+        """当前填充下的误判率估计 (1 - e^(-kn/m))^k"""
+        k = self.num_hashes
+        return (1.0 - math.exp(-k * self.count / self.num_bits)) ** k
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": self.count,
+                "capacity": self.capacity,
+                "bytes": len(self._bits),
+                "hashes": self.num_hashes,
+                "generation": self._generation,
+                "checks": self.checks,
+                "hits": self.hits,
+                "resets": self.resets,
+                "target_fp_rate": self.fp_rate,
+                "estimated_fp_rate": round(self.estimated_fp_rate(), 8),
+            }
@@ -1,44 +1,74 @@
 """路由处理函数"""
 
-import asyncio
 import json
-import traceback
+from collections.abc import AsyncIterator
 from pathlib import Path
+from typing import Annotated
 
 from cache_middleware import cache as DCache
-from fastapi import APIRouter
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import APIRouter, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from starlette.requests import ClientDisconnect
 
 from pkg.cache import cache_store
+from pkg.codec import (
+    decode_batch_items,
+    encode_response,
+    render_body,
+    sends_msgpack,
+    wants_msgpack,
+)
 from pkg.constants import (
+    ENABLE_WATCHER,
     MATCH_EXACTLY,
     MATCH_NO,
+    SUGGEST_DEFAULT_K,
+    SUGGEST_MAX_K,
     logger,
     now_cst,
 )
+from pkg.listing import list_page
 from pkg.matching import _sanitize_title, is_title_ignored
 from pkg.models import (
     AuthorsResponse,
     BatchRequest,
+    BatchRequestItem,
     ExtractAuthorRequest,
+    ListQuery,
     MatchAuthorRequest,
     MatchTitleRequest,
+    MatchTitleTopKRequest,
     OpenTitlesResponse,
     QueryResponse,
     RefreshCacheResponse,
     RootResponse,
     StatsResponse,
+    SuggestResponse,
     TabCloseBatchRequest,
     TabOpenBatchRequest,
     TabsActionResponse,
+    TitleChangesResponse,
     TitlesResponse,
+    TopKResponse,
 )
+from pkg.packed_index import NgramIndex
+from pkg.payload import cached_response, payload_cache
+from pkg.pool import matching_pool
+from pkg.prefix_index import PrefixIndex
 from pkg.query import (
+    author_result_cache,
+    batch_plan_stats,
     extract_artist,
-    process_batch_request,
+    process_batch,
     query_author,
     query_match_title,
+    query_match_title_topk,
+    stream_batch,
+    title_negative_filter,
+    title_result_cache,
 )
+from pkg.suggest import suggest
 from pkg.tabs import open_tabs_store
 
 # -- admin 模板热加载 ---------------------------------------------------
@@ -77,7 +107,7 @@ async def root_endpoint():
     snap = cache_store.get_snapshot()
     msg = (
         f"Hello, World! Cache created/refreshed with"
-        f" {len(snap.titles)} cleaned titles,"
+        f" {len(snap.live_titles)} cleaned titles,"
         f" authorCache length: {len(snap.authors)}"
     )
     return {"message": msg}
@@ -100,6 +130,17 @@ async def match_title(req: MatchTitleRequest):
     return {"title": matched_title, "match": match_status}
 
 
+@query_router.post("/match-title/topk", response_model=TopKResponse)
+@DCache(timeout=300)
+async def match_title_topk(req: MatchTitleTopKRequest):
+    in_title = _sanitize_title(req.title)
+    if is_title_ignored(in_title):
+        return {"matches": []}
+    matches = await query_match_title_topk(in_title, req.author, req.k)
+    logger.debug(f"Query Title top-{req.k}, {len(matches)} found for '{in_title}'")
+    return {"matches": matches}
+
+
 @query_router.post("/match-author", response_model=QueryResponse)
 @DCache(timeout=300)
 async def match_author(req: MatchAuthorRequest):
@@ -117,38 +158,247 @@ async def extract_author(req: ExtractAuthorRequest):
     return {"author": author, "match": match_status}
 
 
-@query_router.post("/batch")
-@DCache(timeout=300)
-async def batch(req: BatchRequest):
-    tasks = [process_batch_request(r) for r in req.requests]
-    gathered = await asyncio.gather(*tasks, return_exceptions=True)
-    results = []
-    for i, result in enumerate(gathered):
-        req_type = req.requests[i].type
-        if isinstance(result, Exception):
-            traceback.print_exception(result)
-            logger.error(f"Batch request error for '{req_type}': {result}")
-            results.append({"type": req_type, "error": str(result)})
-        else:
-            results.append(result)
-    return JSONResponse(content={"results": results})
+def _validation_error(e: ValidationError) -> JSONResponse:
+    return JSONResponse(
+        content={"detail": e.errors(include_url=False, include_context=False)},
+        status_code=422,
+    )
+
+
+def _inline_schema(model: type[BaseModel]) -> dict:
+    """模型的 JSON Schema，$defs 引用就地展开（openapi_extra 中的模型不会登记到 components）"""
+    schema = model.model_json_schema()
+    defs = schema.pop("$defs", {})
+
+    def resolve(node):
+        if isinstance(node, dict):
+            if "$ref" in node:
+                return resolve(defs[node["$ref"].rsplit("/", 1)[-1]])
+            return {k: resolve(v) for k, v in node.items()}
+        if isinstance(node, list):
+            return [resolve(v) for v in node]
+        return node
+
+    return resolve(schema)
+
+
+_BATCH_BODY_SCHEMA = _inline_schema(BatchRequest)
+
+
+# 不加 @DCache：其缓存键按文本解码请求体且只缓存 JSON，无法区分 msgpack 协商；
+# 单项结果已由 title_result_cache / author_result_cache 复用
+# 请求体手动解码（JSON / msgpack 二选一），在 openapi_extra 中声明其 schema
+@query_router.post(
+    "/batch",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": _BATCH_BODY_SCHEMA},
+                "application/msgpack": {"schema": _BATCH_BODY_SCHEMA},
+            },
+        }
+    },
+)
+async def batch(request: Request):
+    """请求体为 BatchRequest JSON，或 Content-Type: application/msgpack 的同结构 MessagePack；
+    响应按 Accept 返回 JSON（默认）或 MessagePack"""
+    body = await request.body()
+    if sends_msgpack(request):
+        try:
+            items = decode_batch_items(body)
+        except (ValueError, TypeError) as e:
+            return JSONResponse(content={"detail": str(e)}, status_code=422)
+    else:
+        try:
+            items = BatchRequest.model_validate_json(body).requests
+        except ValidationError as e:
+            return _validation_error(e)
+    results = await process_batch(items)
+    return encode_response(request, {"results": results})
+
+
+# -- /query/batch/stream（NDJSON，不加 @DCache —— 流式响应）-------------
+
+
+async def _ndjson_items(request: Request) -> AsyncIterator[BatchRequestItem | str]:
+    """逐行解析流式请求体；无法解析的行原样产出错误信息（字符串）"""
+    pending = b""
+    async for chunk in request.stream():
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_item(line)
+    if pending.strip():
+        yield _parse_item(pending)
+
+
+def _parse_item(line: bytes) -> BatchRequestItem | str:
+    try:
+        return BatchRequestItem.model_validate_json(line)
+    except ValidationError as e:
+        return f"Invalid request line: {e.errors(include_url=False)[0]['msg']}"
+
+
+class _DuplexStreamingResponse(StreamingResponse):
+    """边读请求体边写响应。
+
+    StreamingResponse 默认并发 receive() 监听断连，会抢走尚未读取的请求体消息；
+    这里请求体由响应生成器自己消费（断连时 request.stream() 抛 ClientDisconnect）。
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect() from None
+
+
+async def _from_list(items: list[BatchRequestItem]) -> AsyncIterator[BatchRequestItem]:
+    for item in items:
+        yield item
+
+
+@query_router.post("/batch/stream")
+async def batch_stream(request: Request):
+    """流式 batch：请求体为 NDJSON（Content-Type: application/x-ndjson，每行一个请求）
+    或与 /query/batch 相同的 JSON；每完成一项输出一行 {"index": 序号, ...结果}"""
+    content_type = request.headers.get("content-type", "")
+    response_class = StreamingResponse
+    if content_type.startswith("application/x-ndjson"):
+        items = _ndjson_items(request)
+        response_class = _DuplexStreamingResponse
+    else:
+        try:
+            body = BatchRequest.model_validate_json(await request.body())
+        except ValidationError as e:
+            return _validation_error(e)
+        items = _from_list(body.requests)
+
+    async def lines() -> AsyncIterator[str]:
+        async for index, result in stream_batch(items):
+            yield json.dumps({"index": index, **result}, ensure_ascii=False) + "\n"
+
+    return response_class(lines(), media_type="application/x-ndjson")
 
 
 # -- /api ---------------------------------------------------------------
 
 
+# 列表全量响应每代快照只序列化一次（pkg.payload）；带分页 / 筛选参数时按需计算
+# 不加 @DCache（其缓存不区分 Accept 协商）
+
+
+async def _list_response(
+    request: Request,
+    kind: str,
+    values: list[str],
+    generation: int,
+    prefix_index: PrefixIndex | None,
+    ngram_indexes: tuple[NgramIndex | None, NgramIndex | None],
+    page: ListQuery,
+):
+    if page.is_full():
+        return await cached_response(
+            request,
+            (kind, wants_msgpack(request)),
+            generation,
+            lambda: render_body(
+                request, {kind: values, "count": len(values), "total": len(values)}
+            ),
+        )
+    items, total = list_page(
+        values,
+        page.offset,
+        page.limit,
+        page.prefix,
+        page.contains,
+        prefix_index,
+        *ngram_indexes,
+    )
+    return encode_response(request, {kind: items, "count": len(items), "total": total})
+
+
 @api_router.get("/titles", response_model=TitlesResponse)
-@DCache(timeout=300)
-async def titles():
+async def titles(request: Request, page: Annotated[ListQuery, Query()]):
+    """标题列表；prefix 忽略大小写（结果按字典序），contains 不区分大小写"""
     snap = cache_store.get_snapshot()
-    return {"titles": snap.titles, "count": len(snap.titles)}
+    if snap.has_delta:
+        # delta 层的索引按快照槽位编号，与现存标题列表的下标不对应：筛选走线性扫描
+        return await _list_response(
+            request,
+            "titles",
+            snap.live_titles,
+            snap.generation,
+            None,
+            (None, None),
+            page,
+        )
+    return await _list_response(
+        request,
+        "titles",
+        snap.titles,
+        snap.generation,
+        snap.title_prefix_index,
+        (snap.trigram_index, snap.bigram_index),
+        page,
+    )
+
+
+@api_router.get("/titles/changes", response_model=TitleChangesResponse)
+async def titles_changes(
+    request: Request, since: int = Query(0, ge=0), epoch: str = Query("")
+):
+    """自 since 代以来新增 / 删除的标题。
+
+    日志不覆盖 since、或 epoch 与本次启动不符（since 来自重启前）时返回全量（full=True）。
+    """
+    snap = cache_store.get_snapshot()
+    changelog = cache_store.changelog
+    changes = changelog.changes_since(since, snap.generation, epoch)
+    if changes is None:
+        added, removed, full = snap.live_titles, [], True
+    else:
+        (added, removed), full = changes, False
+    return encode_response(
+        request,
+        {
+            "epoch": changelog.epoch,
+            "generation": snap.generation,
+            "since": since,
+            "full": full,
+            "added": added,
+            "removed": removed,
+        },
+    )
 
 
 @api_router.get("/authors", response_model=AuthorsResponse)
-@DCache(timeout=300)
-async def authors():
+async def authors(request: Request, page: Annotated[ListQuery, Query()]):
+    """作者列表（作者均为小写，contains 不区分大小写）"""
+    snap = cache_store.get_snapshot()
+    return await _list_response(
+        request,
+        "authors",
+        snap.authors,
+        snap.generation,
+        # 新作者追加在 base 前缀索引之外
+        None if snap.has_delta else snap.author_prefix_index,
+        (snap.author_trigram_index, snap.author_bigram_index),
+        page,
+    )
+
+
+@api_router.get("/suggest", response_model=SuggestResponse)
+async def suggest_titles(
+    request: Request,
+    q: str = Query(min_length=1),
+    k: int = Query(SUGGEST_DEFAULT_K, ge=1, le=SUGGEST_MAX_K),
+):
+    """输入联想：以 q 开头的标题（忽略大小写）优先，不足 k 条时补充 trigram 模糊结果"""
     snap = cache_store.get_snapshot()
-    return {"authors": snap.authors, "count": len(snap.authors)}
+    return encode_response(request, {"query": q, "suggestions": suggest(snap, q, k)})
 
 
 @api_router.get("/stats", response_model=StatsResponse)
@@ -157,11 +407,27 @@ async def stats():
     from pkg.manager import request_stats
 
     stats_data = request_stats.get_stats()
+    watcher_stats = {}
+    if ENABLE_WATCHER:
+        from pkg.watcher import title_watcher
+
+        watcher_stats = title_watcher.get_stats()
     return {
-        "cache_count": len(snap.titles),
+        "cache_count": len(snap.live_titles),
         "author_count": len(snap.authors),
         "current_time": now_cst().strftime("%Y-%m-%d %H:%M:%S"),
         "request_stats": stats_data,
+        "result_cache": {
+            "match_title": title_result_cache.get_stats(),
+            "match_author": author_result_cache.get_stats(),
+            "match_title_negative": title_negative_filter.get_stats(),
+            "payload": payload_cache.get_stats(),
+        },
+        "process_pool": matching_pool.get_stats(),
+        "batch_plan": batch_plan_stats.get_stats(),
+        "title_changelog": cache_store.changelog.get_stats(),
+        "watcher": watcher_stats,
+        "delta_index": cache_store.get_delta_stats(),
     }
 
 
@@ -216,12 +482,10 @@ async def refresh_cache():
 
 
 @admin_router.get("/admin")
-@DCache(timeout=300)
-async def admin():
+async def admin(request: Request):
     snap = cache_store.get_snapshot()
-    cache_count = len(snap.titles)
+    cache_count = len(snap.live_titles)
     author_count = len(snap.authors)
-    current_time = now_cst().strftime("%Y-%m-%d %H:%M:%S")
 
     html = _load_admin()
     if html is None:
@@ -234,7 +498,14 @@ async def admin():
             status_code=500,
         )
 
-    html = html.replace("{cache_count}", str(cache_count))
-    html = html.replace("{author_count}", str(author_count))
-    html = html.replace("{current_time}", current_time)
-    return HTMLResponse(content=html)
+    def render() -> tuple[bytes, str]:
+        # current_time 为本代首次渲染的时间，页面加载后由 fetchStats 刷新
+        page = html.replace("{cache_count}", str(cache_count))
+        page = page.replace("{author_count}", str(author_count))
+        page = page.replace("{current_time}", now_cst().strftime("%Y-%m-%d %H:%M:%S"))
+        return page.encode("utf-8"), "text/html; charset=utf-8"
+
+    # 模板热加载：mtime 变化即换键
+    return await cached_response(
+        request, ("admin", _admin_mtime), snap.generation, render
+    )
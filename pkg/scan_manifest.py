@@ -0,0 +1,230 @@
+"""扫描清单 — 按目录 mtime 增量重扫文件系统，产出标题的新增 / 删除增量
+
+目录的 mtime 只在其直接子项增删 / 改名时变化：清单为每个目录记录 (mtime, 子目录, 标题)，
+重扫时仅对 mtime 变化的目录重新 scandir，其余沿用清单内容（每目录一次 stat）。
+清单与 TitlesCache.json 一同持久化，进程重启后同样只重扫变化的目录。
+"""
+
+import json
+import os
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import NamedTuple
+
+from pkg.constants import logger
+
+# mtime 距扫描时刻过近的目录不可信：同一时间粒度内的后续修改不会改变 mtime，
+# 记为 -1 使下次扫描必然重新列出（NAS 上 mtime 粒度可能只有 1~2 秒）
+_RACY_WINDOW_NS = 2_000_000_000
+_MANIFEST_VERSION = 1
+
+
+class DirListing(NamedTuple):
+    mtime_ns: int
+    subdirs: list[str]  # 需要递归的子目录（不跟随符号链接，同 os.walk）
+    names: list[str]  # 本目录贡献的标题（子目录名 + 压缩包名去扩展名）
+
+
+class ScanDelta(NamedTuple):
+    added: list[str]
+    removed: list[str]
+
+
+def _drop_subtree(tree: dict[str, DirListing], path: str) -> None:
+    """从清单中移除 path 及其全部子目录"""
+    prefix = os.path.join(path, "")
+    for key in [key for key in tree if key == path or key.startswith(prefix)]:
+        del tree[key]
+
+
+def _list_tree_dir(path: str) -> tuple[list[str], list[str]]:
+    """ManagedDir 下的一个目录：子目录名与 .zip / .rar 均为标题"""
+    subdirs, names = [], []
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir():
+                names.append(entry.name)
+                if not entry.is_symlink():
+                    subdirs.append(entry.name)
+            elif entry.name.endswith((".zip", ".rar")):
+                names.append(os.path.splitext(entry.name)[0])
+    return subdirs, names
+
+
+def _list_flat_dir(path: str) -> tuple[list[str], list[str]]:
+    """额外搜索目录：仅顶层 .zip"""
+    with os.scandir(path) as it:
+        names = [
+            os.path.splitext(entry.name)[0]
+            for entry in it
+            if entry.is_file() and entry.name.endswith(".zip")
+        ]
+    return [], names
+
+
+class ScanManifest:
+    """ManagedDir（递归）与额外搜索目录（仅顶层）的目录清单。
+
+    rescan() / refresh() 返回相对上次扫描的标题增量；names 为当前全部标题（去重）。
+    """
+
+    def __init__(self, root: str, extra_dirs: list[str]):
+        self.root = root
+        self.extra_dirs = list(extra_dirs)
+        self.tree: dict[str, DirListing] = {}
+        self.flat: dict[str, DirListing] = {}
+        self.names: set[str] = set()
+        self.relisted = 0  # 最近一次扫描重新列出的目录数
+        self.reused = 0  # 最近一次扫描沿用清单的目录数
+
+    # ================================================================
+    # 扫描
+    # ================================================================
+
+    def _listing(self, path: str, old: dict[str, DirListing], lister, now_ns: int):
+        """path 的目录清单：mtime 未变沿用 old，否则重新列出；无法访问返回 None"""
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        prev = old.get(path)
+        if prev is not None and prev.mtime_ns == mtime_ns:
+            self.reused += 1
+            return prev
+        try:
+            subdirs, names = lister(path)
+        except OSError as e:
+            logger.debug(f"Error scanning '{path}': {e}")
+            return None
+        self.relisted += 1
+        if now_ns - mtime_ns < _RACY_WINDOW_NS:
+            mtime_ns = -1
+        return DirListing(mtime_ns, subdirs, names)
+
+    def rescan(self) -> ScanDelta:
+        """按 mtime 增量重扫，更新清单并返回标题增量"""
+        self.relisted = self.reused = 0
+        now_ns = time.time_ns()
+
+        tree: dict[str, DirListing] = {}
+        if os.path.exists(self.root):
+            self._walk([self.root], tree, now_ns)
+
+        flat: dict[str, DirListing] = {}
+        for search_dir in self.extra_dirs:
+            if not os.path.isdir(search_dir):
+                logger.warning(f"Extra search dir not found, skipping: {search_dir}")
+                continue
+            listing = self._listing(search_dir, self.flat, _list_flat_dir, now_ns)
+            if listing is not None:
+                flat[search_dir] = listing
+
+        return self._commit(tree, flat)
+
+    def refresh(self, paths: Iterable[str]) -> ScanDelta:
+        """重新列出已知变化的目录（不比较 mtime，供文件监听使用），返回标题增量。
+
+        新出现的子目录递归列出；消失的子目录连同其子树移出清单。不在清单中的路径忽略。
+        """
+        self.relisted = self.reused = 0
+        now_ns = time.time_ns()
+        tree, flat = dict(self.tree), dict(self.flat)
+        for path in paths:
+            if path in flat:
+                listing = self._listing(path, {}, _list_flat_dir, now_ns)
+                if listing is None:
+                    del flat[path]
+                else:
+                    flat[path] = listing
+
+            prev = tree.get(path)
+            if prev is None:
+                continue
+            listing = self._listing(path, {}, _list_tree_dir, now_ns)
+            if listing is None:
+                _drop_subtree(tree, path)
+                continue
+            tree[path] = listing
+            for name in set(prev.subdirs) - set(listing.subdirs):
+                _drop_subtree(tree, os.path.join(path, name))
+            added = set(listing.subdirs) - set(prev.subdirs)
+            self._walk([os.path.join(path, name) for name in added], tree, now_ns)
+        return self._commit(tree, flat)
+
+    def _walk(self, stack: list[str], tree: dict[str, DirListing], now_ns: int) -> None:
+        """从 stack 中的目录向下遍历，mtime 未变的目录沿用 self.tree"""
+        while stack:
+            path = stack.pop()
+            listing = self._listing(path, self.tree, _list_tree_dir, now_ns)
+            if listing is None:
+                continue
+            tree[path] = listing
+            stack.extend(os.path.join(path, name) for name in listing.subdirs)
+
+    def _commit(
+        self, tree: dict[str, DirListing], flat: dict[str, DirListing]
+    ) -> ScanDelta:
+        """以新的目录清单替换当前清单（整体赋值，读取侧无需加锁），返回标题增量"""
+        names: set[str] = set()
+        for listing in (*tree.values(), *flat.values()):
+            names.update(listing.names)
+
+        delta = ScanDelta(sorted(names - self.names), sorted(self.names - names))
+        self.tree, self.flat, self.names = tree, flat, names
+        return delta
+
+    # ================================================================
+    # 持久化
+    # ================================================================
+
+    def to_dict(self) -> dict:
+        return {
+            "version": _MANIFEST_VERSION,
+            "root": self.root,
+            "extra_dirs": self.extra_dirs,
+            "tree": {path: list(listing) for path, listing in self.tree.items()},
+            "flat": {path: list(listing) for path, listing in self.flat.items()},
+        }
+
+    def save(self, filepath: str | Path) -> None:
+        with open(filepath, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def load(
+        cls, filepath: str | Path, root: str, extra_dirs: list[str]
+    ) -> "ScanManifest":
+        """读取清单；文件缺失、损坏或扫描路径已变更时返回空清单（下次 rescan 即全量）"""
+        manifest = cls(root, extra_dirs)
+        try:
+            with open(filepath, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if (
+                data.get("version") != _MANIFEST_VERSION
+                or data.get("root") != root
+                or data.get("extra_dirs") != manifest.extra_dirs
+            ):
+                return manifest
+            tree = {
+                path: DirListing(*listing) for path, listing in data["tree"].items()
+            }
+            flat = {
+                path: DirListing(*listing) for path, listing in data["flat"].items()
+            }
+        except FileNotFoundError:
+            return manifest
+        except (
+            OSError,
+            json.JSONDecodeError,
+            KeyError,
+            TypeError,
+            AttributeError,
+        ) as e:
+            logger.warning(f"Failed to load scan manifest: {e}")
+            return manifest
+
+        manifest.tree, manifest.flat = tree, flat
+        for listing in (*tree.values(), *flat.values()):
+            manifest.names.update(listing.names)
+        return manifest
@@ -0,0 +1,145 @@
+"""模糊打分器 — difflib 与位并行 Indel 相似度（Hyyrö bit-parallel LCS）
+
+Indel ratio = 2 * LCS / (len(a) + len(b))，与 difflib ratio 同为 [0, 1] 区间，
+可直接沿用 FUZZY_MATCH_THRESHOLD_* 作为 cutoff。LCS 不小于 difflib 的
+Ratcliff/Obershelp 匹配字符数，因此同一对字符串 Indel ratio ≥ difflib ratio。
+"""
+
+import difflib
+import heapq
+from collections.abc import Callable, Iterable
+
+# 每处理多少个字符检查一次是否可提前放弃
+_ABANDON_CHECK_STRIDE = 8
+
+
+def _pattern_masks(s: str) -> dict[str, int]:
+    """字符 → 该字符在 s 中出现位置的位掩码"""
+    masks: dict[str, int] = {}
+    for i, ch in enumerate(s):
+        masks[ch] = masks.get(ch, 0) | (1 << i)
+    return masks
+
+
+def _lcs_length(masks: dict[str, int], a_len: int, b: str, need: int = 0) -> int:
+    """位并行 LCS 长度（Hyyrö 2004），每个字符 O(1) 次大整数运算。
+
+    need > 0 时启用提前放弃：已得 LCS + b 剩余长度 < need 时直接返回 -1。
+    """
+    full = (1 << a_len) - 1
+    v = full
+    b_len = len(b)
+    for j, ch in enumerate(b, 1):
+        m = masks.get(ch)
+        if m is not None:
+            u = v & m
+            v = ((v + u) | (v - u)) & full
+        if (
+            need
+            and j % _ABANDON_CHECK_STRIDE == 0
+            and a_len - v.bit_count() + (b_len - j) < need
+        ):
+            return -1
+    return a_len - v.bit_count()
+
+
+def indel_ratio(a: str, b: str) -> float:
+    """Indel 相似度 2*LCS/(|a|+|b|)，两者皆空时为 1.0（与 difflib 一致）"""
+    total = len(a) + len(b)
+    if not total:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    return 2.0 * _lcs_length(_pattern_masks(a), len(a), b) / total
+
+
+def _check_args(n: int, cutoff: float) -> None:
+    if n <= 0:
+        raise ValueError(f"n must be > 0: {n!r}")
+    if not 0.0 <= cutoff <= 1.0:
+        raise ValueError(f"cutoff must be in [0.0, 1.0]: {cutoff!r}")
+
+
+def get_close_matches(
+    word: str, possibilities: Iterable[str], n: int = 3, cutoff: float = 0.6
+) -> list[str]:
+    """与 difflib.get_close_matches 同接口，打分换成位并行 Indel ratio。"""
+    return [x for _, x in scored_close_matches(word, possibilities, n, cutoff)]
+
+
+def scored_close_matches(
+    word: str, possibilities: Iterable[str], n: int = 3, cutoff: float = 0.6
+) -> list[tuple[float, str]]:
+    """位并行 Indel ratio 前 n 名，按分数降序返回 (score, x)。
+
+    维护大小为 n 的最小堆；长度上界 2*min/(la+lb) 或逐步 LCS 上界
+    低于当前门槛（cutoff 或堆顶分数）的候选直接放弃。
+    """
+    _check_args(n, cutoff)
+
+    a_len = len(word)
+    masks = _pattern_masks(word)
+    heap: list[tuple[float, str]] = []
+
+    for x in possibilities:
+        total = a_len + len(x)
+        if not total:
+            score = 1.0
+        else:
+            floor = heap[0][0] if len(heap) == n else cutoff
+            if 2.0 * min(a_len, len(x)) / total < floor:
+                continue
+            # 达到门槛所需的最小 LCS（取整前留一点余量，最终以精确分数判定）
+            need = max(int(floor * total / 2.0) - 1, 0)
+            lcs = _lcs_length(masks, a_len, x, need) if a_len else 0
+            if lcs < 0:
+                continue
+            score = 2.0 * lcs / total
+        if score < cutoff:
+            continue
+        if len(heap) < n:
+            heapq.heappush(heap, (score, x))
+        elif (score, x) > heap[0]:
+            heapq.heapreplace(heap, (score, x))
+
+    return sorted(heap, reverse=True)
+
+
+def difflib_scored_close_matches(
+    word: str, possibilities: Iterable[str], n: int = 3, cutoff: float = 0.6
+) -> list[tuple[float, str]]:
+    """difflib ratio 前 n 名，按分数降序返回 (score, x)，结果与 difflib.get_close_matches 一致。
+
+    real_quick_ratio / quick_ratio 是 ratio 的上界：堆满后以堆顶分数为门槛，
+    上界不超过门槛的候选不再计算完整 ratio。
+    """
+    _check_args(n, cutoff)
+    matcher = difflib.SequenceMatcher()
+    matcher.set_seq2(word)
+    heap: list[tuple[float, str]] = []
+    for x in possibilities:
+        matcher.set_seq1(x)
+        floor = heap[0][0] if len(heap) == n else cutoff
+        if matcher.real_quick_ratio() < floor or matcher.quick_ratio() < floor:
+            continue
+        score = matcher.ratio()
+        if score < cutoff:
+            continue
+        if len(heap) < n:
+            heapq.heappush(heap, (score, x))
+        elif (score, x) > heap[0]:
+            heapq.heapreplace(heap, (score, x))
+    return sorted(heap, reverse=True)
+
+
+# FUZZY_SCORER 可选值 → get_close_matches 实现
+SCORERS: dict[str, Callable[..., list[str]]] = {
+    "difflib": difflib.get_close_matches,
+    "bitparallel": get_close_matches,
+}
+
+# 同上，返回 (score, x)（top-k 接口需要分数）
+SCORED_SCORERS: dict[str, Callable[..., list[tuple[float, str]]]] = {
+    "difflib": difflib_scored_close_matches,
+    "bitparallel": scored_close_matches,
+}
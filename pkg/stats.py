@@ -1,4 +1,4 @@
-"""请求统计收集器"""
+"""请求统计收集器 — 端点耗时、batch 执行计划"""
 
 import threading
 import time
@@ -104,3 +104,62 @@ class RequestStatsCollector:
             "p90": round(_percentile(sorted_data, 90), 2),
             "p99": round(_percentile(sorted_data, 99), 2),
         }
+
+
+class BatchPlanStats:
+    """/query/batch 执行计划统计：去重率与 计划 / 执行 / 回填 各阶段耗时，线程安全。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.unique_items = 0
+        # 各阶段累计耗时（毫秒）
+        self._stage_ms = {"plan": 0.0, "execute": 0.0, "fanout": 0.0}
+        self._last: dict = {}
+
+    def record(
+        self,
+        items: int,
+        unique_items: int,
+        plan_ms: float,
+        execute_ms: float,
+        fanout_ms: float,
+    ) -> None:
+        """记录一次 batch 的计划结果与各阶段耗时（毫秒）"""
+        with self._lock:
+            self.batches += 1
+            self.items += items
+            self.unique_items += unique_items
+            self._stage_ms["plan"] += plan_ms
+            self._stage_ms["execute"] += execute_ms
+            self._stage_ms["fanout"] += fanout_ms
+            self._last = {
+                "items": items,
+                "unique_items": unique_items,
+                "dedup_ratio": _dedup_ratio(items, unique_items),
+                "plan_ms": round(plan_ms, 2),
+                "execute_ms": round(execute_ms, 2),
+                "fanout_ms": round(fanout_ms, 2),
+            }
+
+    def get_stats(self) -> dict:
+        """累计去重率、各阶段平均耗时，以及最近一次 batch 的明细"""
+        with self._lock:
+            batches = self.batches
+            return {
+                "batches": batches,
+                "items": self.items,
+                "unique_items": self.unique_items,
+                "dedup_ratio": _dedup_ratio(self.items, self.unique_items),
+                "avg_stage_ms": {
+                    stage: round(total / batches, 2) if batches else 0
+                    for stage, total in self._stage_ms.items()
+                },
+                "last": dict(self._last),
+            }
+
+
+def _dedup_ratio(items: int, unique_items: int) -> float:
+    """被去重掉的请求占比"""
+    return round(1 - unique_items / items, 4) if items else 0.0
@@ -0,0 +1,73 @@
+"""后缀数组 — 归一化标题拼接串上的子串检索（EXACT 阶段替代引擎）"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+
+# 标题分隔符：小于任何可见字符，且不会出现在标题中，保证匹配不会跨越两个标题
+_SEP = "\x00"
+
+
+@dataclass(frozen=True)
+class SuffixArray:
+    """拼接串 text 上的后缀数组。
+
+    text  = title_0 + SEP + title_1 + SEP + ...
+    sa    = 按「截断到所在标题末尾的后缀」字典序排列的起始位置
+    starts = 每个标题在 text 中的起始偏移（升序，用于位置 → 标题索引）
+    """
+
+    text: str
+    sa: array
+    starts: array
+
+    def find(self, pattern: str) -> list[int]:
+        """返回包含 pattern 的全部标题索引（升序、去重），O(|pattern| log N)。
+
+        命中即为子串关系，无需再次校验。
+        """
+        if not pattern or _SEP in pattern:
+            return []
+        m = len(pattern)
+        text = self.text
+
+        def key(p: int) -> str:
+            return text[p : p + m]
+
+        # 截断后缀有序 ⇒ 其长度 m 前缀亦有序；跨标题的前缀含 SEP，不会等于 pattern
+        lo = bisect_left(self.sa, pattern, key=key)
+        hi = bisect_right(self.sa, pattern, lo=lo, key=key)
+        if lo == hi:
+            return []
+
+        starts = self.starts
+        return sorted({bisect_right(starts, p) - 1 for p in self.sa[lo:hi]})
+
+
+def build_suffix_array(titles: list[str]) -> SuffixArray:
+    """在（已归一化的）标题列表上构建后缀数组。
+
+    先按首字符分桶，再在桶内以「截断到标题末尾的后缀」排序：
+    排序键长度受单个标题长度约束，峰值内存只与最大桶相关。
+    """
+    text = _SEP.join(titles) + _SEP
+    starts = array("I")
+    buckets: dict[str, list[int]] = {}
+
+    pos = 0
+    for title in titles:
+        starts.append(pos)
+        for offset, ch in enumerate(title):
+            bucket = buckets.get(ch)
+            if bucket is None:
+                bucket = buckets[ch] = []
+            bucket.append(pos + offset)
+        pos += len(title) + 1
+
+    sa = array("I")
+    for ch in sorted(buckets):
+        bucket = buckets.pop(ch)
+        bucket.sort(key=lambda p: text[p : text.index(_SEP, p)])
+        sa.extend(bucket)
+
+    return SuffixArray(text=text, sa=sa, starts=starts)
@@ -0,0 +1,82 @@
+"""后缀自动机 — 对单个输入标题建一次，流式求与任意候选的最长公共子串"""
+
+
+class SuffixAutomaton:
+    """字符串 s 的后缀自动机，O(|s|) 构建。
+
+    longest_common_substring(t) 以 O(|t|) 扫描候选 t，循环内不分配对象；
+    结果与 difflib.SequenceMatcher(None, s, t).find_longest_match() 的
+    (a, size) 一致（t 长度 < 200、autojunk 不生效时）：最长者中取在 s 里最靠前的。
+    """
+
+    __slots__ = ("_first", "_len", "_link", "_next", "size")
+
+    def __init__(self, s: str):
+        nxt: list[dict[str, int]] = [{}]
+        link = [-1]
+        length = [0]
+        first = [-1]  # 状态对应子串在 s 中首次出现的结束位置
+        last = 0
+
+        for i, ch in enumerate(s):
+            cur = len(length)
+            nxt.append({})
+            link.append(0)
+            length.append(length[last] + 1)
+            first.append(i)
+
+            p = last
+            while p != -1 and ch not in nxt[p]:
+                nxt[p][ch] = cur
+                p = link[p]
+            if p != -1:
+                q = nxt[p][ch]
+                if length[p] + 1 == length[q]:
+                    link[cur] = q
+                else:
+                    clone = len(length)
+                    nxt.append(dict(nxt[q]))
+                    link.append(link[q])
+                    length.append(length[p] + 1)
+                    first.append(first[q])
+                    while p != -1 and nxt[p].get(ch) == q:
+                        nxt[p][ch] = clone
+                        p = link[p]
+                    link[q] = clone
+                    link[cur] = clone
+            last = cur
+
+        self._next = nxt
+        self._link = link
+        self._len = length
+        self._first = first
+        self.size = len(s)
+
+    def longest_common_substring(self, t: str) -> tuple[int, int]:
+        """返回 (在 s 中的起点, 长度)；无公共字符时为 (0, 0)"""
+        nxt = self._next
+        link = self._link
+        length = self._len
+        first = self._first
+
+        state = 0
+        cur_len = 0
+        best_len = 0
+        best_start = 0
+        for ch in t:
+            trans = nxt[state]
+            while state and ch not in trans:
+                state = link[state]
+                cur_len = length[state]
+                trans = nxt[state]
+            target = trans.get(ch)
+            if target is None:
+                continue  # 已回到根且无此字符
+            state = target
+            cur_len += 1
+            if cur_len >= best_len:
+                start = first[state] - cur_len + 1
+                if cur_len > best_len or start < best_start:
+                    best_len = cur_len
+                    best_start = start
+        return best_start, best_len
@@ -0,0 +1,69 @@
+"""标题补全 — /api/suggest：前缀补全优先，不足 k 条时由 trigram 索引补充模糊结果
+
+前缀：快照 title_prefix_index 上的区间，按标题长度取前 k（越短越接近输入）；
+模糊：查询中最稀有的若干 gram 的 posting list 计数，按共有 gram 数降序、长度升序取前 k。
+两步都有扫描上界，单次查询耗时与语料规模无关。
+"""
+
+import heapq
+from collections import Counter
+
+from pkg.constants import (
+    SUGGEST_FUZZY_MAX_GRAMS,
+    SUGGEST_FUZZY_MAX_POSTINGS,
+    SUGGEST_MAX_SCAN,
+)
+from pkg.matching import _pick_grams
+from pkg.models import CacheSnapshot
+
+
+def _prefix_completions(snapshot: CacheSnapshot, query: str, k: int) -> list[int]:
+    index = snapshot.title_prefix_index
+    lo, hi = index.range(query)
+    # 区间过大（输入很短）时只看字典序最前的 SUGGEST_MAX_SCAN 个
+    window = index.order[lo : min(hi, lo + SUGGEST_MAX_SCAN)]
+    titles = snapshot.titles
+    if snapshot.has_delta:
+        # 前缀索引只覆盖 base：排除墓碑，delta 层追加的标题逐个比较
+        tombstones = snapshot.tombstones
+        folded = query.casefold()
+        window = [idx for idx in window if idx not in tombstones]
+        window.extend(
+            idx
+            for idx in snapshot.delta_slots
+            if idx not in tombstones and titles[idx].casefold().startswith(folded)
+        )
+    return heapq.nsmallest(k, window, key=lambda idx: (len(titles[idx]), idx))
+
+
+def _fuzzy_completions(
+    snapshot: CacheSnapshot, query: str, k: int, exclude: set[int]
+) -> list[int]:
+    prepared = _pick_grams(query, snapshot.trigram_index, snapshot.bigram_index)
+    if prepared is None:
+        return []
+    grams, index = prepared
+    # grams 已按 posting list 长度升序：只取最稀有的若干个，计数量有上界
+    grams = grams[:SUGGEST_FUZZY_MAX_GRAMS]
+    shared: Counter[int] = Counter()
+    for gram in grams:
+        postings = index.get(gram)
+        # 高频 gram 区分度低且计数开销大，直接跳过
+        if postings and len(postings) <= SUGGEST_FUZZY_MAX_POSTINGS:
+            shared.update(postings)
+    # 至少共有一半的 gram 才算候选
+    min_shared = (len(grams) + 1) // 2
+    titles = snapshot.titles
+    return heapq.nsmallest(
+        k,
+        (idx for idx, n in shared.items() if n >= min_shared and idx not in exclude),
+        key=lambda idx: (-shared[idx], len(titles[idx]), idx),
+    )
+
+
+def suggest(snapshot: CacheSnapshot, query: str, k: int) -> list[str]:
+    """返回至多 k 条补全：前缀命中在前，模糊命中在后"""
+    hits = _prefix_completions(snapshot, query, k)
+    if len(hits) < k:
+        hits += _fuzzy_completions(snapshot, query, k - len(hits), set(hits))
+    return [snapshot.titles[idx] for idx in hits]
@@ -0,0 +1,59 @@
+"""文本工具 — 标题归一化、数字 / 数字范围提取（cache 与 matching 共用的纯函数）"""
+
+import re
+
+# 数字范围分隔符归一化表：将所有变体统一映射到 '-'
+_RANGE_SEP_TRANS = str.maketrans(
+    {
+        "～": "-",
+        "〜": "-",
+        "－": "-",
+        "~": "-",
+    }
+)
+
+
+def _normalize_range_separators(s: str) -> str:
+    """将各种数字范围分隔符统一转换为 '-'，确保缓存和输入一致匹配。"""
+    return s.translate(_RANGE_SEP_TRANS)
+
+
+def extract_number_from_string(s: str) -> int | None:
+    """从字符串中提取数字，优先 #数字 格式，其次末位含数字 token"""
+    m = re.search(r"#(\d+)", s)
+    if m:
+        return int(m.group(1))
+
+    parts = s.split(" ")
+    for p in reversed(parts):
+        m = re.search(r"\d+", p)
+        if m:
+            return int(m.group())
+
+    # 兜底：字符串中任意数字
+    m = re.search(r"\d+", s)
+    return int(m.group()) if m else None
+
+
+def extract_number_range_from_string(s: str) -> tuple[int, int] | None:
+    """提取数字范围（如 1-3, 01~05），过滤日期和序数词"""
+    s = _normalize_range_separators(s)
+
+    for m in re.finditer(r"(\d+)\s*-\s*(\d+)", s):
+        start = int(m.group(1))
+        end = int(m.group(2))
+        if start > end:
+            continue
+
+        # 过滤：日期格式（年份 1900-2100）
+        if 1900 <= start <= 2100:
+            continue
+
+        # 过滤：序数词（1st, 2nd, 21th 等）
+        after = s[m.end() : m.end() + 3].lower()
+        if re.match(r"(st|nd|rd|th)", after):
+            continue
+
+        return start, end
+
+    return None
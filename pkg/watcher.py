@@ -0,0 +1,264 @@
+"""文件监听 — inotify 监听 ManagedDir / 额外搜索目录，去抖后以标题增量更新缓存
+
+每个已知目录一个 inotify watch（ctypes 直接调用 libc，无需第三方依赖）：
+压缩包或子目录的创建 / 删除 / 改名只把所在目录记为“脏”，合并窗口结束后
+仅重新列出这些目录（ScanManifest.refresh），以增量更新 CacheStore。
+inotify 不可用（非 Linux、watch 数超限等）时退化为按目录 mtime 的周期轮询。
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import os
+import struct
+import sys
+from collections.abc import Awaitable, Callable
+
+from pkg.cache import CacheStore, cache_store
+from pkg.constants import (
+    WATCHER_DEBOUNCE_SECONDS,
+    WATCHER_POLL_INTERVAL_SECONDS,
+    logger,
+)
+
+# inotify 仅 Linux 提供；Windows 上 find_library("c") 返回 None，CDLL(None) 会抛 TypeError
+_libc_name = ctypes.util.find_library("c") if sys.platform.startswith("linux") else None
+try:
+    if _libc_name is None:
+        raise OSError(errno.ENOSYS, "libc not found")
+    _libc = ctypes.CDLL(_libc_name, use_errno=True)
+    _inotify_init1 = _libc.inotify_init1
+    _inotify_add_watch = _libc.inotify_add_watch
+    _inotify_rm_watch = _libc.inotify_rm_watch
+    _inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+except (OSError, AttributeError):
+    _libc = None
+
+# --- <sys/inotify.h> ---
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = (
+    IN_CREATE
+    | IN_DELETE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+    | IN_ONLYDIR
+)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+_TITLE_EXTENSIONS = (".zip", ".rar")
+
+
+def _os_error(path: str = "") -> OSError:
+    err = ctypes.get_errno()
+    return OSError(err, os.strerror(err), path or None)
+
+
+class Inotify:
+    """非阻塞 inotify 实例的最小封装"""
+
+    def __init__(self):
+        if _libc is None:
+            raise OSError(errno.ENOSYS, "inotify is not available")
+        self.fd = _inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise _os_error()
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = _inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise _os_error(path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        _inotify_rm_watch(self.fd, wd)  # watch 已被内核移除时返回 EINVAL，忽略
+
+    def read_events(self) -> list[tuple[int, int, str]]:
+        """读出当前全部待处理事件 (wd, mask, name)"""
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((wd, mask, name))
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class TitleWatcher:
+    """监听清单中的全部目录，合并事件后以目录为单位增量更新 CacheStore。"""
+
+    def __init__(self, store: CacheStore):
+        self.store = store
+        self.mode = "off"  # "inotify" / "polling"
+        self.events = 0
+        self.flushes = 0
+        self._inotify: Inotify | None = None
+        self._wd_paths: dict[int, str] = {}
+        self._path_wds: dict[str, int] = {}
+        self._dirty: set[str] = set()
+        self._overflow = False
+        self._wakeup: asyncio.Event | None = None
+
+    # ================================================================
+    # watch 管理
+    # ================================================================
+
+    def _sync_watches(self) -> list[str]:
+        """使 watch 集合与清单中的目录一致，返回新增 watch 的目录"""
+        manifest = self.store.scan_manifest
+        desired = set(manifest.tree) | set(manifest.flat)
+        # 先移除再添加：目录改名后新旧路径对应同一 inode，顺序相反会误删新 watch
+        for path in self._path_wds.keys() - desired:
+            wd = self._path_wds.pop(path)
+            self._wd_paths.pop(wd, None)
+            self._inotify.rm_watch(wd)
+        added = []
+        for path in desired - self._path_wds.keys():
+            try:
+                wd = self._inotify.add_watch(path, _WATCH_MASK)
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    raise  # 超出 fs.inotify.max_user_watches
+                continue  # 目录已消失：其父目录的事件会使其移出清单
+            self._wd_paths[wd] = path
+            self._path_wds[path] = wd
+            added.append(path)
+        return added
+
+    def _on_readable(self) -> None:
+        for wd, mask, name in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                self._overflow = True  # 事件丢失，下次改为按 mtime 全量重扫
+            elif mask & IN_IGNORED:
+                path = self._wd_paths.pop(wd, None)
+                if path is not None and self._path_wds.get(path) == wd:
+                    del self._path_wds[path]
+                continue
+            else:
+                path = self._wd_paths.get(wd)
+                if path is None:
+                    continue
+                if not (
+                    mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_ISDIR)
+                    or name.endswith(_TITLE_EXTENSIONS)
+                ):
+                    continue
+                self._dirty.add(path)
+            self.events += 1
+            self._wakeup.set()
+
+    # ================================================================
+    # 运行
+    # ================================================================
+
+    def _flush(self, dirty: set[str], overflow: bool) -> bool:
+        """重新列出脏目录并应用增量，有变化时持久化（在线程中执行）
+
+        快照带 delta 层时不在此持久化，由 compaction 完成后保存。
+        """
+        if overflow:
+            updated = self.store._rescan_filesystem()
+        else:
+            updated = self.store.apply_dir_changes(dirty)
+        if updated and not self.store.get_snapshot().has_delta:
+            self.store.save()
+        return updated
+
+    async def run(self, on_update: Callable[[], Awaitable[None]] | None = None) -> None:
+        """后台任务：建立清单与 watch 后持续应用目录变更；on_update 在标题变化后调用"""
+        self._wakeup = asyncio.Event()
+        await asyncio.to_thread(
+            self._flush, set(), True
+        )  # 建立清单，补上停机期间的变更
+        loop = asyncio.get_running_loop()
+        try:
+            try:
+                self._inotify = Inotify()
+                await asyncio.to_thread(self._sync_watches)
+                # 清单建立到 watch 生效之间的变更：再按 mtime 扫一次
+                await asyncio.to_thread(self._flush, set(), True)
+                self._dirty.update(self._sync_watches())
+                self.mode = "inotify"
+                logger.info(
+                    f"Watching {len(self._path_wds)} directories for title changes"
+                )
+                loop.add_reader(self._inotify.fd, self._on_readable)
+                if self._dirty:
+                    self._wakeup.set()
+                await self._watch(on_update)
+            except OSError as e:
+                logger.warning(
+                    f"inotify watcher unavailable, falling back to polling: {e}"
+                )
+                self._close(loop)
+                await self._poll(on_update)
+        finally:
+            self._close(loop)
+
+    async def _watch(self, on_update: Callable[[], Awaitable[None]] | None) -> None:
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(WATCHER_DEBOUNCE_SECONDS)
+            self._wakeup.clear()
+            dirty, self._dirty = self._dirty, set()
+            overflow, self._overflow = self._overflow, False
+            updated = await asyncio.to_thread(self._flush, dirty, overflow)
+            self.flushes += 1
+            # 新目录在列出之后才加上 watch：再列一次，补上其间创建的条目
+            self._dirty.update(self._sync_watches())
+            if self._dirty:
+                self._wakeup.set()
+            if updated and on_update is not None:
+                await on_update()
+
+    async def _poll(self, on_update: Callable[[], Awaitable[None]] | None) -> None:
+        self.mode = "polling"
+        while True:
+            await asyncio.sleep(WATCHER_POLL_INTERVAL_SECONDS)
+            updated = await asyncio.to_thread(self._flush, set(), True)
+            self.flushes += 1
+            if updated and on_update is not None:
+                await on_update()
+
+    def _close(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._inotify is not None:
+            loop.remove_reader(self._inotify.fd)
+            self._inotify.close()
+            self._inotify = None
+        self._wd_paths.clear()
+        self._path_wds.clear()
+        self.mode = "off"
+
+    def get_stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "watches": len(self._path_wds),
+            "events": self.events,
+            "flushes": self.flushes,
+        }
+
+
+# --- 模块级单例 ---
+title_watcher = TitleWatcher(cache_store)
@@ -1,4 +1,8 @@
-from pkg.cache import _build_ngram_index, _extract_ngrams
+from array import array
+from unittest.mock import patch
+
+from pkg.cache import CacheStore, _build_ngram_index, _extract_ngrams
+from pkg.scan_manifest import ScanDelta
 
 
 class TestExtractNgrams:
@@ -24,9 +28,15 @@ class TestBuildNgramIndex:
         idx = _build_ngram_index(titles, n=3)
         # "abcde" grams: abc, bcd, cde  → indices 0
         # "bcdef" grams: bcd, cde, def  → indices 1
-        assert idx["abc"] == frozenset({0})
-        assert idx["bcd"] == frozenset({0, 1})
-        assert idx["def"] == frozenset({1})
+        assert idx["abc"] == array("I", [0])
+        assert idx["bcd"] == array("I", [0, 1])
+        assert idx["def"] == array("I", [1])
+
+    def test_postings_sorted_and_unique(self):
+        titles = ["aaaa", "xaaa", "aaax"]
+        idx = _build_ngram_index(titles, n=3)
+        # "aaaa" 含两次 "aaa"，posting 中只出现一次
+        assert idx["aaa"] == array("I", [0, 1, 2])
 
     def test_empty_titles(self):
         assert _build_ngram_index([], 3) == {}
@@ -36,3 +46,112 @@ class TestBuildNgramIndex:
         idx = _build_ngram_index(titles, n=3)
         # "ab" has no trigram, should be skipped
         assert "ab" not in idx
+
+
+class TestCacheStoreGeneration:
+    def test_update_bumps_generation(self):
+        store = CacheStore()
+        assert store.get_snapshot().generation == 0
+        store._update(["[A] abc", "[B] def"])
+        first = store.get_snapshot()
+        store._update(["[A] abc"])
+        assert first.generation == 1
+        assert store.get_snapshot().generation == 2
+
+    def test_update_records_changes(self):
+        store = CacheStore()
+        store._update(["[A] abc", "[B] def"])
+        store._update(["[A] abc", "[C] ghi"])
+        assert store.changelog.changes_since(1, 2) == (["[C] ghi"], ["[B] def"])
+        # 首次加载不入日志，since=0 需回退全量
+        assert store.changelog.changes_since(0, 2) is None
+
+
+class TestCacheStoreDelta:
+    def test_delta_applied(self):
+        store = CacheStore()
+        store._update(["[A] abc", "[B] def"])
+        delta = ScanDelta(added=["[C] ghi"], removed=["[B] def"])
+        assert store._update_delta(delta, {"[A] abc", "[C] ghi"})
+        assert store.titles == ["[C] ghi", "[A] abc"]
+        assert store.get_snapshot().generation == 2
+
+    def test_empty_delta_keeps_snapshot(self):
+        store = CacheStore()
+        store._update(["[A] abc"])
+        snapshot = store.get_snapshot()
+        assert not store._update_delta(ScanDelta([], []), {"[A] abc"})
+        assert store.get_snapshot() is snapshot
+
+    def test_out_of_sync_falls_back_to_names(self):
+        store = CacheStore()
+        store._update(["[A] abc", "[Z] stale"])
+        assert store._update_delta(ScanDelta(["[C] ghi"], []), {"[A] abc", "[C] ghi"})
+        assert store.titles == ["[C] ghi", "[A] abc"]
+
+    def test_out_of_sync_same_size_reconciled(self):
+        # 缓存与清单数量相同但内容不同、增量为空：仍以清单为准
+        store = CacheStore()
+        store._update(["[A] abc", "[Z] stale"])
+        assert store._update_delta(ScanDelta([], []), {"[A] abc", "[C] ghi"})
+        assert sorted(store.titles) == ["[A] abc", "[C] ghi"]
+
+
+@patch("pkg.cache.ENABLE_DELTA_INDEX", True)
+class TestCacheStoreDeltaIndex:
+    def setup_method(self):
+        self.store = CacheStore()
+        self.store._update(["[A] abc", "[B] def", "[C] ghi"])
+
+    def test_small_change_goes_to_delta(self):
+        store = self.store
+        base = store.get_snapshot()
+        assert store._update_delta(
+            ScanDelta(["[D] jkl"], ["[B] def"]), {"[A] abc", "[C] ghi", "[D] jkl"}
+        )
+        snapshot = store.get_snapshot()
+        assert snapshot.suffix_array is base.suffix_array  # base 层未重建
+        assert snapshot.has_delta
+        assert snapshot.titles[:3] == base.titles
+        assert set(store.titles) == {"[A] abc", "[C] ghi", "[D] jkl"}
+        assert store.changelog.changes_since(1, 2) == (["[D] jkl"], ["[B] def"])
+        assert store.get_delta_stats()["delta_titles"] == 1
+
+    def test_watcher_refresh_keeps_duplicates(self):
+        store = self.store
+        # 清理后重名：" [A] abc" 被删除但 "[A] abc" 仍在
+        names = {"[A] abc", "[B] def", "[C] ghi"}
+        assert not store._update_delta(
+            ScanDelta([], [" [A] abc"]), names, reconcile=False
+        )
+        assert store._update_delta(
+            ScanDelta([], ["[B] def"]), names - {"[B] def"}, reconcile=False
+        )
+        assert set(store.titles) == {"[A] abc", "[C] ghi"}
+
+    def test_compact_merges_delta(self):
+        store = self.store
+        store._update_delta(
+            ScanDelta(["[D] jkl"], ["[B] def"]), {"[A] abc", "[C] ghi", "[D] jkl"}
+        )
+        assert store.compact()
+        snapshot = store.get_snapshot()
+        assert not snapshot.has_delta
+        assert snapshot.titles == ["[D] jkl", "[C] ghi", "[A] abc"]
+        assert snapshot.generation == 3
+        assert store.changelog.changes_since(1, 3) == (["[D] jkl"], ["[B] def"])
+        assert not store.compact()
+        # 合并后的增量在新 base 上继续
+        assert store._update_delta(
+            ScanDelta(["[E] mno"], []), {"[A] abc", "[C] ghi", "[D] jkl", "[E] mno"}
+        )
+        assert store.get_snapshot().delta_slots == range(3, 4)
+
+    def test_oversized_change_rebuilds(self):
+        store = self.store
+        with patch("pkg.cache.DELTA_INDEX_MAX_SIZE", 1):
+            assert store._update_delta(
+                ScanDelta(["[D] jkl", "[E] mno"], []),
+                {"[A] abc", "[B] def", "[C] ghi", "[D] jkl", "[E] mno"},
+            )
+        assert not store.get_snapshot().has_delta
@@ -0,0 +1,80 @@
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pkg.changelog import TitleChangeLog
+
+_versions = st.lists(st.sets(st.sampled_from("abcdefgh")), min_size=1, max_size=10)
+
+# ==== Property-based tests ====
+
+
+@given(_versions, st.data())
+def test_changes_rebuild_latest(versions, data):
+    """任一代的标题集合应用 changes_since 的净变更后等于最新集合。"""
+    log = TitleChangeLog(max_generations=100, max_titles=1000)
+    for gen in range(1, len(versions)):
+        log.record(gen, sorted(versions[gen - 1]), sorted(versions[gen]))
+    latest = len(versions) - 1
+    since = data.draw(st.integers(0, latest))
+
+    added, removed = log.changes_since(since, latest)
+    assert not set(added) & set(removed)
+    assert (versions[since] - set(removed)) | set(added) == versions[latest]
+
+
+# ==== Test classes ====
+
+
+class TestTitleChangeLog:
+    def test_same_generation_is_empty(self):
+        log = TitleChangeLog(4, 100)
+        assert log.changes_since(3, 3) == ([], [])
+
+    def test_other_epoch_needs_full(self):
+        log = TitleChangeLog(4, 100)
+        log.record(1, [], ["a"])
+        assert log.changes_since(0, 1, log.epoch) == (["a"], [])
+        # 上次启动的 since 属于另一段代数序列
+        assert log.changes_since(0, 1, "stale") is None
+        assert log.changes_since(1, 1, "") is None
+        assert TitleChangeLog(4, 100).epoch != log.epoch
+
+    def test_future_since_needs_full(self):
+        log = TitleChangeLog(4, 100)
+        assert log.changes_since(5, 3) is None
+
+    def test_bounded_generations(self):
+        log = TitleChangeLog(2, 100)
+        titles: list[str] = []
+        for gen in range(1, 5):
+            log.record(gen, titles, titles + [str(gen)])
+            titles = titles + [str(gen)]
+        assert log.changes_since(2, 4) == (["3", "4"], [])
+        assert log.changes_since(1, 4) is None
+
+    def test_bounded_titles(self):
+        log = TitleChangeLog(10, 3)
+        log.record(1, [], ["a", "b"])
+        log.record(2, ["a", "b"], ["a", "b", "c", "d"])
+        assert log.changes_since(0, 2) is None
+        assert log.get_stats()["titles"] == 2
+
+    def test_oversized_change_clears_log(self):
+        log = TitleChangeLog(10, 2)
+        log.record(1, [], ["a"])
+        log.record(2, ["a"], ["b", "c", "d"])
+        assert log.changes_since(1, 2) is None
+        assert log.get_stats()["generations"] == 0
+
+    def test_newer_entries_ignored(self):
+        """日志已记录但快照尚未替换的代数不计入。"""
+        log = TitleChangeLog(10, 100)
+        log.record(1, [], ["a"])
+        log.record(2, ["a"], ["a", "b"])
+        assert log.changes_since(0, 1) == (["a"], [])
+
+    def test_add_then_remove_cancels(self):
+        log = TitleChangeLog(10, 100)
+        log.record(1, ["a"], ["a", "b"])
+        log.record(2, ["a", "b"], ["a"])
+        assert log.changes_since(0, 2) == ([], [])
@@ -0,0 +1,68 @@
+import pytest
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pkg.codec import _has_media_type, decode_batch_items
+
+msgpack = pytest.importorskip("msgpack")
+
+_items = st.lists(
+    st.tuples(st.sampled_from(["match-title", "match-author"]), st.text(), st.text()),
+    max_size=20,
+)
+
+# ==== Property-based tests ====
+
+
+@given(_items)
+def test_decode_roundtrip(items):
+    """msgpack 编码的 BatchRequest 解码后字段与原始一致。"""
+    body = [{"type": t, "title": title, "author": a} for t, title, a in items]
+    decoded = decode_batch_items(msgpack.packb({"requests": body}))
+    assert [(d.type, d.title, d.author) for d in decoded] == items
+
+
+# ==== Test classes ====
+
+
+class TestMediaType:
+    def test_matches_listed_type(self):
+        header = "text/html, application/msgpack;q=0.9"
+        assert _has_media_type(header, ("application/msgpack",))
+
+    def test_ignores_case_and_whitespace(self):
+        assert _has_media_type(" Application/MsgPack ", ("application/msgpack",))
+
+    def test_no_match(self):
+        assert not _has_media_type("application/json", ("application/msgpack",))
+        assert not _has_media_type("", ("application/msgpack",))
+
+
+class TestDecodeBatchItems:
+    def test_invalid_bytes(self):
+        with pytest.raises(ValueError, match="Invalid msgpack"):
+            decode_batch_items(b"\xc1")
+
+    def test_requests_not_list(self):
+        with pytest.raises(TypeError, match="'requests'"):
+            decode_batch_items(msgpack.packb({"requests": "x"}))
+
+    def test_item_not_map(self):
+        with pytest.raises(TypeError, match=r"requests\[0\]"):
+            decode_batch_items(msgpack.packb({"requests": [1]}))
+
+    def test_defaults(self):
+        (item,) = decode_batch_items(
+            msgpack.packb({"requests": [{"type": "match-title"}]})
+        )
+        assert (item.title, item.author) == ("", "")
+
+    def test_missing_type(self):
+        with pytest.raises(TypeError, match=r"requests\[0\]\.type"):
+            decode_batch_items(msgpack.packb({"requests": [{"title": "t"}]}))
+
+    def test_non_string_field(self):
+        with pytest.raises(TypeError, match=r"requests\[1\]\.title"):
+            decode_batch_items(
+                msgpack.packb({"requests": [{"type": "a"}, {"type": "a", "title": 3}]})
+            )
@@ -0,0 +1,178 @@
+from array import array
+from unittest.mock import patch
+
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+import pkg.cache
+from pkg.cache import _build_ngram_index, _extract_ngrams, apply_delta, build_snapshot
+from pkg.delta_index import LayeredIndex, LayeredIntervals
+from pkg.range_index import IntervalIndex
+
+# ==== Property-based tests ====
+
+SMALL_TEXT = st.text(st.sampled_from("abcd1-[] "), min_size=1, max_size=10)
+
+
+@st.composite
+def _changes(draw):
+    """base 标题 + 两轮 (新增, 删除)：删除从当时的现存标题中选取"""
+    base = draw(st.lists(SMALL_TEXT, max_size=20, unique=True))
+    live = set(base)
+    rounds = []
+    for _ in range(2):
+        added = [
+            t
+            for t in draw(st.lists(SMALL_TEXT, max_size=5, unique=True))
+            if t not in live
+        ]
+        removed = draw(st.sets(st.sampled_from(sorted(live)))) if live else set()
+        live = (live - removed) | set(added)
+        rounds.append((added, removed))
+    return base, rounds
+
+
+def _apply_rounds(base, rounds):
+    snapshot = build_snapshot(sorted(base, reverse=True), 1)
+    for generation, (added, removed) in enumerate(rounds, start=2):
+        slots = {
+            t: i for i, t in enumerate(snapshot.titles) if i not in snapshot.tombstones
+        }
+        snapshot = apply_delta(snapshot, added, [slots[t] for t in removed], generation)
+    return snapshot
+
+
+@given(_changes())
+@settings(deadline=None)
+def test_layered_index_equals_rebuilt(changes):
+    """delta 层叠加后的 posting list 与按现存标题重建的索引一致（索引为快照槽位）。"""
+    snapshot = _apply_rounds(*changes)
+    live = [
+        t if i not in snapshot.tombstones else "" for i, t in enumerate(snapshot.titles)
+    ]
+    for n, index in ((3, snapshot.trigram_index), (2, snapshot.bigram_index)):
+        expected = _build_ngram_index(live, n=n)
+        grams = set(expected) | {
+            g for t in snapshot.titles for g in _extract_ngrams(t, n)
+        }
+        for gram in grams:
+            assert list(index.get(gram, ())) == list(expected.get(gram, ()))
+
+
+@given(_changes(), SMALL_TEXT)
+@settings(deadline=None)
+def test_candidates_match_compacted(changes, query):
+    """两层快照上的候选标题与对现存标题全量构建的快照一致。"""
+    from pkg.matching import (
+        author_title_indices,
+        exact_candidates,
+        exact_hits,
+        fuzzy_candidates,
+        prepare_exact_query,
+        range_candidates,
+    )
+
+    with patch.object(pkg.cache, "ENABLE_SUFFIX_ARRAY", True):
+        layered = _apply_rounds(*changes)
+        rebuilt = build_snapshot(
+            sorted(layered.live_titles, reverse=True), layered.generation
+        )
+    exact_query = prepare_exact_query(query)
+
+    def candidates(snapshot):
+        pkg.cache.cache_store.install_snapshot(snapshot)
+        titles = snapshot.titles
+        author = pkg.cache.FindArtistV2(query)
+        return [
+            {titles[idx] for idx in exact_candidates(query)},
+            {titles[idx] for idx in fuzzy_candidates(query)},
+            {titles[idx] for idx in exact_hits(exact_query.text)},
+            {titles[idx] for idx in range_candidates(exact_query)},
+            {titles[idx] for idx in author_title_indices(author) or ()},
+        ]
+
+    previous = pkg.cache.cache_store.get_snapshot()
+    try:
+        assert candidates(layered) == candidates(rebuilt)
+    finally:
+        pkg.cache.cache_store.install_snapshot(previous)
+
+
+@given(_changes())
+@settings(deadline=None)
+def test_live_lists_equal_compacted(changes):
+    """现存标题按全量重建的顺序排列；失去全部作品的作者不再保留"""
+    layered = _apply_rounds(*changes)
+    rebuilt = build_snapshot(
+        sorted(layered.live_titles, reverse=True), layered.generation
+    )
+    assert layered.live_titles == rebuilt.titles
+    assert layered.author_set == rebuilt.author_set
+    assert sorted(layered.authors) == sorted(rebuilt.authors)
+    assert layered.author_counts == rebuilt.author_counts
+
+
+@given(_changes(), SMALL_TEXT, st.sampled_from(["", "a", "[b]", "cd"]))
+@settings(deadline=None)
+def test_match_title_equals_compacted(changes, query, author):
+    """两层快照与按现存标题全量重建的快照给出相同的 (状态, 标题) 与 top-k 结果"""
+    from pkg.query import _match_title, query_match_title_topk_sync
+
+    layered = _apply_rounds(*changes)
+    rebuilt = build_snapshot(
+        sorted(layered.live_titles, reverse=True), layered.generation
+    )
+
+    def match(snapshot):
+        pkg.cache.cache_store.install_snapshot(snapshot)
+        return (
+            _match_title(snapshot, query, author),
+            query_match_title_topk_sync(query, author, k=3),
+        )
+
+    previous = pkg.cache.cache_store.get_snapshot()
+    try:
+        assert match(layered) == match(rebuilt)
+    finally:
+        pkg.cache.cache_store.install_snapshot(previous)
+
+
+# ==== Test classes ====
+
+
+class TestLayeredIndex:
+    def setup_method(self):
+        self.base = {"abc": array("I", [0, 2]), "bcd": array("I", [1])}
+
+    def test_untouched_key_returns_base(self):
+        index = LayeredIndex(self.base).with_changes([("xyz", 3)], [])
+        assert index.get("abc") is self.base["abc"]
+
+    def test_added_and_removed(self):
+        index = LayeredIndex(self.base).with_changes(
+            [("abc", 3), ("xyz", 3)], [("abc", 0)]
+        )
+        assert list(index.get("abc")) == [2, 3]
+        assert list(index.get("xyz")) == [3]
+        assert "xyz" in index
+        assert index.get("missing") is None
+
+    def test_copy_on_write(self):
+        first = LayeredIndex(self.base)
+        second = first.with_changes([("abc", 3)], [("bcd", 1)])
+        assert list(first.get("abc")) == [0, 2]
+        assert list(first.get("bcd")) == [1]
+        assert list(second.get("bcd")) == []
+
+    def test_wrap_is_idempotent(self):
+        index = LayeredIndex.wrap(self.base)
+        assert LayeredIndex.wrap(index) is index
+
+
+class TestLayeredIntervals:
+    def test_stab_excludes_tombstones(self):
+        base = IntervalIndex([(1, 3, 0), (2, 5, 1)])
+        intervals = LayeredIntervals(base, ((2, 4, 2), (7, 9, 3)), frozenset({1}))
+        assert sorted(intervals.stab(2)) == [0, 2]
+        assert intervals.stab(8) == [3]
+        assert intervals.size == 4
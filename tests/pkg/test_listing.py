@@ -0,0 +1,108 @@
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pkg.cache import _build_ngram_index
+from pkg.listing import _page_and_count, list_page
+from pkg.prefix_index import PrefixIndex
+
+_values = st.lists(st.text(alphabet="abAB[] ", max_size=8), max_size=40, unique=True)
+_needle = st.text(alphabet="abAB[] ", max_size=3)
+
+# ==== Property-based tests ====
+
+
+@given(
+    _values, _needle.filter(bool), st.integers(0, 50), st.none() | st.integers(1, 10)
+)
+def test_prefix_page_matches_scan(values, prefix, offset, limit):
+    """prefix 结果（忽略大小写）与线性扫描一致，按 casefold 字典序分页。"""
+    expected = sorted(
+        (v for v in values if v.casefold().startswith(prefix.casefold())),
+        key=str.casefold,
+    )
+    stop = None if limit is None else offset + limit
+    page, total = list_page(
+        values, offset, limit, prefix=prefix, prefix_index=PrefixIndex(values)
+    )
+    assert total == len(expected)
+    assert page == expected[offset:stop]
+
+
+@given(_values, _needle, st.integers(0, 50), st.none() | st.integers(1, 10))
+def test_contains_page_matches_scan(values, needle, offset, limit):
+    """contains 经 n-gram 索引得到的结果与不区分大小写的线性扫描一致，保持原列表顺序。"""
+    expected = [v for v in values if needle.lower() in v.lower()]
+    stop = None if limit is None else offset + limit
+    page, total = list_page(
+        values,
+        offset,
+        limit,
+        contains=needle,
+        trigram_index=_build_ngram_index(values, n=3),
+        bigram_index=_build_ngram_index(values, n=2),
+    )
+    assert total == len(expected)
+    assert page == expected[offset:stop]
+
+
+# ==== Test classes ====
+
+
+class TestListPage:
+    def setup_method(self):
+        self.values = ["[B] two", "[a] one", "[A] three", "[c] four"]
+
+    def test_full(self):
+        assert list_page(self.values) == (self.values, 4)
+
+    def test_offset_limit(self):
+        assert list_page(self.values, 1, 2) == (["[a] one", "[A] three"], 4)
+        assert list_page(self.values, 10, 2) == ([], 4)
+
+    def test_prefix_case_insensitive(self):
+        page, total = list_page(
+            self.values, prefix="[a", prefix_index=PrefixIndex(self.values)
+        )
+        assert total == 2
+        assert set(page) == {"[a] one", "[A] three"}
+
+    def test_prefix_and_contains(self):
+        page, total = list_page(
+            self.values,
+            prefix="[a",
+            contains="one",
+            prefix_index=PrefixIndex(self.values),
+        )
+        assert (page, total) == (["[a] one"], 1)
+
+    def test_without_indexes_scans(self):
+        page, total = list_page(self.values, prefix="[a", contains="e")
+        assert (page, total) == (["[a] one", "[A] three"], 2)
+        assert list_page(self.values, contains="two") == (["[B] two"], 1)
+
+    def test_contains_short_needle_scans(self):
+        assert list_page(
+            self.values, contains="o", trigram_index={}, bigram_index={}
+        ) == (
+            ["[B] two", "[a] one", "[c] four"],
+            3,
+        )
+
+    def test_contains_ignores_case(self):
+        values = ["[Alice] Summer", "[Bob] alice in wonderland", "[ALİCE] x", "Carol"]
+        kwargs = {
+            "trigram_index": _build_ngram_index(values, n=3),
+            "bigram_index": _build_ngram_index(values, n=2),
+        }
+        for needle in ("alice", "ALICE", "aLiCe"):
+            page, total = list_page(values, contains=needle, **kwargs)
+            assert (page, total) == (values[:2], 2)
+        assert list_page(values, contains="alİ", **kwargs) == ([values[2]], 1)
+        assert list_page(values, contains="LI", **kwargs) == (values[:3], 3)
+
+
+class TestPageAndCount:
+    def test_counts_past_page(self):
+        assert _page_and_count(iter("abcdef"), 1, 3) == (["b", "c"], 6)
+        assert _page_and_count(iter("abc"), 5, 7) == ([], 3)
+        assert _page_and_count(iter("abc"), 1, None) == (["b", "c"], 3)
@@ -1,18 +1,32 @@
 # exact_candidates / fuzzy_candidates 依赖 cache_store 单例，跳过单测
-from hypothesis import assume, given
+from array import array
+from unittest.mock import patch
+
+import pytest
+from hypothesis import assume, given, settings
 from hypothesis import strategies as st
 
+from pkg import matching
 from pkg.matching import (
+    BatchCandidates,
+    _char_variants,
     _intersect_index,
+    _intersect_sorted,
     _normalize_range_separators,
     _resolve_grams,
     _union_index,
     check_author_in_title,
+    common_substring_bounds,
+    exact_candidates,
     exactly_match,
+    exactly_match_prepared,
     extract_number_from_string,
     extract_number_range_from_string,
     fuzz_match,
+    fuzzy_candidates,
     part_match,
+    prepare_exact_query,
+    restrict_candidates,
 )
 
 # ==== Property-based tests ====
@@ -50,6 +64,15 @@ def test_exactly_match_substring(prefix, needle, suffix):
     assert exactly_match(prefix + needle + suffix, needle) is True
 
 
+@given(TEXT, TEXT)
+def test_exactly_match_prepared_equivalent(cached, needle):
+    """快照预计算（归一化标题 + 数字范围）与逐次计算结果一致。"""
+    nc = _normalize_range_separators(cached)
+    cached_range = extract_number_range_from_string(nc)
+    prepared = exactly_match_prepared(nc, cached_range, prepare_exact_query(needle))
+    assert prepared == exactly_match(cached, needle)
+
+
 # ---- part_match ----
 
 
@@ -121,6 +144,22 @@ class TestCheckAuthorInTitle:
     def test_author_not_found(self):
         assert check_author_in_title("some title [artist]", "other") is False
 
+    def test_author_ignores_case(self):
+        assert check_author_in_title("some title [Artist]", "aRTIST") is True
+
+
+# ---- CharVariants ----
+
+
+def test_char_variants_cover_lower():
+    """原文任一字符小写后的首字符，其变体集合包含该原文字符；其余字符不可穷举"""
+    for cp in range(0x110000):
+        raw = chr(cp)
+        first, *rest = raw.lower()
+        variants = _char_variants(first)
+        assert variants is None or raw in variants
+        assert all(_char_variants(c) is None for c in rest)
+
 
 # ---- ExtractNumberFromString ----
 
@@ -199,6 +238,23 @@ class TestExactlyMatch:
         assert exactly_match("vol 1-3", "ch 2") is False
 
 
+# ---- ExactlyMatchPrepared ----
+
+
+class TestExactlyMatchPrepared:
+    def test_prepare_query(self):
+        q = prepare_exact_query("vol～2")
+        assert q.text == "vol-2"
+        assert q.number == 2
+        assert q.residue == "vol-"
+
+    def test_range_from_snapshot(self):
+        assert exactly_match_prepared("vol 1-3", (1, 3), prepare_exact_query("vol 2"))
+
+    def test_range_missing(self):
+        assert not exactly_match_prepared("vol 1-3", None, prepare_exact_query("vol 2"))
+
+
 # ---- PartMatch ----
 
 
@@ -273,21 +329,39 @@ class TestResolveGrams:
         assert "hel" in grams or "ell" in grams or "llo" in grams
 
 
+# ---- IntersectSorted ----
+
+
+@given(
+    st.lists(st.integers(0, 200), max_size=40).map(lambda xs: sorted(set(xs))),
+    st.lists(st.integers(0, 200), max_size=200).map(lambda xs: sorted(set(xs))),
+)
+def test_intersect_sorted_equals_set(a, b):
+    """galloping / 哈希两条路径结果一致，且升序。"""
+    expected = sorted(set(a) & set(b))
+    assert _intersect_sorted(a, b) == expected
+    assert _intersect_sorted(b, a) == expected
+
+
 # ---- IntersectIndex ----
 
 
 class TestIntersectIndex:
     def test_intersection(self):
-        idx = {"a": frozenset({0, 1}), "b": frozenset({0, 2})}
-        assert _intersect_index(idx, {"a", "b"}) == frozenset({0})
+        idx = {"a": array("I", [0, 1]), "b": array("I", [0, 2])}
+        assert list(_intersect_index(idx, ["a", "b"])) == [0]
 
     def test_missing_gram(self):
-        idx = {"a": frozenset({0, 1})}
-        assert _intersect_index(idx, {"a", "x"}) == frozenset()
+        idx = {"a": array("I", [0, 1])}
+        assert list(_intersect_index(idx, ["x", "a"])) == []
 
     def test_single_gram(self):
-        idx = {"a": frozenset({0, 1, 2})}
-        assert _intersect_index(idx, {"a"}) == frozenset({0, 1, 2})
+        idx = {"a": array("I", [0, 1, 2])}
+        assert list(_intersect_index(idx, ["a"])) == [0, 1, 2]
+
+    def test_gallop_path(self):
+        idx = {"a": array("I", [5, 500]), "b": array("I", range(1000))}
+        assert list(_intersect_index(idx, ["a", "b"])) == [5, 500]
 
 
 # ---- UnionIndex ----
@@ -295,17 +369,98 @@ class TestIntersectIndex:
 
 class TestUnionIndex:
     def test_union(self):
-        idx = {"a": frozenset({0}), "b": frozenset({1, 2}), "f": frozenset({7, 8, 9})}
-        assert _union_index(idx, {"a", "b"}, 100) == frozenset({0, 1, 2})
+        idx = {
+            "a": array("I", [2]),
+            "b": array("I", [0, 1]),
+            "f": array("I", [7, 8, 9]),
+        }
+        assert _union_index(idx, ["a", "b"], 100) == [0, 1, 2]
 
     def test_exceeds_max(self):
-        idx = {"a": frozenset({0, 1, 2})}
-        assert _union_index(idx, {"a"}, 2) == None
+        idx = {"a": array("I", [0, 1, 2])}
+        assert _union_index(idx, ["a"], 2) is None
 
     def test_all_missing(self):
-        idx = {"x": frozenset({0})}
-        assert _union_index(idx, {"y", "z"}, 10) == frozenset()
+        idx = {"x": array("I", [0])}
+        assert _union_index(idx, ["y", "z"], 10) == []
 
     def test_single_gram(self):
-        idx = {"a": frozenset({0, 1})}
-        assert _union_index(idx, {"a"}, 10) == frozenset({0, 1})
+        idx = {"a": array("I", [0, 1])}
+        assert _union_index(idx, ["a"], 10) == [0, 1]
+
+
+# ---- RestrictCandidates ----
+
+
+class TestRestrictCandidates:
+    def test_no_author_keeps_all(self):
+        assert restrict_candidates([1, 2, 3], None) == [1, 2, 3]
+
+    def test_intersection(self):
+        assert restrict_candidates([1, 2, 3, 7], array("I", [2, 7, 9])) == [2, 7]
+
+    def test_unknown_titles(self):
+        assert restrict_candidates([1, 2], array("I", [5])) == []
+
+
+# ---- BatchCandidates ----
+
+SMALL_TEXT = st.text(st.sampled_from("abcde "), max_size=12)
+
+
+@given(
+    st.lists(SMALL_TEXT, min_size=1, max_size=40, unique=True),
+    st.lists(SMALL_TEXT, max_size=10),
+)
+@settings(deadline=None)
+def test_batch_candidates_equal_per_query(titles, queries):
+    """batch 级候选与逐条 exact_candidates / fuzzy_candidates 完全一致。"""
+    from pkg.cache import build_snapshot, cache_store
+
+    previous = cache_store.get_snapshot()
+    snapshot = build_snapshot(sorted(titles, reverse=True), previous.generation + 1)
+    cache_store.install_snapshot(snapshot)
+    try:
+        for np_module in {matching.np, None}:  # NumPy 路径（已安装时）与纯 Python 路径
+            with patch.object(matching, "np", np_module):
+                batch = BatchCandidates(snapshot, queries)
+                for q in queries:
+                    assert list(batch.exact(q)) == list(exact_candidates(q))
+                    assert list(batch.fuzzy(q)) == list(fuzzy_candidates(q))
+    finally:
+        cache_store.install_snapshot(previous)
+
+
+def _longest_common_substring(a: str, b: str) -> int:
+    return max(
+        (j - i for i in range(len(a)) for j in range(i + 1, len(a) + 1) if a[i:j] in b),
+        default=0,
+    )
+
+
+@given(st.lists(SMALL_TEXT, min_size=1, max_size=20, unique=True), SMALL_TEXT)
+@settings(deadline=None)
+def test_common_substring_bounds_upper_bound(titles, query):
+    """共有 gram 计数给出的上界不小于真实最长公共子串长度。"""
+    from pkg.cache import build_snapshot, cache_store
+
+    previous = cache_store.get_snapshot()
+    snapshot = build_snapshot(titles, previous.generation + 1)
+    cache_store.install_snapshot(snapshot)
+    try:
+        bounds = common_substring_bounds(query)
+        assume(bounds is not None)
+        shared, n = bounds
+        for idx, title in enumerate(snapshot.titles):
+            assert _longest_common_substring(query, title) <= n - 1 + shared[idx]
+    finally:
+        cache_store.install_snapshot(previous)
+
+
+class TestBatchCandidates:
+    def test_unknown_title_raises(self):
+        batch = BatchCandidates(_make_snapshot(["abc"]), ["abc"])
+        assert "abc" in batch
+        assert "xyz" not in batch
+        with pytest.raises(KeyError):
+            batch.exact("xyz")
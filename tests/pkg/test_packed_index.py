@@ -0,0 +1,71 @@
+from array import array
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pkg.packed_index import PackedNgramIndex, encode_gram
+
+# ==== Property-based tests ====
+
+CHARS = st.characters(blacklist_categories=("Cs",))
+GRAM = st.text(CHARS, min_size=3, max_size=3)
+POSTINGS = st.lists(st.integers(0, 10**6), min_size=1, max_size=10).map(
+    lambda xs: array("I", sorted(set(xs)))
+)
+
+
+@given(st.dictionaries(GRAM, POSTINGS, max_size=30), GRAM)
+def test_packed_equals_dict(index, probe):
+    packed = PackedNgramIndex.from_dict(index)
+    assert len(packed) == len(index)
+    for gram, postings in index.items():
+        assert list(packed.get(gram)) == list(postings)
+    assert (probe in packed) == (probe in index)
+    if probe not in index:
+        assert packed.get(probe) is None
+
+
+@given(
+    st.dictionaries(GRAM, POSTINGS, max_size=30),
+    st.dictionaries(GRAM, st.none() | POSTINGS, max_size=10),
+)
+def test_with_overrides_equals_dict(index, overrides):
+    """替换 / 新增 / 删除部分 gram 后与对字典做同样修改再打包一致。"""
+    expected = {**index, **overrides}
+    expected = {gram: postings for gram, postings in expected.items() if postings}
+    merged = PackedNgramIndex.from_dict(index).with_overrides(overrides)
+    packed = PackedNgramIndex.from_dict(expected)
+    assert list(merged.keys) == list(packed.keys)
+    assert list(merged.offsets) == list(packed.offsets)
+    assert list(merged.postings) == list(packed.postings)
+
+
+@given(GRAM, GRAM)
+def test_encode_gram_order_preserving(a, b):
+    assert (encode_gram(a) < encode_gram(b)) == (a < b)
+
+
+class TestPackedNgramIndex:
+    def test_get_default(self):
+        packed = PackedNgramIndex.from_dict({"abc": array("I", [1])})
+        assert packed.get("xyz", ()) == ()
+
+    def test_empty(self):
+        packed = PackedNgramIndex.from_dict({})
+        assert len(packed) == 0
+        assert packed.get("abc") is None
+
+    def test_rebuild_from_buffers(self):
+        """三个平坦数组即可零拷贝重建（共享内存 / mmap 场景）。"""
+        packed = PackedNgramIndex.from_dict(
+            {"abc": array("I", [1, 5]), "bcd": array("I", [5])}
+        )
+        views = [
+            memoryview(buf) for buf in (packed.keys, packed.offsets, packed.postings)
+        ]
+        rebuilt = PackedNgramIndex(*views)
+        assert list(rebuilt.get("abc")) == [1, 5]
+        assert list(rebuilt.get("bcd")) == [5]
+
+    def test_encode_gram(self):
+        assert encode_gram("ab") == (ord("a") << 21) | ord("b")
@@ -0,0 +1,95 @@
+import asyncio
+import gzip
+
+from hypothesis import given
+from hypothesis import strategies as st
+from starlette.requests import Request
+
+from pkg import payload
+from pkg.payload import EncodedPayload, cached_response, choose_encoding
+
+
+def _request(**headers: str) -> Request:
+    raw = [(k.replace("_", "-").encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw})
+
+
+# ==== Property-based tests ====
+
+
+@given(st.binary(max_size=4096))
+def test_gzip_roundtrip(body):
+    """压缩后的表示解压等于原始响应体。"""
+    assert (
+        gzip.decompress(EncodedPayload(body, "application/json").encode("gzip")) == body
+    )
+
+
+# ==== Test classes ====
+
+
+class TestChooseEncoding:
+    def test_prefers_br_then_gzip(self):
+        expected = "br" if payload.brotli is not None else "gzip"
+        assert choose_encoding("gzip, deflate, br", 4096) == expected
+        assert choose_encoding("gzip", 4096) == "gzip"
+
+    def test_q_zero_excluded(self):
+        assert choose_encoding("gzip;q=0, br;q=0", 4096) == "identity"
+
+    def test_small_body_uncompressed(self):
+        assert choose_encoding("gzip", 10) == "identity"
+
+    def test_no_header(self):
+        assert choose_encoding("", 4096) == "identity"
+
+
+class TestEncodedPayload:
+    def test_etag_per_encoding(self):
+        p = EncodedPayload(b"abc", "application/json")
+        assert p.etag() != p.etag("gzip")
+        assert p.etag() == EncodedPayload(b"abc", "text/html").etag()
+        assert p.etag() != EncodedPayload(b"abd", "application/json").etag()
+
+    def test_matches(self):
+        p = EncodedPayload(b"abc", "application/json")
+        assert p.matches(p.etag())
+        assert p.matches(f'"x", W/{p.etag("gzip")}')
+        assert p.matches("*")
+        assert not p.matches('"x"')
+
+
+class TestCachedResponse:
+    def setup_method(self):
+        payload.payload_cache.clear()
+        self.renders = 0
+
+    def _render(self) -> tuple[bytes, str]:
+        self.renders += 1
+        return b"x" * 2048, "application/json"
+
+    def _get(self, generation: int, **headers: str):
+        return asyncio.run(
+            cached_response(_request(**headers), "k", generation, self._render)
+        )
+
+    def test_renders_once_per_generation(self):
+        self._get(1)
+        self._get(1)
+        assert self.renders == 1
+        self._get(2)
+        assert self.renders == 2
+
+    def test_not_modified(self):
+        etag = self._get(1).headers["etag"]
+        resp = self._get(1, if_none_match=etag)
+        assert resp.status_code == 304
+        assert resp.body == b""
+        assert self._get(1, if_none_match='"other"').status_code == 200
+
+    def test_gzip_response(self):
+        resp = self._get(1, accept_encoding="gzip")
+        assert resp.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(resp.body) == b"x" * 2048
+        assert resp.headers["etag"].endswith('-gzip"')
+        assert "Accept-Encoding" in resp.headers["vary"]
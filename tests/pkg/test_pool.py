@@ -0,0 +1,170 @@
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+import pkg.cache
+from pkg.cache import _extract_ngrams, apply_delta, build_snapshot
+from pkg.models import BatchRequestItem
+from pkg.pool import MatchingPool, SharedSnapshot, _pack_titles, load_shared_snapshot
+
+# ==== Property-based tests ====
+
+CHARS = st.characters(blacklist_categories=("Cs",))
+TITLE_CHARS = st.sampled_from("[]ab-12 ")
+
+
+@given(st.lists(st.text(CHARS, max_size=20), max_size=30))
+def test_pack_titles_roundtrip(titles):
+    blob, offsets = _pack_titles(titles)
+    text = blob.decode("utf-8")
+    assert [text[offsets[i] : offsets[i + 1]] for i in range(len(titles))] == titles
+
+
+def _assert_same_snapshot(loaded, snapshot):
+    assert loaded.titles == snapshot.titles
+    assert loaded.generation == snapshot.generation
+    assert loaded.authors == snapshot.authors
+    assert loaded.author_set == snapshot.author_set
+    assert loaded.normalized_titles == snapshot.normalized_titles
+    assert loaded.title_ranges == snapshot.title_ranges
+    assert loaded.tombstones == snapshot.tombstones
+    assert loaded.delta_slots == snapshot.delta_slots
+    for mine, theirs, texts in (
+        (loaded.trigram_index, snapshot.trigram_index, snapshot.titles),
+        (loaded.bigram_index, snapshot.bigram_index, snapshot.titles),
+        (loaded.author_trigram_index, snapshot.author_trigram_index, snapshot.authors),
+    ):
+        for gram in {g for t in texts for n in (2, 3) for g in _extract_ngrams(t, n)}:
+            assert list(mine.get(gram) or ()) == list(theirs.get(gram) or ())
+    if snapshot.range_index is not None:
+        for x in range(12):
+            assert sorted(loaded.range_index.intervals.stab(x)) == sorted(
+                snapshot.range_index.intervals.stab(x)
+            )
+    if snapshot.suffix_array is not None:
+        for text in snapshot.normalized_titles:
+            assert loaded.suffix_array.find(text[:3]) == snapshot.suffix_array.find(
+                text[:3]
+            )
+
+
+@given(
+    st.lists(st.text(TITLE_CHARS, min_size=1, max_size=20), unique=True, max_size=30),
+    st.booleans(),
+    st.booleans(),
+)
+@settings(max_examples=50, deadline=None)
+def test_shared_snapshot_roundtrip(titles, packed, suffix):
+    """共享内存重建的快照与原快照的标题、派生结构和各索引一致。"""
+    titles = sorted(titles, reverse=True)
+    with (
+        patch.object(pkg.cache, "ENABLE_PACKED_INDEX", packed),
+        patch.object(pkg.cache, "ENABLE_SUFFIX_ARRAY", suffix),
+    ):
+        snapshot = build_snapshot(titles, generation=3)
+        if titles:
+            # 带 delta 层：删除首个标题、追加一个新标题
+            snapshot = apply_delta(snapshot, ["[New] 1-9 added"], [0], 4)
+    published = SharedSnapshot(snapshot)
+    try:
+        loaded = load_shared_snapshot(published.shm, published.handle)
+        _assert_same_snapshot(loaded, snapshot)
+        del loaded
+    finally:
+        published.release()
+
+
+# ==== Test classes ====
+
+
+class TestMatchingPool:
+    def test_not_started(self):
+        pool = MatchingPool(2)
+        assert not pool.enabled_for(1000)
+        assert pool.get_stats()["running"] is False
+
+    def test_publish_keeps_two_generations(self):
+        pool = MatchingPool(1)
+        try:
+            for gen in (1, 1, 2, 3):
+                handle = pool.publish(build_snapshot(["[A] abcdef"], generation=gen))
+                assert handle.generation == gen
+            assert len(pool._published) == 2
+            assert pool.get_stats()["generation"] == 3
+        finally:
+            pool.shutdown()
+
+    def test_restarts_after_worker_killed(self):
+        items = [BatchRequestItem(type="extract-author", title="[Carol] Spring")] * 4
+        pool = MatchingPool(1)
+        pool.start()
+
+        async def run():
+            first = await pool.run_batch(items)
+            broken = pool._executor
+            for process in list(broken._processes.values()):
+                process.kill()
+            with pytest.raises(BrokenProcessPool):
+                await pool.run_batch(items)
+            assert pool._executor is not broken
+            return first, await pool.run_batch(items)
+
+        try:
+            first, second = asyncio.run(run())
+        finally:
+            pool.shutdown()
+        assert second == first
+        assert pool.get_stats()["restarts"] == 1
+
+    def _run_batch_matches_in_process(self, snapshot):
+        from pkg.cache import cache_store
+        from pkg.query import process_batch_item
+
+        previous = cache_store.get_snapshot()
+        cache_store.install_snapshot(snapshot)
+        items = [
+            BatchRequestItem(type=t, title=title, author=author)
+            for t, title, author in [
+                ("match-title", "Summer Story 2", "Alice"),
+                ("match-title", "Winter Tale", ""),
+                ("match-title", "Autumn Walk", ""),
+                ("match-title", "Nothing Here", ""),
+                ("match-author", "", "bob"),
+                ("match-author", "", "dave"),
+                ("extract-author", "[Carol] Spring", ""),
+                ("unknown", "", ""),
+            ]
+        ] * 4
+        pool = MatchingPool(2)
+        pool.start()
+        try:
+            got = asyncio.run(pool.run_batch(items))
+            assert got == [process_batch_item(item) for item in items]
+        finally:
+            pool.shutdown()
+            cache_store.install_snapshot(previous)
+
+    def test_run_batch_matches_in_process(self):
+        titles = ["[Alice] Summer Story 1-3", "[Bob] Winter Tale", "[Carol] Spring"]
+        snapshot = build_snapshot(
+            sorted(titles, reverse=True), pkg.cache.cache_store.generation + 1
+        )
+        self._run_batch_matches_in_process(snapshot)
+
+    def test_run_batch_with_delta_layer(self):
+        titles = sorted(
+            ["[Alice] Summer Story 1-3", "[Bob] Winter Tale", "[Carol] Spring"],
+            reverse=True,
+        )
+        snapshot = build_snapshot(titles, pkg.cache.cache_store.generation + 1)
+        snapshot = apply_delta(
+            snapshot,
+            ["[Dave] Autumn Walk"],
+            [titles.index("[Bob] Winter Tale")],
+            snapshot.generation + 1,
+        )
+        self._run_batch_matches_in_process(snapshot)
@@ -0,0 +1,299 @@
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+import pkg.query
+from pkg.cache import build_snapshot, cache_store
+from pkg.constants import MATCH_EXACTLY, MATCH_PART
+from pkg.models import BatchRequestItem
+from pkg.pool import MatchingPool
+from pkg.query import (
+    _batch_key,
+    _match_title,
+    plan_batch,
+    query_match_title_sync,
+    query_match_title_topk_sync,
+    run_batch_items,
+    stream_batch,
+)
+from pkg.result_cache import GenerationLRU
+
+# ==== Property-based tests ====
+
+TYPES = st.sampled_from(
+    [
+        "extract-author",
+        "match-author",
+        "match-title",
+        "extract-match-author-and-match-title",
+        "x",
+    ]
+)
+ITEMS = st.lists(
+    st.builds(
+        BatchRequestItem,
+        type=TYPES,
+        title=st.sampled_from(["", "a?b", "a_b", " t ", "t"]),
+        author=st.sampled_from(["", "Bob", "bob", " bob"]),
+    ),
+    max_size=40,
+)
+
+
+@given(ITEMS)
+def test_plan_fan_out_restores_order(items):
+    """以 unique 的归一化键作为“结果”，回填后与原请求逐一对应。"""
+    plan = plan_batch(items)
+    fanned = plan.fan_out([_batch_key(u) for u in plan.unique])
+    assert fanned == [_batch_key(item) for item in items]
+
+
+@given(ITEMS)
+def test_plan_unique_and_grouped(items):
+    plan = plan_batch(items)
+    keys = [_batch_key(u) for u in plan.unique]
+    assert len(keys) == len(set(keys))
+    # 同类型请求相邻
+    types = [u.type for u in plan.unique]
+    seen = [t for i, t in enumerate(types) if i == 0 or types[i - 1] != t]
+    assert len(seen) == len(set(seen))
+
+
+_WORDS = st.sampled_from(
+    ["[Alice]", "[Bob]", "Alice", "Baz", "Story", "Foo", "(Alice)", "Circle"]
+)
+_TITLE = st.lists(_WORDS, min_size=1, max_size=4).map(" ".join)
+
+
+@given(
+    st.lists(_TITLE, min_size=1, max_size=12, unique=True),
+    _TITLE,
+    st.sampled_from(["", "Alice", "alice", "BOB", "Circle", "Zed"]),
+)
+@settings(deadline=None)
+def test_author_prune_keeps_result(titles, query, author):
+    """按作者剪枝候选不改变匹配结果（与不剪枝的流水线一致）。"""
+    snapshot = build_snapshot(sorted(titles, reverse=True), cache_store.generation + 1)
+    previous = cache_store.get_snapshot()
+    cache_store.install_snapshot(snapshot)
+    try:
+        pruned = _match_title(snapshot, query, author)
+        with patch.object(pkg.query, "author_title_indices", lambda _: None):
+            assert _match_title(snapshot, query, author) == pruned
+    finally:
+        cache_store.install_snapshot(previous)
+
+
+# ==== Test classes ====
+
+
+class TestPlanBatch:
+    def test_dedup(self):
+        items = [
+            BatchRequestItem(type="match-author", author="Bob"),
+            BatchRequestItem(type="match-title", title="a?b"),
+            BatchRequestItem(type="match-author", author="bob"),
+            BatchRequestItem(type="match-title", title="a_b"),
+        ]
+        plan = plan_batch(items)
+        assert len(plan.unique) == 2
+        assert plan.slots == [0, 1, 0, 1]
+
+    def test_empty(self):
+        plan = plan_batch([])
+        assert plan.unique == []
+        assert plan.fan_out([]) == []
+
+
+class TestRunBatchItems:
+    def test_unknown_type(self):
+        results = run_batch_items([BatchRequestItem(type="nope")])
+        assert results == [{"type": "nope", "error": "Unknown request type: nope"}]
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+def _collect_stream(items) -> list[tuple[int, dict]]:
+    async def run():
+        return [pair async for pair in stream_batch(_aiter(items))]
+
+    return asyncio.run(run())
+
+
+class TestStreamBatch:
+    def test_every_index_once_and_equal_to_batch(self):
+        items = [
+            BatchRequestItem(type=t, title=title, author=author)
+            for t, title, author in [
+                ("match-author", "", "Bob"),
+                ("extract-author", "[Carol] Spring", ""),
+                ("match-title", "Nothing Here", ""),
+                ("unknown", "", ""),
+            ]
+        ] * 5
+        pairs = _collect_stream(items)
+        assert sorted(i for i, _ in pairs) == list(range(len(items)))
+        streamed = [result for _, result in sorted(pairs, key=lambda p: p[0])]
+        assert streamed == run_batch_items(items)
+
+    def test_invalid_line(self):
+        pairs = _collect_stream(["bad line", BatchRequestItem(type="nope")])
+        assert dict(pairs) == {
+            0: {"type": "", "error": "bad line"},
+            1: {"type": "nope", "error": "Unknown request type: nope"},
+        }
+
+    def test_empty(self):
+        assert _collect_stream([]) == []
+
+    @pytest.mark.parametrize("failure", ["kill", "shutdown"])
+    def test_pool_failure_mid_stream(self, failure):
+        items = [
+            BatchRequestItem(type="extract-author", title=f"[Author{i}] Title {i}")
+            for i in range(12)
+        ]
+
+        async def failing(pool):
+            for index, item in enumerate(items):
+                if index == 6:
+                    if failure == "kill":
+                        for process in list(pool._executor._processes.values()):
+                            process.kill()
+                    else:
+                        pool._executor.shutdown(wait=False, cancel_futures=True)
+                yield item
+                await asyncio.sleep(0.05)
+
+        async def run(pool):
+            return [pair async for pair in stream_batch(failing(pool))]
+
+        pool = MatchingPool(1)
+        pool.start()
+        try:
+            with (
+                patch.object(pkg.query, "matching_pool", pool),
+                patch.object(pkg.query, "STREAM_CHUNK_SIZE", 2),
+            ):
+                pairs = asyncio.run(run(pool))
+        finally:
+            pool.shutdown()
+        assert sorted(i for i, _ in pairs) == list(range(len(items)))
+        streamed = [result for _, result in sorted(pairs, key=lambda p: p[0])]
+        assert streamed == run_batch_items(items)
+
+
+_TOPK_TITLES = sorted(
+    {
+        "[Alice] Summer Story vol.1",
+        "[Alice] Summer Story vol.1 extra",
+        "[Bob] Summer Stories",
+        "[Bob] Winter Night",
+        "[Carol] Autumn Leaves 1-3",
+    },
+    reverse=True,
+)
+
+
+class TestMatchTitleTopK:
+    def setup_method(self):
+        self.previous = cache_store.get_snapshot()
+        cache_store.install_snapshot(
+            build_snapshot(_TOPK_TITLES, self.previous.generation + 1)
+        )
+
+    def teardown_method(self):
+        cache_store.install_snapshot(self.previous)
+
+    def test_exact_ranked_by_coverage(self):
+        matches = query_match_title_topk_sync("Summer Story vol.1", k=2)
+        assert [m["title"] for m in matches] == [
+            "[Alice] Summer Story vol.1",
+            "[Alice] Summer Story vol.1 extra",
+        ]
+        assert all(m["match"] == MATCH_EXACTLY for m in matches)
+        assert matches[0]["score"] > matches[1]["score"]
+
+    def test_lower_stages_fill_up(self):
+        matches = query_match_title_topk_sync("Summer Story", k=5)
+        stages = [m["match"] for m in matches]
+        assert stages == sorted(stages, reverse=True)
+        assert len({m["title"] for m in matches}) == len(matches)
+        assert stages[:3] == [MATCH_EXACTLY, MATCH_EXACTLY, MATCH_PART]
+
+    def test_author_filter(self):
+        matches = query_match_title_topk_sync("Summer Stor", "Bob", k=5)
+        assert matches
+        assert all("Bob" in m["title"] for m in matches)
+
+    def test_best_stage_matches_first_hit(self):
+        snapshot = cache_store.get_snapshot()
+        for title in [
+            "Summer Story vol.1",
+            "Summer Storie",
+            "Autumn Leaves 2",
+            "Nothing",
+        ]:
+            status, _ = _match_title(snapshot, title, "")
+            matches = query_match_title_topk_sync(title, k=3)
+            assert (matches[0]["match"] if matches else 0) == status
+
+    def test_short_title(self):
+        assert query_match_title_topk_sync("a") == []
+
+
+class TestMatchTitleAuthor:
+    def test_author_mentioned_anywhere_in_title(self):
+        # 作者出现在社团名 / 标题末尾，FindArtistV2 不会将其判为作者
+        titles = ["[Circle (Alice)] Foo Bar", "[Bob] Baz Story (Alice)"]
+        snapshot = build_snapshot(
+            sorted(titles, reverse=True), cache_store.generation + 1
+        )
+        previous = cache_store.get_snapshot()
+        cache_store.install_snapshot(snapshot)
+        try:
+            assert _match_title(snapshot, "Baz Story", "Alice") == (
+                MATCH_EXACTLY,
+                "[Bob] Baz Story (Alice)",
+            )
+        finally:
+            cache_store.install_snapshot(previous)
+
+    def test_author_ignores_case(self):
+        titles = ["[Circle (Alice)] Foo Bar", "[Bob] Baz Story (Alice)"]
+        snapshot = build_snapshot(
+            sorted(titles, reverse=True), cache_store.generation + 1
+        )
+        previous = cache_store.get_snapshot()
+        cache_store.install_snapshot(snapshot)
+        try:
+            assert _match_title(snapshot, "Baz Story", "aLICE") == (
+                MATCH_EXACTLY,
+                "[Bob] Baz Story (Alice)",
+            )
+        finally:
+            cache_store.install_snapshot(previous)
+
+    def test_normalized_inputs_share_cache_entry(self):
+        # 首尾空白 / 作者大小写不同的请求命中同一缓存项
+        titles = ["[Bob] Baz Story (Alice)", "[Carol] Summer Story"]
+        snapshot = build_snapshot(
+            sorted(titles, reverse=True), cache_store.generation + 1
+        )
+        previous = cache_store.get_snapshot()
+        cache_store.install_snapshot(snapshot)
+        cache = GenerationLRU(16)
+        try:
+            with patch.object(pkg.query, "title_result_cache", cache):
+                first = query_match_title_sync("Baz Story", "Alice")
+                assert query_match_title_sync(" Baz Story ", " alice") == first
+                assert query_match_title_sync("Baz Story", "ALICE") == first
+            assert (len(cache), cache.hits) == (1, 2)
+            assert first == (MATCH_EXACTLY, "[Bob] Baz Story (Alice)")
+        finally:
+            cache_store.install_snapshot(previous)
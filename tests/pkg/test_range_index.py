@@ -0,0 +1,48 @@
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pkg.range_index import IntervalIndex, _strip_digits
+
+# ==== Property-based tests ====
+
+CHARS = st.characters(blacklist_categories=("Cs",))
+INTERVAL = st.tuples(st.integers(0, 50), st.integers(0, 50)).map(sorted)
+
+
+@given(st.lists(INTERVAL, max_size=40), st.integers(-5, 55))
+def test_stab_equals_brute_force(ranges, x):
+    intervals = [(start, end, i) for i, (start, end) in enumerate(ranges)]
+    expected = sorted(i for start, end, i in intervals if start <= x <= end)
+    assert sorted(IntervalIndex(intervals).stab(x)) == expected
+
+
+@given(st.text(CHARS), st.text(CHARS), st.text(CHARS))
+def test_strip_digits_keeps_substring(prefix, needle, suffix):
+    """去数字后子串关系保持 —— 去数字 gram 过滤不会漏掉范围候选。"""
+    assert _strip_digits(needle) in _strip_digits(prefix + needle + suffix)
+
+
+class TestIntervalIndex:
+    def test_stab_inside(self):
+        idx = IntervalIndex([(1, 3, 0), (5, 9, 1), (2, 6, 2)])
+        assert sorted(idx.stab(3)) == [0, 2]
+
+    def test_stab_endpoints(self):
+        idx = IntervalIndex([(1, 3, 0)])
+        assert idx.stab(1) == [0]
+        assert idx.stab(3) == [0]
+
+    def test_stab_miss(self):
+        idx = IntervalIndex([(1, 3, 0), (5, 9, 1)])
+        assert idx.stab(4) == []
+
+    def test_empty(self):
+        assert IntervalIndex([]).stab(1) == []
+
+
+class TestStripDigits:
+    def test_strip(self):
+        assert _strip_digits("vol 1-3") == "vol -"
+
+    def test_no_digits(self):
+        assert _strip_digits("abc") == "abc"
@@ -0,0 +1,130 @@
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pkg.result_cache import GenerationLRU, NegativeFilter
+
+# ==== Property-based tests ====
+
+
+@given(st.lists(st.integers(0, 20), max_size=100), st.integers(1, 8))
+def test_size_bounded(keys, maxsize):
+    """条目数不超过 maxsize，且最近写入的键一定命中。"""
+    lru = GenerationLRU(maxsize)
+    for k in keys:
+        lru.put(k, 1, k * 2)
+        assert len(lru) <= maxsize
+        assert lru.get(k, 1) == k * 2
+
+
+@given(st.sets(st.text(max_size=20), max_size=200))
+def test_negative_filter_no_false_negatives(keys):
+    """Bloom filter 无漏判：加入过的键一定命中。"""
+    f = NegativeFilter(1000, 1e-3)
+    for k in keys:
+        f.add(k, 1)
+    assert all((k, 1) in f for k in keys)
+
+
+# ==== Test classes ====
+
+
+class TestGenerationLRU:
+    def test_hit_and_miss_counters(self):
+        lru = GenerationLRU(4)
+        assert lru.get("a", 1) is None
+        lru.put("a", 1, (3, "A"))
+        assert lru.get("a", 1) == (3, "A")
+        stats = lru.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_evicts_least_recently_used(self):
+        lru = GenerationLRU(2)
+        lru.put("a", 1, 1)
+        lru.put("b", 1, 2)
+        lru.get("a", 1)  # a 变为最近使用
+        lru.put("c", 1, 3)
+        assert lru.get("b", 1) is None
+        assert lru.get("a", 1) == 1
+        assert lru.get_stats()["evictions"] == 1
+
+    def test_new_generation_invalidates(self):
+        lru = GenerationLRU(4)
+        lru.put("a", 1, 1)
+        assert lru.get("a", 2) is None
+        assert len(lru) == 0
+        assert lru.get_stats()["invalidations"] == 1
+
+    def test_stale_put_dropped(self):
+        """查询期间快照已替换：旧代数的结果不写入。"""
+        lru = GenerationLRU(4)
+        lru.get("a", 2)
+        lru.put("a", 1, 1)
+        assert lru.get("a", 2) is None
+        assert lru.get("a", 1) is None
+
+    def test_zero_size_disabled(self):
+        lru = GenerationLRU(0)
+        lru.put("a", 1, 1)
+        assert lru.get("a", 1) is None
+
+
+class TestNegativeFilter:
+    def test_sizing(self):
+        f = NegativeFilter(100_000, 1e-4)
+        # m ≈ 19.2 bit / 元素，k ≈ 13
+        assert 19 * 100_000 <= f.num_bits <= 20 * 100_000
+        assert f.num_hashes == 13
+
+    def test_false_positive_rate_near_target(self):
+        f = NegativeFilter(5000, 1e-2)
+        for i in range(5000):
+            f.add(f"in-{i}", 1)
+        fp = sum((f"out-{i}", 1) in f for i in range(20000)) / 20000
+        assert fp < 3e-2
+        assert f.estimated_fp_rate() < 2e-2
+
+    def test_new_generation_resets(self):
+        f = NegativeFilter(10, 1e-3)
+        f.add("a", 1)
+        assert ("a", 1) in f
+        assert ("a", 2) not in f
+        assert f.get_stats()["size"] == 0
+        assert f.get_stats()["resets"] == 1
+
+    def test_stale_add_dropped(self):
+        f = NegativeFilter(10, 1e-3)
+        assert ("a", 2) not in f
+        f.add("a", 1)
+        assert f.count == 0
+
+    def test_full_filter_resets(self):
+        f = NegativeFilter(2, 1e-3)
+        for k in "abc":
+            f.add(k, 1)
+        assert f.count == 1
+        assert ("c", 1) in f
+
+    def test_reset_between_check_and_lock(self):
+        # 检查方等锁期间另一线程进入新代数（位数组被替换）并插入其他键
+        f = NegativeFilter(10, 1e-3)
+        f.add("a", 1)
+        real_lock = f._lock
+
+        class RacingLock:
+            def __enter__(self):
+                f._lock = real_lock
+                f.add("b", 2)
+                return real_lock.__enter__()
+
+            def __exit__(self, *exc):
+                return real_lock.__exit__(*exc)
+
+        f._lock = RacingLock()
+        assert ("a", 2) not in f
+
+    def test_zero_capacity_disabled(self):
+        f = NegativeFilter(0, 1e-3)
+        f.add("a", 1)
+        assert ("a", 1) not in f
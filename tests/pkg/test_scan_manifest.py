@@ -0,0 +1,139 @@
+import os
+
+from pkg.scan_manifest import ScanManifest
+
+_PAST_NS = 1_000_000_000_000_000_000  # 2001 年：远早于扫描时刻，mtime 可信
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"")
+
+
+def _age(*dirs):
+    """把目录 mtime 调到过去，模拟已稳定的目录"""
+    for d in dirs:
+        os.utime(d, ns=(_PAST_NS, _PAST_NS))
+
+
+def _walk_names(root, extra):
+    """原 os.walk 全量收集逻辑，作为对照"""
+    names = set()
+    for _, dirs, files in os.walk(root):
+        names.update(dirs)
+        names.update(
+            os.path.splitext(f)[0] for f in files if f.endswith((".zip", ".rar"))
+        )
+    for entry in os.scandir(extra):
+        if entry.is_file() and entry.name.endswith(".zip"):
+            names.add(os.path.splitext(entry.name)[0])
+    return names
+
+
+# ==== Test classes ====
+
+
+class TestScanManifest:
+    def _build(self, tmp_path):
+        root, extra = tmp_path / "managed", tmp_path / "extra"
+        _touch(root / "[A] one" / "cover.jpg")
+        _touch(root / "[A] one" / "[A] one vol2.zip")
+        _touch(root / "sub" / "[B] two.rar")
+        _touch(root / "[C] three.zip")
+        _touch(extra / "[D] four.zip")
+        _touch(extra / "nested" / "[E] five.zip")
+        return root, extra
+
+    def test_full_scan_matches_walk(self, tmp_path):
+        root, extra = self._build(tmp_path)
+        manifest = ScanManifest(str(root), [str(extra)])
+        delta = manifest.rescan()
+        assert set(delta.added) == _walk_names(root, extra)
+        assert delta.removed == []
+
+    def test_unchanged_dirs_reused(self, tmp_path):
+        root, extra = self._build(tmp_path)
+        _age(root, root / "[A] one", root / "sub", extra)
+        manifest = ScanManifest(str(root), [str(extra)])
+        manifest.rescan()
+        delta = manifest.rescan()
+        assert delta == ([], [])
+        assert manifest.relisted == 0
+        assert manifest.reused == 4
+
+    def test_delta_relists_changed_dir_only(self, tmp_path):
+        root, extra = self._build(tmp_path)
+        _age(root, root / "[A] one", root / "sub", extra)
+        manifest = ScanManifest(str(root), [str(extra)])
+        manifest.rescan()
+
+        (root / "sub" / "[B] two.rar").unlink()
+        _touch(root / "sub" / "[F] six.zip")
+        delta = manifest.rescan()
+        assert delta == (["[F] six"], ["[B] two"])
+        assert manifest.relisted == 1
+        assert manifest.names == _walk_names(root, extra)
+
+    def test_recent_mtime_not_trusted(self, tmp_path):
+        root, extra = self._build(tmp_path)
+        manifest = ScanManifest(str(root), [str(extra)])
+        manifest.rescan()
+        # 刚修改过的目录记为 -1，下次必然重新列出
+        assert manifest.tree[str(root)].mtime_ns == -1
+        manifest.rescan()
+        assert manifest.reused == 0
+
+    def test_save_load_roundtrip(self, tmp_path):
+        root, extra = self._build(tmp_path)
+        _age(root, root / "[A] one", root / "sub", extra)
+        manifest = ScanManifest(str(root), [str(extra)])
+        manifest.rescan()
+        manifest.save(tmp_path / "manifest.json")
+
+        loaded = ScanManifest.load(tmp_path / "manifest.json", str(root), [str(extra)])
+        assert loaded.names == manifest.names
+        assert loaded.rescan() == ([], [])
+        assert loaded.relisted == 0
+
+    def test_load_with_other_root_is_empty(self, tmp_path):
+        root, extra = self._build(tmp_path)
+        manifest = ScanManifest(str(root), [str(extra)])
+        manifest.rescan()
+        manifest.save(tmp_path / "manifest.json")
+
+        loaded = ScanManifest.load(tmp_path / "manifest.json", str(extra), [str(extra)])
+        assert loaded.names == set()
+        assert (
+            ScanManifest.load(tmp_path / "missing.json", str(root), []).names == set()
+        )
+
+    def test_missing_root(self, tmp_path):
+        manifest = ScanManifest(str(tmp_path / "missing"), [])
+        assert manifest.rescan() == ([], [])
+
+    def test_refresh_changed_dirs(self, tmp_path):
+        root, extra = self._build(tmp_path)
+        manifest = ScanManifest(str(root), [str(extra)])
+        manifest.rescan()
+
+        # 新目录（含子目录）移入、旧目录删除、额外目录新增压缩包
+        _touch(tmp_path / "incoming" / "[G] seven" / "[G] seven.zip")
+        os.rename(tmp_path / "incoming", root / "incoming")
+        (root / "sub" / "[B] two.rar").unlink()
+        (root / "sub").rmdir()
+        _touch(extra / "[H] eight.zip")
+
+        delta = manifest.refresh({str(root), str(extra)})
+        assert delta == (
+            ["[G] seven", "[H] eight", "incoming"],
+            ["[B] two", "sub"],
+        )
+        assert manifest.names == _walk_names(root, extra)
+        assert str(root / "sub") not in manifest.tree
+        assert str(root / "incoming" / "[G] seven") in manifest.tree
+
+    def test_refresh_ignores_unknown_paths(self, tmp_path):
+        root, extra = self._build(tmp_path)
+        manifest = ScanManifest(str(root), [str(extra)])
+        manifest.rescan()
+        assert manifest.refresh({str(tmp_path)}) == ([], [])
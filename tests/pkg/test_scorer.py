@@ -0,0 +1,100 @@
+import difflib
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pkg.scorer import (
+    _lcs_length,
+    _pattern_masks,
+    difflib_scored_close_matches,
+    get_close_matches,
+    indel_ratio,
+    scored_close_matches,
+)
+
+# ==== Property-based tests ====
+
+CHARS = st.characters(blacklist_categories=("Cs",))
+TEXT = st.text(CHARS, max_size=40)
+TEXT_1 = st.text(CHARS, min_size=1, max_size=40)
+
+
+def _lcs_dp(a: str, b: str) -> int:
+    prev = [0] * (len(b) + 1)
+    for ca in a:
+        cur = [0]
+        for j, cb in enumerate(b):
+            cur.append(prev[j] + 1 if ca == cb else max(prev[j + 1], cur[j]))
+        prev = cur
+    return prev[-1]
+
+
+@given(TEXT, TEXT)
+def test_lcs_equals_dp(a, b):
+    assert _lcs_length(_pattern_masks(a), len(a), b) == _lcs_dp(a, b)
+
+
+@given(TEXT, TEXT)
+def test_indel_ratio_not_below_difflib(a, b):
+    """LCS ≥ Ratcliff/Obershelp 匹配字符数 ⇒ Indel ratio ≥ difflib ratio。"""
+    assert indel_ratio(a, b) >= difflib.SequenceMatcher(None, a, b).ratio() - 1e-9
+
+
+@given(st.lists(TEXT, max_size=20), TEXT_1, st.sampled_from([0.0, 0.6, 0.8]))
+def test_close_matches_equals_brute_force(candidates, word, cutoff):
+    """剪枝与提前放弃不改变 top-3 结果。"""
+    scored = [(indel_ratio(word, x), x) for x in candidates]
+    expected = [x for s, x in sorted(scored, reverse=True) if s >= cutoff][:3]
+    assert get_close_matches(word, candidates, n=3, cutoff=cutoff) == expected
+
+
+@given(
+    st.lists(TEXT, max_size=20), TEXT_1, st.integers(1, 4), st.sampled_from([0.0, 0.6])
+)
+def test_difflib_scored_equals_difflib(candidates, word, n, cutoff):
+    """上界剪枝后结果与 difflib.get_close_matches 一致，分数即 ratio。"""
+    scored = difflib_scored_close_matches(word, candidates, n=n, cutoff=cutoff)
+    assert [x for _, x in scored] == difflib.get_close_matches(
+        word, candidates, n, cutoff
+    )
+    for score, x in scored:
+        assert score == difflib.SequenceMatcher(None, x, word).ratio()
+
+
+@given(st.lists(TEXT, max_size=20), TEXT_1)
+def test_scored_close_matches_scores(candidates, word):
+    for score, x in scored_close_matches(word, candidates, n=3, cutoff=0.0):
+        assert score == indel_ratio(word, x)
+
+
+class TestIndelRatio:
+    def test_identical(self):
+        assert indel_ratio("abcdef", "abcdef") == 1.0
+
+    def test_disjoint(self):
+        assert indel_ratio("aaaa", "bbbb") == 0.0
+
+    def test_both_empty(self):
+        assert indel_ratio("", "") == 1.0
+
+    def test_partial(self):
+        # LCS("abcdef", "abcdef_x") = 6 → 12 / 14
+        assert indel_ratio("abcdef", "abcdef_x") == 12 / 14
+
+
+class TestGetCloseMatches:
+    def test_best_first(self):
+        matches = get_close_matches("abcdef", ["abcxyz", "abcdef_x", "abcdef"])
+        assert matches[0] == "abcdef"
+        assert matches[1] == "abcdef_x"
+
+    def test_cutoff(self):
+        assert get_close_matches("zzzz", ["aaaa", "bbbb"], cutoff=0.6) == []
+
+    def test_top_n(self):
+        assert (
+            len(
+                get_close_matches("ab", ["ab", "abc", "abcd", "abcde"], n=2, cutoff=0.0)
+            )
+            == 2
+        )
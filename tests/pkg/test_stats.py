@@ -1,7 +1,7 @@
 from hypothesis import given, settings
 from hypothesis import strategies as st
 
-from pkg.stats import RequestStatsCollector, _percentile
+from pkg.stats import BatchPlanStats, RequestStatsCollector, _percentile
 
 # ==== Property-based tests ====
 
@@ -101,3 +101,23 @@ class TestRequestStatsCollector:
         collector = RequestStatsCollector()
         stats = collector.get_stats()
         assert stats["uptime_seconds"] >= 0
+
+
+class TestBatchPlanStats:
+    def test_empty(self):
+        stats = BatchPlanStats().get_stats()
+        assert stats["batches"] == 0
+        assert stats["dedup_ratio"] == 0.0
+        assert stats["avg_stage_ms"] == {"plan": 0, "execute": 0, "fanout": 0}
+
+    def test_record(self):
+        c = BatchPlanStats()
+        c.record(10, 4, 1.0, 20.0, 0.5)
+        c.record(10, 6, 3.0, 40.0, 1.5)
+        stats = c.get_stats()
+        assert stats["batches"] == 2
+        assert stats["items"] == 20
+        assert stats["unique_items"] == 10
+        assert stats["dedup_ratio"] == 0.5
+        assert stats["avg_stage_ms"] == {"plan": 2.0, "execute": 30.0, "fanout": 1.0}
+        assert stats["last"]["dedup_ratio"] == 0.4
@@ -0,0 +1,51 @@
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pkg.suffix_array import build_suffix_array
+
+# ==== Property-based tests ====
+
+CHARS = st.characters(blacklist_categories=("Cs",), blacklist_characters="\x00")
+TEXT = st.text(CHARS, max_size=30)
+
+
+@given(st.lists(TEXT, max_size=20), st.text(CHARS, min_size=1, max_size=5))
+def test_find_equals_brute_force(titles, pattern):
+    """find 结果与逐一子串判断完全一致。"""
+    sa = build_suffix_array(titles)
+    expected = [i for i, t in enumerate(titles) if pattern in t]
+    assert sa.find(pattern) == expected
+
+
+@given(st.lists(st.text(CHARS, min_size=1, max_size=30), min_size=1, max_size=20))
+def test_every_title_finds_itself(titles):
+    sa = build_suffix_array(titles)
+    for i, t in enumerate(titles):
+        assert i in sa.find(t)
+
+
+class TestSuffixArray:
+    def test_substring(self):
+        sa = build_suffix_array(["hello world", "world peace", "abc"])
+        assert sa.find("world") == [0, 1]
+
+    def test_no_match(self):
+        sa = build_suffix_array(["hello", "world"])
+        assert sa.find("xyz") == []
+
+    def test_no_cross_title_match(self):
+        """相邻标题拼接处不产生伪命中。"""
+        sa = build_suffix_array(["ab", "cd"])
+        assert sa.find("bc") == []
+
+    def test_empty_pattern(self):
+        sa = build_suffix_array(["abc"])
+        assert sa.find("") == []
+
+    def test_empty_titles(self):
+        sa = build_suffix_array([])
+        assert sa.find("a") == []
+
+    def test_duplicate_occurrences_deduplicated(self):
+        sa = build_suffix_array(["aaaa", "a"])
+        assert sa.find("aa") == [0]
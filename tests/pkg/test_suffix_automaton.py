@@ -0,0 +1,51 @@
+import difflib
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pkg.suffix_automaton import SuffixAutomaton
+
+# ==== Property-based tests ====
+
+CHARS = st.characters(blacklist_categories=("Cs",))
+ALPHA = st.text(st.sampled_from("abc"), max_size=40)
+
+
+@given(ALPHA, ALPHA)
+def test_same_as_difflib_small_alphabet(a, b):
+    """小字母表下大量重复子串，验证最长 + 最靠前的取舍规则。"""
+    m = difflib.SequenceMatcher(None, a, b).find_longest_match()
+    assert SuffixAutomaton(a).longest_common_substring(b) == (m.a, m.size)
+
+
+@given(st.text(CHARS, max_size=60), st.text(CHARS, max_size=60))
+def test_same_as_difflib(a, b):
+    m = difflib.SequenceMatcher(None, a, b).find_longest_match()
+    assert SuffixAutomaton(a).longest_common_substring(b) == (m.a, m.size)
+
+
+@given(ALPHA, st.lists(ALPHA, max_size=5))
+def test_reusable_across_candidates(a, candidates):
+    sam = SuffixAutomaton(a)
+    for b in candidates:
+        m = difflib.SequenceMatcher(None, a, b).find_longest_match()
+        assert sam.longest_common_substring(b) == (m.a, m.size)
+
+
+class TestSuffixAutomaton:
+    def test_common_substring(self):
+        assert SuffixAutomaton("hello").longest_common_substring("say hello world") == (
+            0,
+            5,
+        )
+
+    def test_no_common(self):
+        assert SuffixAutomaton("abc").longest_common_substring("xyz") == (0, 0)
+
+    def test_empty(self):
+        assert SuffixAutomaton("").longest_common_substring("abc") == (0, 0)
+        assert SuffixAutomaton("abc").longest_common_substring("") == (0, 0)
+
+    def test_earliest_in_input(self):
+        # "ab" 与 "cd" 等长，取输入中靠前的 "ab"
+        assert SuffixAutomaton("abcd").longest_common_substring("cd ab") == (0, 2)
@@ -0,0 +1,60 @@
+from hypothesis import given
+from hypothesis import strategies as st
+
+from pkg.cache import apply_delta, build_snapshot
+from pkg.suggest import suggest
+
+_TITLES = sorted(
+    {
+        "[Alpha] first story",
+        "[Alpha] second story extended",
+        "[alpha] lower",
+        "[Beta] another story",
+        "[Gamma] unrelated",
+    },
+    reverse=True,
+)
+
+# ==== Property-based tests ====
+
+
+@given(st.text(alphabet="[]abAB story", min_size=1, max_size=6), st.integers(1, 8))
+def test_suggest_bounded_and_unique(query, k):
+    """至多 k 条、无重复，且前缀命中排在模糊命中之前。"""
+    snap = build_snapshot(_TITLES, 1)
+    result = suggest(snap, query, k)
+    assert len(result) <= k
+    assert len(set(result)) == len(result)
+    is_prefix = [t.casefold().startswith(query.casefold()) for t in result]
+    assert is_prefix == sorted(is_prefix, reverse=True)
+
+
+# ==== Test classes ====
+
+
+class TestSuggest:
+    def setup_method(self):
+        self.snap = build_snapshot(_TITLES, 1)
+
+    def test_prefix_case_insensitive_shortest_first(self):
+        assert suggest(self.snap, "[ALPHA]", 3) == [
+            "[alpha] lower",
+            "[Alpha] first story",
+            "[Alpha] second story extended",
+        ]
+
+    def test_k_limits_results(self):
+        assert suggest(self.snap, "[alpha]", 1) == ["[alpha] lower"]
+
+    def test_fuzzy_fallback(self):
+        result = suggest(self.snap, "another stor", 3)
+        assert result[0] == "[Beta] another story"
+
+    def test_no_match(self):
+        assert suggest(self.snap, "zzzzzz", 5) == []
+
+    def test_delta_layer(self):
+        # 删除 "[alpha] lower"（索引 0），追加 "[ALPHA] new"：前缀索引未重建仍能补全
+        removed = self.snap.titles.index("[alpha] lower")
+        snap = apply_delta(self.snap, ["[ALPHA] new"], [removed], 2)
+        assert suggest(snap, "[alpha]", 2) == ["[ALPHA] new", "[Alpha] first story"]
@@ -0,0 +1,73 @@
+import asyncio
+
+import pytest
+
+from pkg import watcher
+from pkg.cache import CacheStore
+from pkg.scan_manifest import ScanManifest
+from pkg.watcher import TitleWatcher
+
+pytestmark = pytest.mark.skipif(watcher._libc is None, reason="inotify unavailable")
+
+
+async def _wait_for(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.02)
+
+
+# ==== Test classes ====
+
+
+class TestTitleWatcher:
+    def _store(self, root, monkeypatch):
+        monkeypatch.setattr(watcher, "WATCHER_DEBOUNCE_SECONDS", 0.05)
+        store = CacheStore()
+        monkeypatch.setattr(store, "save", lambda: None)
+        store.scan_manifest = ScanManifest(str(root), [])
+        return store
+
+    def test_applies_deltas(self, tmp_path, monkeypatch):
+        root = tmp_path / "managed"
+        (root / "sub").mkdir(parents=True)
+        (root / "[A] one.zip").write_bytes(b"")
+        store = self._store(root, monkeypatch)
+        title_watcher = TitleWatcher(store)
+
+        async def scenario():
+            updates = []
+
+            async def on_update():
+                updates.append(store.get_snapshot().generation)
+
+            task = asyncio.create_task(title_watcher.run(on_update))
+            try:
+                await _wait_for(lambda: title_watcher.mode == "inotify")
+                assert "[A] one" in store.titles
+
+                (root / "sub" / "[B] two.rar").write_bytes(b"")
+                await _wait_for(lambda: "[B] two" in store.titles)
+
+                # 新建目录后立即写入：目录本身与其中的压缩包都应出现
+                (root / "new").mkdir()
+                (root / "new" / "[C] three.zip").write_bytes(b"")
+                await _wait_for(lambda: "[C] three" in store.titles)
+                assert "new" in store.titles
+
+                (root / "[A] one.zip").unlink()
+                await _wait_for(lambda: "[A] one" not in store.titles)
+
+                # 无关文件不触发更新
+                generation = store.get_snapshot().generation
+                (root / "notes.txt").write_bytes(b"")
+                await asyncio.sleep(0.2)
+                assert store.get_snapshot().generation == generation
+                assert updates
+            finally:
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+            assert title_watcher.mode == "off"
+
+        asyncio.run(scenario())
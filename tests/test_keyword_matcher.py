@@ -0,0 +1,53 @@
+from unittest.mock import patch
+
+from hypothesis import given
+from hypothesis import strategies as st
+
+import keyword_matcher
+from keyword_matcher import KeywordMatcher
+
+CHARS = st.characters(blacklist_categories=("Cs",))
+
+# 小字母表让关键词互相重叠、前后缀嵌套，覆盖失配链
+SMALL = st.text(st.sampled_from("abc"), max_size=6)
+
+
+@given(st.lists(SMALL, max_size=10), st.text(st.sampled_from("abcd"), max_size=30))
+def test_search_equals_any_small_alphabet(keywords, text):
+    with patch.object(keyword_matcher, "_SCAN_THRESHOLD", 0):
+        matcher = KeywordMatcher(keywords)
+    assert matcher.search(text) == any(kw in text for kw in keywords)
+
+
+@given(st.lists(st.text(CHARS, max_size=5), max_size=10), st.text(CHARS, max_size=50))
+def test_search_equals_any(keywords, text):
+    with patch.object(keyword_matcher, "_SCAN_THRESHOLD", 0):
+        matcher = KeywordMatcher(keywords)
+    assert matcher.search(text) == any(kw in text for kw in keywords)
+
+
+@given(st.lists(st.text(CHARS, max_size=5), max_size=10), st.text(CHARS, max_size=50))
+def test_scan_path_equals_any(keywords, text):
+    """关键词较少时走逐个 `in` 路径。"""
+    assert KeywordMatcher(keywords).search(text) == any(kw in text for kw in keywords)
+
+
+@patch.object(keyword_matcher, "_SCAN_THRESHOLD", 0)
+class TestKeywordMatcher:
+    def test_hit(self):
+        assert KeywordMatcher(["foo", "bar"]).search("xx bar yy") is True
+
+    def test_miss(self):
+        assert KeywordMatcher(["foo", "bar"]).search("baz") is False
+
+    def test_suffix_via_fail_link(self):
+        # "abcd" 失败后需沿失配链找到 "bc"
+        assert KeywordMatcher(["abcd", "bc"]).search("abce") is True
+
+    def test_empty_keyword_matches_everything(self):
+        assert KeywordMatcher([""]).search("anything") is True
+
+    def test_no_keywords(self):
+        matcher = KeywordMatcher([])
+        assert matcher.search("anything") is False
+        assert not matcher